@@ -1,26 +1,84 @@
 from __future__ import annotations
 
+from typing import Annotated
+
 import typer
 
 from sba.cli.collect_cmd import run_collect
-from sba.cli.ml_cmd import train as train_cmd, detect as detect_cmd
+from sba.cli.ml_cmd import (
+    baseline as baseline_cmd,
+    benchmark as benchmark_cmd,
+    detect as detect_cmd,
+    train as train_cmd,
+    tune as tune_cmd,
+)
+from sba.config import config
 
 app = typer.Typer(help="System Behavior Analyzer & Automation Engine")
 
 
 @app.command()
-def collect(samples: int = typer.Option(None, help="Number of samples to collect (default: infinite).")) -> None:
-    run_collect(samples=samples)
+def collect(
+    samples: int = typer.Option(None, help="Number of samples to collect (default: infinite)."),
+    online: bool = typer.Option(False, help="Update the streaming (Half-Space Trees) model per sample."),
+    seasonal: bool = typer.Option(False, help="Score and update the seasonal baseline per sample."),
+    adaptive: bool = typer.Option(False, help="Sample faster while metrics move, slower while flat."),
+) -> None:
+    run_collect(samples=samples, online=online, seasonal=seasonal, adaptive=adaptive)
+
+
+@app.command()
+def train(
+    hours: float = typer.Option(None, help="Only train on the last N hours (default: all)."),
+    algo: str = typer.Option("iforest", help="Detector: iforest, zscore, mad, ewma, robust_cov, hst."),
+) -> None:
+    train_cmd(hours=hours, algo=algo)
+
+
+@app.command()
+def detect(
+    limit: int = typer.Option(20, help="Show last N incidents (or rows with --raw)."),
+    hours: float = typer.Option(None, help="Only score the last N hours (default: all)."),
+    online: bool = typer.Option(False, help="Use the streaming model kept up to date by `collect --online`."),
+    algo: str = typer.Option("iforest", help="Which trained detector to use (see `sba train --algo`)."),
+    seasonal: bool = typer.Option(False, help="Score against the time-of-week baseline (see `sba baseline`)."),
+    raw: bool = typer.Option(False, help="Print every scored row instead of merged incidents."),
+) -> None:
+    detect_cmd(
+        limit=limit,
+        hours=hours,
+        algo=algo,
+        seasonal=seasonal,
+        raw=raw,
+        model=config.online_model_file if online else None,
+    )
+
+
+@app.command()
+def baseline(
+    hours: float = typer.Option(None, help="Only use the last N hours (default: all)."),
+    bucket_minutes: int = typer.Option(60, help="Bucket size; buckets repeat every week."),
+) -> None:
+    baseline_cmd(hours=hours, bucket_minutes=bucket_minutes)
 
 
 @app.command()
-def train() -> None:
-    train_cmd()
+def benchmark(
+    hours: float = typer.Option(None, help="Only use the last N hours (default: all)."),
+    algo: Annotated[list[str] | None, typer.Option(help="Detector(s) to compare (repeatable, default: all).")] = None,
+    rate: float = typer.Option(0.01, help="Fraction of test rows to turn into synthetic spikes."),
+) -> None:
+    benchmark_cmd(hours=hours, algos=algo or None, rate=rate)
 
 
 @app.command()
-def detect(limit: int = typer.Option(20, help="Show last N anomalies.")) -> None:
-    detect_cmd(limit=limit)
+def tune(
+    hours: float = typer.Option(None, help="Only use the last N hours (default: all)."),
+    target_recall: float = typer.Option(0.8, help="Minimum recall on injected anomalies."),
+    workers: int = typer.Option(None, help="Worker processes (default: CPU count)."),
+    apply: bool = typer.Option(False, help="Retrain the IsolationForest with the chosen parameters."),
+) -> None:
+    tune_cmd(hours=hours, target_recall=target_recall, workers=workers, apply=apply)
 
 
 def main() -> None:
@@ -2,41 +2,159 @@ from __future__ import annotations
 
 import logging
 import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
 
 from sba.config import config
 from sba.logging_config import setup_logging
+from sba.collectors.adaptive import AdaptiveInterval
 from sba.collectors.system_metrics import collect_once, metrics_to_dict
+from sba.ml.incidents import IncidentBuilder
+from sba.ml.seasonal import SeasonalBaseline
+from sba.ml.streaming import HalfSpaceTrees
+from sba.storage.feature_store import FEATURES, append_features
 from sba.storage.parquet_store import append_metrics_parquet
 from sba.storage.sqlite_store import insert_metric
 
 log = logging.getLogger("sba.collect")
 
 
-def run_collect(samples: int | None = None) -> None:
+def _load_online(path: Path) -> HalfSpaceTrees:
+    if path.exists():
+        model = joblib.load(path)
+        if isinstance(model, HalfSpaceTrees):
+            return model
+        log.warning("Ignoring %s (not a HalfSpaceTrees model), starting fresh", path)
+    return HalfSpaceTrees(random_state=config.random_state)
+
+
+def _save_online(path: Path, model: HalfSpaceTrees) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, path)
+
+
+def _load_seasonal(path: Path) -> SeasonalBaseline:
+    if path.exists():
+        return SeasonalBaseline.load(path)
+    log.warning(
+        "No seasonal baseline at %s yet (run `sba baseline`); learning from scratch, "
+        "scoring starts once the table has enough samples", path,
+    )
+    return SeasonalBaseline()
+
+
+def _report(incidents: IncidentBuilder, kind: str, ts: float, score: float, metric: int, reason: str, row: dict) -> None:
+    """Log once per incident (when it opens); later samples of the run only extend it."""
+    inc = incidents.add(ts, score, metric, reason)
+    if inc.count == 1:
+        log.warning("%s anomaly (incident #%d): %s row=%s", kind, inc.id, reason, row)
+    else:
+        log.debug("%s incident #%d continues: n=%d peak=%.3f", kind, inc.id, inc.count, inc.peak_score)
+
+
+def run_collect(
+    samples: int | None = None, online: bool = False, seasonal: bool = False, adaptive: bool = False
+) -> None:
     setup_logging(config.logs_dir)
+    adaptive = adaptive or config.adaptive_sampling
     log.info(
-        "Starting collection: interval=%ss samples=%s",
-        config.sample_interval_sec,
+        "Starting collection: interval=%ss samples=%s online=%s seasonal=%s adaptive=%s",
+        f"{config.sample_interval_min_sec:g}-{config.sample_interval_max_sec:g}" if adaptive
+        else config.sample_interval_sec,
         samples,
+        online,
+        seasonal,
+        adaptive,
+    )
+
+    policy = (
+        AdaptiveInterval(
+            config.sample_interval_min_sec,
+            config.sample_interval_max_sec,
+            start_s=config.sample_interval_sec,
+        )
+        if adaptive
+        else None
     )
+    interval = float(config.sample_interval_sec)
+
+    detector = _load_online(config.online_model_file) if online else None
+    baseline = _load_seasonal(config.seasonal_file) if seasonal else None
+
+    labels = (*FEATURES, "score")
+    seasonal_incidents = IncidentBuilder(labels, gap_s=config.incident_gap_sec)
+    online_incidents = IncidentBuilder(labels, gap_s=config.incident_gap_sec)
 
     prev_net = None
+    prev_t = None
     i = 0
 
-    while True:
-        start = time.time()
+    try:
+        while True:
+            start = time.time()
+
+            # rates over the measured gap: with adaptive sampling it varies
+            gap = start - prev_t if prev_t is not None else interval
+            metrics, prev_net = collect_once(prev_net, gap)
+            prev_t = start
+            row = metrics_to_dict(metrics)
+            ts = datetime.fromisoformat(metrics.ts_utc).timestamp()
+
+            append_metrics_parquet(config.parquet_file, row)
+            insert_metric(config.sqlite_file, row)
+            append_features(config.parquet_file, row)
+
+            log.info("Collected: %s", row)
+
+            x = np.array([[row[f] for f in FEATURES]], dtype=np.float32)
+            finite = bool(np.all(np.isfinite(x)))
+            flagged = False
 
-        metrics, prev_net = collect_once(prev_net, config.sample_interval_sec)
-        row = metrics_to_dict(metrics)
+            if baseline is not None and finite:
+                # table lookup for this time-of-week bucket, then nudge it
+                if baseline.is_ready:
+                    zs = baseline.zscores(x, ts)[0]
+                    m = int(np.abs(zs).argmax())
+                    if abs(zs[m]) >= baseline.z_thresh:
+                        reason = f"{FEATURES[m]} z={zs[m]:.2f}"
+                        _report(seasonal_incidents, "Seasonal", ts, float(abs(zs[m])), m, reason, row)
+                        flagged = True
+                baseline.partial_fit(x, ts)
+                if i % 100 == 99:
+                    baseline.save(config.seasonal_file)
 
-        append_metrics_parquet(config.parquet_file, row)
-        insert_metric(config.sqlite_file, row)
+            if detector is not None and finite:
+                # score against the current reference window, then learn
+                if detector.is_ready:
+                    score = float(detector.decision_function(x)[0])
+                    if score < 0:
+                        reason = f"score={score:.3f}"
+                        _report(online_incidents, "Online", ts, -score, len(FEATURES), reason, row)
+                        flagged = True
+                detector.partial_fit(x)
+                if detector.n_seen_ % detector.window_size == 0:
+                    _save_online(config.online_model_file, detector)
 
-        log.info("Collected: %s", row)
+            if policy is not None:
+                new = policy.update(x[0], ts, hot=flagged)
+                if new != interval:
+                    log.debug("Sampling interval %.2fs -> %.2fs", interval, new)
+                interval = new
 
-        i += 1
-        if samples is not None and i >= samples:
-            break
+            i += 1
+            if samples is not None and i >= samples:
+                break
 
-        elapsed = time.time() - start
-        time.sleep(max(config.sample_interval_sec - elapsed, 0.0))
+            elapsed = time.time() - start
+            time.sleep(max(interval - elapsed, 0.0))
+    finally:
+        for kind, incidents in (("Seasonal", seasonal_incidents), ("Online", online_incidents)):
+            if len(incidents):
+                log.info("%s incidents this run: %d", kind, len(incidents))
+        if detector is not None:
+            _save_online(config.online_model_file, detector)
+        if baseline is not None and baseline.is_fitted:
+            baseline.save(config.seasonal_file)
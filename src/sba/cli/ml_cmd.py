@@ -1,32 +1,65 @@
 from __future__ import annotations
 
 import logging
+import time
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
 from sba.config import config
 from sba.logging_config import setup_logging
-from sba.ml.detect import detect_anomalies
-from sba.ml.train import train_isolation_forest
+from sba.ml.benchmark import results_frame, run_benchmark
+from sba.ml.detect import (
+    detect_anomalies,
+    detect_seasonal,
+    summarize_incidents,
+    with_collected_columns,
+)
+from sba.ml.detectors import DETECTORS
+from sba.ml.synthetic import inject_spikes
+from sba.ml.train import build_seasonal_baseline, train_detector, train_isolation_forest
+from sba.ml.tune import results_frame as tune_frame
+from sba.ml.tune import tune_isolation_forest
+from sba.storage.feature_store import open_features
 
 logger = logging.getLogger("sba")
 
 
+def _since(hours: Optional[float]) -> Optional[float]:
+    return None if not hours or hours <= 0 else time.time() - hours * 3600.0
+
+
+def model_file_for(algo: str) -> Path:
+    """IsolationForest keeps the historical path; other detectors get models/<algo>.joblib."""
+    if algo == "iforest":
+        return config.model_file
+    if algo not in DETECTORS:
+        raise ValueError(f"Unknown detector {algo!r}. Choose from: {', '.join(DETECTORS)}")
+    return config.models_dir / f"{algo}.joblib"
+
+
 def train(
     parquet: Optional[Path] = None,
     model: Optional[Path] = None,
+    hours: Optional[float] = None,
+    algo: str = "iforest",
 ) -> None:
     """
-    Train IsolationForest model from Parquet metrics.
+    Train a detector (IsolationForest by default) from Parquet metrics
+    (optionally only the last `hours`).
     Called by Typer command in app.py.
     """
     setup_logging(config.logs_dir)
 
     parquet_file = parquet or config.parquet_file
-    model_file = model or config.model_file
+    model_file = model or model_file_for(algo)
 
-    logger.info("Training model | parquet=%s | model=%s", parquet_file, model_file)
-    train_isolation_forest(parquet_file, model_file)
+    logger.info("Training model | algo=%s | parquet=%s | model=%s", algo, parquet_file, model_file)
+    if algo == "iforest":
+        train_isolation_forest(parquet_file, model_file, start=_since(hours))
+    else:
+        train_detector(parquet_file, model_file, algo=algo, start=_since(hours))
     print(f"✅ Model trained and saved to {model_file}")
 
 
@@ -34,25 +67,132 @@ def detect(
     limit: int = 30,
     parquet: Optional[Path] = None,
     model: Optional[Path] = None,
+    hours: Optional[float] = None,
+    algo: str = "iforest",
+    seasonal: bool = False,
+    raw: bool = False,
 ) -> None:
     """
-    Detect anomalies using trained model.
+    Detect anomalies using trained model (optionally only the last `hours`).
+    With `seasonal`, score against the time-of-week baseline instead.
+    Prints the last `limit` incidents (or raw scored rows with `raw`).
     Called by Typer command in app.py.
     """
     setup_logging(config.logs_dir)
 
     parquet_file = parquet or config.parquet_file
-    model_file = model or config.model_file
+    if seasonal:
+        model_file = model or config.seasonal_file
+        hint = "Run `sba baseline` first (after collecting data)."
+    else:
+        model_file = model or model_file_for(algo)
+        hint = "Run `sba train` first (after collecting data)."
 
     if not model_file.exists():
-        raise FileNotFoundError(
-            f"Model not found: {model_file}. Run `sba train` first (after collecting data)."
-        )
+        raise FileNotFoundError(f"Model not found: {model_file}. {hint}")
 
     logger.info("Detect anomalies | parquet=%s | model=%s | limit=%s", parquet_file, model_file, limit)
-    df = detect_anomalies(parquet_file, model_file)
+    if seasonal:
+        df = detect_seasonal(parquet_file, model_file, start=_since(hours))
+    else:
+        df = detect_anomalies(parquet_file, model_file, start=_since(hours))
 
-    print(f"anomalies: {int(df['is_anomaly'].sum())}")
+    incidents = summarize_incidents(df, gap_s=config.incident_gap_sec)
+    print(f"anomalies: {int(df['is_anomaly'].sum())} | incidents: {len(incidents)}")
 
     if limit > 0:
-        print(df.tail(limit).to_string(index=False))
+        out = with_collected_columns(df.tail(limit), parquet_file) if raw else incidents.tail(limit)
+        print(out.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+
+
+def baseline(
+    parquet: Optional[Path] = None,
+    out: Optional[Path] = None,
+    hours: Optional[float] = None,
+    bucket_minutes: int = 60,
+) -> None:
+    """
+    Build the seasonal (time-of-week) baseline table from history.
+    Called by Typer command in app.py.
+    """
+    setup_logging(config.logs_dir)
+
+    parquet_file = parquet or config.parquet_file
+    baseline_file = out or config.seasonal_file
+
+    logger.info("Seasonal baseline | parquet=%s | out=%s | bucket=%smin", parquet_file, baseline_file, bucket_minutes)
+    b = build_seasonal_baseline(parquet_file, baseline_file, bucket_s=bucket_minutes * 60, start=_since(hours))
+    filled = int((b.count_[:-1] >= b.min_count).sum())
+    print(f"✅ Baseline saved to {baseline_file} ({filled}/{b.n_buckets} buckets with enough data)")
+
+
+def benchmark(
+    parquet: Optional[Path] = None,
+    hours: Optional[float] = None,
+    algos: Optional[list[str]] = None,
+    rate: float = 0.01,
+    train_frac: float = 0.7,
+) -> None:
+    """
+    Compare detectors on the same data: fit on the first `train_frac` of history,
+    score the rest with labelled synthetic spikes injected at `rate`.
+    Called by Typer command in app.py.
+    """
+    setup_logging(config.logs_dir)
+
+    parquet_file = parquet or config.parquet_file
+    X = np.asarray(open_features(parquet_file).slice(_since(hours)).X, dtype=float)
+    if len(X) < 50:
+        raise ValueError(f"Need at least 50 samples to benchmark (have {len(X)}). Run collect first.")
+
+    split = int(len(X) * train_frac)
+    X_test, y_test = inject_spikes(X[split:], rate=rate, random_state=config.random_state)
+
+    names = algos or list(DETECTORS)
+    unknown = [a for a in names if a not in DETECTORS]
+    if unknown:
+        raise ValueError(f"Unknown detector(s) {unknown}. Choose from: {', '.join(DETECTORS)}")
+
+    logger.info("Benchmark | rows=%s train=%s injected=%s | %s", len(X), split, int(y_test.sum()), names)
+    results = run_benchmark(X[:split], X_test, y_test, {a: DETECTORS[a] for a in names})
+
+    print(f"train rows: {split} | test rows: {len(X_test)} | injected anomalies: {int(y_test.sum())}")
+    print(results_frame(results).to_string(float_format=lambda v: f"{v:.4g}"))
+
+
+def tune(
+    parquet: Optional[Path] = None,
+    model: Optional[Path] = None,
+    hours: Optional[float] = None,
+    target_recall: float = 0.8,
+    workers: Optional[int] = None,
+    apply: bool = False,
+) -> None:
+    """
+    Grid-search IsolationForest parameters against synthetic anomalies injected
+    into recent history; optionally retrain the model with the winner.
+    Called by Typer command in app.py.
+    """
+    setup_logging(config.logs_dir)
+
+    parquet_file = parquet or config.parquet_file
+    model_file = model or config.model_file
+    start = _since(hours)
+
+    X = open_features(parquet_file).slice(start).X
+    logger.info("Tune | rows=%s | target_recall=%s | workers=%s", len(X), target_recall, workers)
+    results, best = tune_isolation_forest(
+        X, target_recall=target_recall, workers=workers, random_state=config.random_state
+    )
+
+    print(tune_frame(results).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if best is None:
+        print(f"⚠️ No candidate reached recall >= {target_recall:.2f}; keeping current model.")
+        return
+
+    print(f"✅ Best: {best.params} (precision={best.precision:.3f}, recall={best.recall:.3f})")
+    if apply:
+        train_isolation_forest(
+            parquet_file, model_file, random_state=config.random_state, start=start, **best.params
+        )
+        print(f"✅ Model trained and saved to {model_file}")
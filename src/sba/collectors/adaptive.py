@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class AdaptiveInterval:
+    """
+    Sampling interval that follows signal volatility.
+
+    Each sample is compared with an exponentially weighted mean / variance
+    (time constant ``tau_s``, so irregular spacing is accounted for). If any
+    metric is ``hot_z`` deviations away, or a detector flagged the sample
+    (``hot=True`` / ``bump()``), the interval is multiplied by ``tighten``;
+    after ``calm_samples`` consecutive samples within ``calm_z`` it is
+    multiplied by ``relax``. It always stays in ``[min_s, max_s]``.
+
+    Non-finite metric values are ignored. Only the spacing changes: callers
+    keep stamping samples with the actual wall-clock time and computing rates
+    over the measured elapsed time.
+    """
+
+    def __init__(
+        self,
+        min_s: float,
+        max_s: float,
+        start_s: Optional[float] = None,
+        tau_s: float = 120.0,
+        hot_z: float = 3.0,
+        calm_z: float = 1.0,
+        tighten: float = 0.5,
+        relax: float = 1.25,
+        calm_samples: int = 5,
+        rel_floor: float = 0.02,
+    ) -> None:
+        if not 0 < min_s <= max_s:
+            raise ValueError("need 0 < min_s <= max_s")
+        if not (0 < tighten < 1 < relax):
+            raise ValueError("need 0 < tighten < 1 < relax")
+        self.min_s = float(min_s)
+        self.max_s = float(max_s)
+        self.interval = float(np.clip(start_s if start_s is not None else max_s, min_s, max_s))
+        self.tau_s = float(tau_s)
+        self.hot_z = float(hot_z)
+        self.calm_z = float(calm_z)
+        self.tighten = float(tighten)
+        self.relax = float(relax)
+        self.calm_samples = int(calm_samples)
+        self.rel_floor = float(rel_floor)
+
+        self._mean: Optional[np.ndarray] = None
+        self._var: Optional[np.ndarray] = None
+        self._last_ts: Optional[float] = None
+        self._calm = 0
+        self._bumped = False
+
+    def bump(self) -> None:
+        """Tighten on the next update (e.g. a detector fired on another thread)."""
+        self._bumped = True
+
+    def zscore(self, x: np.ndarray) -> float:
+        """Largest |z| of ``x`` against the running mean (0 before any data)."""
+        if self._mean is None:
+            return 0.0
+        std = np.sqrt(self._var)
+        std = np.maximum(std, self.rel_floor * np.abs(self._mean) + 1e-6)
+        z = np.abs(x - self._mean) / std
+        z = z[np.isfinite(z)]
+        return float(z.max()) if z.size else 0.0
+
+    def update(self, x: np.ndarray, ts: float, hot: bool = False) -> float:
+        """Fold in one sample taken at ``ts`` (epoch seconds); returns the next interval."""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        ok = np.isfinite(x)
+        if not ok.any():
+            return self.interval
+
+        z = self.zscore(x)
+        hot = hot or self._bumped or z >= self.hot_z
+        self._bumped = False
+
+        if self._mean is None:
+            self._mean = np.where(ok, x, np.nan)
+            self._var = np.zeros_like(x)
+        else:
+            dt = max(0.0, ts - (self._last_ts if self._last_ts is not None else ts))
+            a = 1.0 - math.exp(-dt / self.tau_s) if self.tau_s > 0 else 1.0
+            new = ok & np.isnan(self._mean)      # first finite value of a metric
+            self._mean[new] = x[new]
+            upd = ok & ~new
+            d = x[upd] - self._mean[upd]
+            self._mean[upd] += a * d
+            self._var[upd] = (1.0 - a) * (self._var[upd] + a * d * d)
+        self._last_ts = ts
+
+        if hot:
+            self._calm = 0
+            self.interval = max(self.min_s, self.interval * self.tighten)
+        elif z <= self.calm_z:
+            self._calm += 1
+            if self._calm >= self.calm_samples:
+                self._calm = 0
+                self.interval = min(self.max_s, self.interval * self.relax)
+        else:
+            self._calm = 0
+        return self.interval
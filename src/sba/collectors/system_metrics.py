@@ -19,10 +19,16 @@ class SystemMetrics:
 
 
 def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+    # milliseconds: sub-second / irregular intervals must keep distinct, exact stamps
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
 
 
 def collect_once(prev_net: Any | None, interval_sec: float) -> tuple[SystemMetrics, Any]:
+    """
+    ``interval_sec`` is the time elapsed since ``prev_net`` was read; pass the
+    measured value (not the nominal interval) so rates stay correct when the
+    spacing varies.
+    """
     cpu = psutil.cpu_percent(interval=None)
     mem = psutil.virtual_memory()
     disk = psutil.disk_usage("/")
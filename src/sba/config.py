@@ -21,6 +21,12 @@ class AppConfig(BaseModel):
 
     sample_interval_sec: int = 5
 
+    # Adaptive sampling: interval shrinks when metrics move / detectors fire,
+    # grows back while they are flat (bounds in seconds)
+    adaptive_sampling: bool = False
+    sample_interval_min_sec: float = 1.0
+    sample_interval_max_sec: float = 30.0
+
     # Base dirs (absolute)
     data_dir: Path = ROOT_DIR / "data"
     models_dir: Path = ROOT_DIR / "models"
@@ -32,7 +38,18 @@ class AppConfig(BaseModel):
 
     # ML
     model_file: Path = models_dir / "isoforest.joblib"
+    online_model_file: Path = models_dir / "hst.joblib"
+    seasonal_file: Path = models_dir / "seasonal.joblib"
     random_state: int = 42
 
+    # Anomalies closer than this merge into one incident; raw anomalies kept (GUI)
+    incident_gap_sec: int = 30
+    max_anomalies: int = 100_000
+
+    # GUI: live samples kept in memory (ring buffer, oldest dropped first)
+    session_capacity: int = 86_400
+    session_dir: Path = data_dir / "session"        # snapshot, restored on start
+    session_snapshot_interval_sec: int = 300
+
 
 config = AppConfig()
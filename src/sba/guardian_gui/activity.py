@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer, Signal
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtWidgets import QWidget
+
+ACTIVE = "active"          # owner on screen, app focused
+BACKGROUND = "background"  # owner on screen, another app focused
+HIDDEN = "hidden"          # page not shown, window minimized/hidden
+
+
+@dataclass
+class _Entry:
+    owner: QWidget
+    timer: Optional[QTimer]
+    interval_ms: int
+    on_pause: Optional[Callable[[], None]]
+    on_resume: Optional[Callable[[], None]]
+    background: str            # "slow" or "pause"
+    enabled: Callable[[], bool]
+    level: str = ACTIVE
+    paused: bool = False
+
+
+class ActivityManager(QObject):
+    """
+    One place that decides how much periodic work the UI does.
+
+    Pages register their timers / repaint hooks with the widget that shows
+    them. While the owner is hidden (another page is current, window
+    minimized) its timer is stopped and ``on_pause`` runs; while the app is
+    in the background the timer runs ``background_factor`` times slower (or
+    pauses). Coming back restores the interval and runs ``on_resume`` at
+    once, so the page catches up without waiting for the next tick.
+    """
+    changed = Signal(str)   # app-wide level: active / background / hidden
+
+    def __init__(self, window: QWidget, background_factor: float = 4.0) -> None:
+        super().__init__(window)
+        self.window = window
+        self.background_factor = max(1.0, float(background_factor))
+        self._entries: List[_Entry] = []
+        self._level = ACTIVE
+
+        window.installEventFilter(self)
+        app = QGuiApplication.instance()
+        if app is not None:
+            app.applicationStateChanged.connect(lambda _state: self.reevaluate())
+
+    @property
+    def level(self) -> str:
+        return self._level
+
+    def register(
+        self,
+        owner: QWidget,
+        timer: Optional[QTimer] = None,
+        *,
+        on_pause: Optional[Callable[[], None]] = None,
+        on_resume: Optional[Callable[[], None]] = None,
+        background: str = "slow",
+        enabled: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        Throttle `timer` (its current interval is the active one) and/or call
+        the hooks as `owner` goes off/on screen. `enabled` is consulted before
+        (re)starting the timer, e.g. an "Auto refresh" checkbox.
+        """
+        if background not in ("slow", "pause"):
+            raise ValueError("background must be 'slow' or 'pause'")
+        e = _Entry(
+            owner=owner,
+            timer=timer,
+            interval_ms=timer.interval() if timer is not None else 0,
+            on_pause=on_pause,
+            on_resume=on_resume,
+            background=background,
+            enabled=enabled or (lambda: True),
+        )
+        self._entries.append(e)
+        if owner is not self.window:
+            owner.installEventFilter(self)
+        owner.destroyed.connect(lambda _=None, e=e: self._drop(e))
+        self._apply(e, self._level_for(owner))
+
+    def _drop(self, e: _Entry) -> None:
+        if e in self._entries:
+            self._entries.remove(e)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # noqa: N802
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            # page switches / minimize arrive before visibility settles
+            QTimer.singleShot(0, self.reevaluate)
+        return False
+
+    def _app_level(self) -> str:
+        if not self.window.isVisible() or self.window.isMinimized():
+            return HIDDEN
+        state = QGuiApplication.applicationState()
+        if state in (Qt.ApplicationHidden, Qt.ApplicationSuspended):
+            return HIDDEN
+        if state == Qt.ApplicationInactive:
+            return BACKGROUND
+        return ACTIVE
+
+    def _level_for(self, owner: QWidget) -> str:
+        app = self._app_level()
+        if app == HIDDEN or not owner.isVisible():
+            return HIDDEN
+        return app
+
+    def reevaluate(self) -> None:
+        level = self._app_level()
+        if level != self._level:
+            self._level = level
+            self.changed.emit(level)
+        for e in list(self._entries):
+            self._apply(e, self._level_for(e.owner))
+
+    def _apply(self, e: _Entry, level: str) -> None:
+        pause = level == HIDDEN or (level == BACKGROUND and e.background == "pause")
+        e.level = level
+
+        if e.timer is not None:
+            if pause or not e.enabled():
+                e.timer.stop()
+            else:
+                slow = level == BACKGROUND
+                e.timer.setInterval(int(e.interval_ms * self.background_factor) if slow else e.interval_ms)
+                if not e.timer.isActive():
+                    e.timer.start()
+
+        if pause and not e.paused:
+            e.paused = True
+            if e.on_pause is not None:
+                e.on_pause()
+        elif not pause and e.paused:
+            e.paused = False
+            if e.on_resume is not None:
+                e.on_resume()
+
+    def is_paused(self, owner: QWidget) -> bool:
+        return any(e.paused for e in self._entries if e.owner is owner)
@@ -0,0 +1,145 @@
+"""Columnar, bounded store of raw anomalies.
+
+One preallocated NumPy column per field (ts, metric values, z, score, top
+metric) plus an object column for reason strings. Appends are amortised O(1)
+(capacity doubles up to ``max_rows``); when full, the oldest ``drop_frac`` of
+rows is discarded in one shift, so eviction is amortised O(1) as well.
+
+``dropped`` and ``total`` let a view keep row indices in sync: compared to
+an earlier reading, ``dropped`` grew by the number of rows removed from the
+front and ``total`` by the number appended at the end.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+from sba.guardian_gui.core.records import Anomaly
+
+
+class AnomalyLog:
+    def __init__(self, max_rows: int = 100_000, drop_frac: float = 0.1, initial: int = 1024) -> None:
+        if max_rows < 1:
+            raise ValueError("max_rows must be >= 1")
+        self.max_rows = int(max_rows)
+        self.drop_frac = float(drop_frac)
+        self._n = 0
+        self.dropped = 0   # rows ever evicted from the front
+        self._alloc(min(int(initial), self.max_rows))
+
+    _COLUMNS = {
+        "ts": ((), np.float64),
+        "X": ((4,), np.float64),
+        "z": ((4,), np.float64),
+        "score": ((), np.float64),
+        "metric": ((), np.int8),
+        "reason": ((), object),
+    }
+
+    def _alloc(self, cap: int) -> None:
+        for name, (shape, dtype) in self._COLUMNS.items():
+            new = np.zeros((cap, *shape), dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+        self._cap = cap
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def total(self) -> int:
+        """Rows ever appended."""
+        return self.dropped + self._n
+
+    def _make_room(self, k: int) -> None:
+        if self._n + k <= self._cap:
+            return
+        if self._cap < self.max_rows:
+            self._alloc(min(self.max_rows, max(2 * self._cap, self._n + k)))
+            if self._n + k <= self._cap:
+                return
+        # full: drop the oldest chunk in one shift
+        drop = min(self._n, max(self._n + k - self._cap, int(self._cap * self.drop_frac)))
+        keep = self._n - drop
+        for name in self._COLUMNS:
+            col = getattr(self, name)
+            col[:keep] = col[drop:self._n]
+        self._n = keep
+        self.dropped += drop
+
+    def append(self, a: Anomaly, metric: int) -> None:
+        self._make_room(1)
+        i = self._n
+        self.ts[i] = a.ts
+        self.X[i] = (a.cpu, a.ram, a.disk, a.net_kbps)
+        self.z[i] = a.z
+        self.score[i] = a.score
+        self.metric[i] = metric
+        self.reason[i] = a.reason
+        self._n += 1
+
+    def extend(
+        self, ts: np.ndarray, X: np.ndarray, z: np.ndarray, score: np.ndarray,
+        metric: np.ndarray, reason: np.ndarray,
+    ) -> None:
+        """Bulk append (columns of equal length); keeps at most ``max_rows`` newest."""
+        k = len(ts)
+        if k > self.max_rows:
+            s = slice(k - self.max_rows, k)
+            self.dropped += k - self.max_rows
+            ts, X, z, score, metric, reason = ts[s], X[s], z[s], score[s], metric[s], reason[s]
+            k = self.max_rows
+        self._make_room(k)
+        i, j = self._n, self._n + k
+        self.ts[i:j] = ts
+        self.X[i:j] = X
+        self.z[i:j] = z
+        self.score[i:j] = score
+        self.metric[i:j] = metric
+        self.reason[i:j] = reason
+        self._n = j
+
+    def set_max_rows(self, max_rows: int) -> None:
+        """Change the cap; a smaller one drops the oldest rows beyond it."""
+        if max_rows < 1:
+            raise ValueError("max_rows must be >= 1")
+        self.max_rows = int(max_rows)
+        drop = max(0, self._n - self.max_rows)
+        if drop:
+            for name in self._COLUMNS:
+                col = getattr(self, name)
+                col[:self.max_rows] = col[drop:self._n]
+            self._n = self.max_rows
+            self.dropped += drop
+        if self._cap > self.max_rows:
+            self._alloc(self.max_rows)
+
+    def clear(self) -> None:
+        self.dropped += self._n
+        self._n = 0
+
+    def __getitem__(self, i: int) -> Anomaly:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        x, z = self.X[i], self.z[i]
+        return Anomaly(
+            ts=float(self.ts[i]),
+            cpu=float(x[0]), ram=float(x[1]), disk=float(x[2]), net_kbps=float(x[3]),
+            z=(float(z[0]), float(z[1]), float(z[2]), float(z[3])),
+            score=float(self.score[i]),
+            reason=str(self.reason[i]),
+        )
+
+    def __iter__(self) -> Iterator[Anomaly]:
+        return (self[i] for i in range(self._n))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AnomalyLog):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
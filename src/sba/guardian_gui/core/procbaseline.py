@@ -0,0 +1,168 @@
+"""Per-program CPU / RSS baselines, scored for every process at once.
+
+``ProcBaselines`` keeps an exponentially weighted mean / variance of CPU %
+and RSS per executable identity (the exe path's pool id, or the name's when
+the path is unknown), not per PID: a restarted or forked program is judged
+against what that program usually does. Statistics live in plain arrays
+reached through a pool id -> row lookup array, so ``update(frame)`` scores
+a whole scan against the baselines and then folds it in with fancy indexing
+and ``bincount``, without a Python loop over processes.
+
+All instances of a program in one scan (browser tabs, worker pools) count
+as one EWMA step with their mean and spread, so a program with many
+processes does not adapt faster than one with a single process.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Set, Tuple
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import ProcFrame
+from sba.guardian_gui.core.records import ProcAnomaly
+
+METRICS = ("CPU", "RAM")
+CPU_FLAG = 1
+RAM_FLAG = 2
+
+
+def identity(f: ProcFrame) -> np.ndarray:
+    """Pool id identifying each row's program: exe path, or name if unknown."""
+    empty = f.pool.intern("")
+    return np.where(f.path_id == empty, f.name_id, f.path_id)
+
+
+@dataclass
+class ProcScores:
+    z: np.ndarray         # (n, 2) CPU / RSS z against the program's baseline, NaN while warming up
+    usual: np.ndarray     # (n, 2) the baseline means they were scored against
+    flags: np.ndarray     # int8 bitmask of CPU_FLAG / RAM_FLAG
+    onset: np.ndarray     # bool: flagged now but not in the previous scan
+
+    @property
+    def score(self) -> np.ndarray:
+        """Largest z per row (NaN while warming up)."""
+        return np.fmax(self.z[:, 0], self.z[:, 1])
+
+
+class ProcBaselines:
+    """
+    ``alpha`` is the EWMA weight of one scan; a program is scored only after
+    ``warmup`` scans. A row is flagged when a metric is more than
+    ``z_thresh`` deviations above its baseline and also matters in absolute
+    terms (``min_cpu`` %, ``min_rss`` bytes above the usual RSS), so idle
+    daemons waking up are not reported.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        z_thresh: float = 4.0,
+        warmup: int = 20,
+        min_cpu: float = 5.0,
+        min_rss: float = 64 * 1024 * 1024,
+        cpu_floor: float = 1.0,
+        rss_floor: float = 8 * 1024 * 1024,
+        rss_floor_frac: float = 0.05,
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = float(alpha)
+        self.z_thresh = float(z_thresh)
+        self.warmup = int(warmup)
+        self.min_cpu = float(min_cpu)
+        self.min_rss = float(min_rss)
+        # spread floors: a program that always idles at 0 % is not infinitely surprising
+        self.cpu_floor = float(cpu_floor)
+        self.rss_floor = float(rss_floor)
+        self.rss_floor_frac = float(rss_floor_frac)
+
+        self._row = np.full(0, -1, dtype=np.int64)   # pool id -> row, -1 = no baseline yet
+        self.ident = np.empty(0, dtype=np.int32)     # row -> pool id
+        self.n = np.empty(0, dtype=np.int64)         # scans folded into the row
+        self.mean = np.empty((0, 2))
+        self.var = np.empty((0, 2))
+        self._len = 0
+        self._active: Set[Tuple[int, float]] = set()   # (pid, start) flagged in the last scan
+
+    def __len__(self) -> int:
+        """Number of programs with a baseline."""
+        return self._len
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        """Baseline row of each pool id, allocating rows for unseen ones."""
+        top = int(ids.max()) + 1 if len(ids) else 0
+        if top > len(self._row):
+            self._row = np.concatenate([self._row, np.full(max(top, 2 * len(self._row)) - len(self._row), -1)])
+        r = self._row[ids]
+        new = np.unique(ids[r < 0])
+        if len(new):
+            lo, hi = self._len, self._len + len(new)
+            if hi > len(self.n):
+                grow = max(hi, 2 * len(self.n), 64) - len(self.n)   # double, amortized O(1)
+                self.ident = np.concatenate([self.ident, np.zeros(grow, dtype=np.int32)])
+                self.n = np.concatenate([self.n, np.zeros(grow, dtype=np.int64)])
+                self.mean = np.concatenate([self.mean, np.zeros((grow, 2))])
+                self.var = np.concatenate([self.var, np.zeros((grow, 2))])
+            self._row[new] = np.arange(lo, hi)
+            self.ident[lo:hi] = new
+            self._len = hi
+            r = self._row[ids]
+        return r
+
+    def update(self, f: ProcFrame) -> ProcScores:
+        """Score every row of a scan against its program's baseline, then fold the scan in."""
+        rows = self.rows(identity(f))
+        X = np.column_stack([f.cpu.astype(np.float64), f.rss.astype(np.float64)])
+
+        # 1) score against the baselines as they were before this scan
+        usual = self.mean[rows]
+        std = np.sqrt(self.var[rows])
+        std[:, 0] = np.maximum(std[:, 0], self.cpu_floor)
+        std[:, 1] = np.maximum(std[:, 1], np.maximum(self.rss_floor, self.rss_floor_frac * usual[:, 1]))
+        z = (X - usual) / std
+        z[self.n[rows] < self.warmup] = np.nan
+        with np.errstate(invalid="ignore"):
+            hot = z > self.z_thresh
+        hot[:, 0] &= X[:, 0] >= self.min_cpu
+        hot[:, 1] &= X[:, 1] - usual[:, 1] >= self.min_rss
+        flags = (hot[:, 0] * CPU_FLAG | hot[:, 1] * RAM_FLAG).astype(np.int8)
+
+        # 2) one EWMA step per program with the scan's mean / variance of its processes
+        uniq, inv = np.unique(rows, return_inverse=True)
+        k = np.bincount(inv).astype(np.float64)[:, None]
+        bm = np.column_stack([np.bincount(inv, X[:, j]) for j in range(2)]) / k
+        d = X - bm[inv]
+        bv = np.column_stack([np.bincount(inv, d[:, j] * d[:, j]) for j in range(2)]) / k
+        first = self.n[uniq] == 0
+        m0, v0 = self.mean[uniq], self.var[uniq]
+        a = self.alpha
+        step = bm - m0
+        mean = np.where(first[:, None], bm, m0 + a * step)
+        var = np.where(first[:, None], bv, (1.0 - a) * (v0 + a * step * step) + a * bv)
+        self.mean[uniq], self.var[uniq] = mean, var
+        self.n[uniq] += 1
+
+        # 3) onsets: only the (few) flagged rows touch Python sets
+        flagged = np.flatnonzero(flags)
+        keys = list(zip(f.pid[flagged].tolist(), f.start[flagged].tolist(), strict=True))
+        onset = np.zeros(len(rows), dtype=bool)
+        onset[flagged] = [k not in self._active for k in keys]
+        self._active = set(keys)
+        return ProcScores(z=z, usual=usual, flags=flags, onset=onset)
+
+    def anomalies(self, f: ProcFrame, s: ProcScores) -> List[ProcAnomaly]:
+        """Records for the rows whose flag just started (most deviating metric each)."""
+        out = []
+        for i in np.flatnonzero(s.onset).tolist():
+            zi = np.where(s.flags[i] & np.array([CPU_FLAG, RAM_FLAG]), s.z[i], -np.inf)
+            m = int(np.argmax(zi))
+            value = float(f.cpu[i]) if m == 0 else float(f.rss[i])
+            out.append(ProcAnomaly(
+                ts=f.ts, pid=int(f.pid[i]), name=f.pool[f.name_id[i]],
+                path=f.pool[f.path_id[i]] or f.pool[f.name_id[i]],
+                metric=METRICS[m], value=value, usual=float(s.usual[i, m]), z=float(s.z[i, m]),
+            ))
+        return out
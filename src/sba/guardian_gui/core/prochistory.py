@@ -0,0 +1,147 @@
+"""Per-process CPU / RSS history in one shared ring block.
+
+``ProcHistory`` keeps the last ``depth`` scans of every live process as
+rows of two ``(slots, depth)`` float32 arrays with one shared write column
+(all processes are sampled by the same scan) and one timestamp ring.
+Processes map to rows by (pid, start time); a row is reused after its
+process exits, but not by the scan that notices the exit.
+
+Only the scanning thread touches ``ProcHistory``. Readers on other threads
+(the Processes page) get ``rows()``: a read-only copy of the rows they show,
+taken on the scanning thread and handed over with the frame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import ProcFrame
+
+
+@dataclass(frozen=True)
+class HistoryRows:
+    """Copy of some processes' history, oldest -> newest; row k is slot ``slots[k]``."""
+    slots: np.ndarray       # sorted
+    cpu: np.ndarray         # (k, depth)
+    rss: np.ndarray
+    mean_cpu: np.ndarray    # (k,)
+
+    def _row(self, slot: int) -> int:
+        k = int(np.searchsorted(self.slots, slot))
+        return k if k < len(self.slots) and self.slots[k] == slot else -1
+
+    def series(self, slot: int, which: str = "cpu") -> Optional[np.ndarray]:
+        k = self._row(slot)
+        if k < 0:
+            return None
+        return (self.cpu if which == "cpu" else self.rss)[k]
+
+    def mean(self, slot: int) -> float:
+        k = self._row(slot)
+        return float(self.mean_cpu[k]) if k >= 0 else 0.0
+
+
+class ProcHistory:
+    def __init__(self, depth: int = 120, min_samples: int = 20) -> None:
+        if depth < 2:
+            raise ValueError("depth must be >= 2")
+        self.depth = int(depth)
+        self.min_samples = int(min_samples)
+        self.cpu = np.full((0, self.depth), np.nan, dtype=np.float32)
+        self.rss = np.full((0, self.depth), np.nan, dtype=np.float32)
+        self.ts = np.full(self.depth, np.nan)
+        self.head = -1                          # column of the newest scan
+
+        self._slot: Dict[Tuple[int, float], int] = {}
+        self._free: List[int] = []
+        self._released: List[int] = []          # freed last scan; reusable from the next one
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def order(self) -> np.ndarray:
+        """Ring columns oldest -> newest."""
+        return (self.head + 1 + np.arange(self.depth)) % self.depth
+
+    def update(self, f: ProcFrame) -> np.ndarray:
+        """Record a scan; returns each row's history slot (int32)."""
+        keys = list(zip(f.pid.tolist(), f.start.tolist(), strict=True))
+        slots = np.fromiter((self._slot.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+        seen = set(keys)
+        gone = [k for k in self._slot if k not in seen]
+        self._free.extend(self._released)
+        self._released = [self._slot.pop(k) for k in gone]
+
+        fresh = np.flatnonzero(slots < 0)
+        if len(fresh):
+            new = self._alloc(len(fresh))
+            self.cpu[new] = np.nan
+            self.rss[new] = np.nan
+            slots[fresh] = new
+            for i, s in zip(fresh.tolist(), new.tolist(), strict=True):
+                self._slot[keys[i]] = s
+
+        self.head = (self.head + 1) % self.depth
+        self.ts[self.head] = f.ts
+        self.cpu[:, self.head] = np.nan
+        self.rss[:, self.head] = np.nan
+        self.cpu[slots, self.head] = f.cpu
+        self.rss[slots, self.head] = f.rss
+        return slots.astype(np.int32)
+
+    def _alloc(self, k: int) -> np.ndarray:
+        reuse = [self._free.pop() for _ in range(min(k, len(self._free)))]
+        need = k - len(reuse)
+        if need:
+            cap = len(self.cpu)
+            grow = max(need, cap, 64)           # double, amortized O(1)
+            pad = np.full((grow, self.depth), np.nan, dtype=np.float32)
+            self.cpu = np.concatenate([self.cpu, pad])
+            self.rss = np.concatenate([self.rss, pad])
+            self._free.extend(range(cap + grow - 1, cap + need - 1, -1))
+            reuse.extend(range(cap, cap + need))
+        return np.array(reuse, dtype=np.int64)
+
+    def series(self, slot: int, which: str = "cpu") -> np.ndarray:
+        """One process's history, oldest -> newest (NaN before it was seen)."""
+        block = self.cpu if which == "cpu" else self.rss
+        return block[slot, self.order()]
+
+    def rows(self, slots: np.ndarray) -> HistoryRows:
+        """Read-only copy of `slots`' history (negative slots skipped) for another thread."""
+        u = np.unique(np.asarray(slots, dtype=np.intp))
+        u = u[u >= 0]
+        order = self.order()
+        out = HistoryRows(u, self.cpu[u][:, order], self.rss[u][:, order], self.mean_cpu(u))
+        for a in (out.slots, out.cpu, out.rss, out.mean_cpu):
+            a.setflags(write=False)
+        return out
+
+    def mean_cpu(self, slots: np.ndarray) -> np.ndarray:
+        block = self.cpu[np.asarray(slots, dtype=np.intp)]
+        n = np.isfinite(block).sum(axis=1)
+        total = np.nansum(block, axis=1, dtype=np.float64)
+        return np.divide(total, n, out=np.zeros(len(n)), where=n > 0)
+
+    def leak_slope(self, slots: np.ndarray) -> np.ndarray:
+        """
+        Least-squares RSS slope in bytes/s over each process's window, all
+        rows at once (NaN with fewer than ``min_samples`` points).
+        """
+        y = self.rss[np.asarray(slots, dtype=np.intp)].astype(np.float64)
+        w = np.isfinite(y) & np.isfinite(self.ts)
+        n = w.sum(axis=1)
+        t = np.where(np.isfinite(self.ts), self.ts - np.nanmax(self.ts) if self.head >= 0 else 0.0, 0.0)
+        safe_n = np.maximum(n, 1)
+        tm = (w * t).sum(axis=1) / safe_n
+        ym = np.where(w, y, 0.0).sum(axis=1) / safe_n
+        dt = np.where(w, t - tm[:, None], 0.0)
+        dy = np.where(w, y - ym[:, None], 0.0)
+        sxx = (dt * dt).sum(axis=1)
+        slope = np.divide((dt * dy).sum(axis=1), sxx, out=np.full(len(n), np.nan), where=sxx > 0)
+        slope[n < self.min_samples] = np.nan
+        return slope
@@ -0,0 +1,502 @@
+"""Columnar process snapshots.
+
+``ProcScanner.scan()`` returns a ``ProcFrame``: one NumPy column per metric
+(pid, ppid, start time, cpu %, rss, status code) for every process at once.
+Names and paths are ids into the scanner's ``StringPool`` (each distinct
+string stored once, with its lowercased form for searching).
+
+On Linux it reads ``/proc/[pid]/stat`` directly (one read per process gives
+ppid, state, utime+stime, start time and resident pages) and computes CPU %
+for all processes in one vectorized step against the previous scan, matched
+by (pid, start time) so a recycled PID never inherits another process's
+ticks. Elsewhere it falls back to one ``psutil.process_iter`` pass.
+
+That cheap pass covers every process on every scan. Expensive attributes
+(exe + cmdline, I/O counters, open fds, sockets) are cached per (pid, start)
+and refreshed afterwards, new processes first and then round-robin, only
+while the scan is within ``budget_s``; each attribute has its own refresh
+period and every frame carries when each value was read, so callers can
+tell fresh from stale (or never read).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+# status codes (index into STATUSES), shared by every backend
+STATUSES = (
+    "running", "sleeping", "disk-sleep", "stopped", "tracing-stop",
+    "zombie", "dead", "idle", "waking", "parked", "",
+)
+_STATUS_CODE = {s: i for i, s in enumerate(STATUSES)}
+_LINUX_STATE = {
+    "R": "running", "S": "sleeping", "D": "disk-sleep", "T": "stopped", "t": "tracing-stop",
+    "Z": "zombie", "X": "dead", "x": "dead", "I": "idle", "W": "waking", "P": "parked",
+}
+_STATE_CODE = {k: _STATUS_CODE[v] for k, v in _LINUX_STATE.items()}
+UNKNOWN_STATUS = _STATUS_CODE[""]
+
+# expensive attributes -> refresh period in seconds ("static" = exe + cmdline, read once)
+ATTR_PERIODS: Dict[str, float] = {"static": math.inf, "io": 5.0, "fds": 15.0, "sockets": 30.0}
+
+
+class StringPool:
+    """
+    Append-only string interning. Ids are stable, so frames and views can
+    share one pool; appends from a worker thread are safe for readers of
+    existing ids.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+        self.lower: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, i: int) -> str:
+        return self.strings[i]
+
+    def intern(self, s: str) -> int:
+        i = self._ids.get(s)
+        if i is None:
+            i = len(self.strings)
+            self.strings.append(s)
+            self.lower.append(s.lower())
+            self._ids[s] = i
+        return i
+
+    def intern_many(self, items: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.intern(s) for s in items), dtype=np.int32)
+
+
+@dataclass
+class ProcFrame:
+    ts: float
+    pid: np.ndarray      # int64
+    ppid: np.ndarray     # int64
+    start: np.ndarray    # float64, process start (backend units; identity only)
+    cpu: np.ndarray      # float64, 0..100 of the whole machine
+    rss: np.ndarray      # int64 bytes
+    status: np.ndarray   # int8 index into STATUSES
+    name_id: np.ndarray  # int32 into pool
+    path_id: np.ndarray  # int32 into pool; exe, or "" if unknown / denied / not read yet
+    pool: StringPool
+    # expensive attributes: float64, NaN = unknown / denied / not read yet
+    io_read: Optional[np.ndarray] = None    # bytes read from storage
+    io_write: Optional[np.ndarray] = None   # bytes written to storage
+    fds: Optional[np.ndarray] = None        # open file descriptors / handles
+    sockets: Optional[np.ndarray] = None    # open sockets / connections
+    # attribute (ATTR_PERIODS key) -> epoch seconds of the value in use, NaN = never read
+    read_ts: Dict[str, np.ndarray] = field(default_factory=dict)
+    # filled in by ProcHistory: row in its ring block (-1 = none), RSS slope in bytes/s
+    hist_slot: Optional[np.ndarray] = None
+    leak: Optional[np.ndarray] = None
+    # filled in by ProcBaselines: largest z against the program's baseline (NaN = warming up),
+    # CPU_FLAG / RAM_FLAG bitmask of unusual metrics
+    score: Optional[np.ndarray] = None
+    flags: Optional[np.ndarray] = None
+
+    def __post_init__(self) -> None:
+        n = len(self.pid)
+        for name in ("io_read", "io_write", "fds", "sockets"):
+            if getattr(self, name) is None:
+                setattr(self, name, np.full(n, np.nan))
+        if self.hist_slot is None:
+            self.hist_slot = np.full(n, -1, dtype=np.int32)
+        if self.leak is None:
+            self.leak = np.full(n, np.nan)
+        if self.score is None:
+            self.score = np.full(n, np.nan)
+        if self.flags is None:
+            self.flags = np.zeros(n, dtype=np.int8)
+        for attr in ATTR_PERIODS:
+            if attr not in self.read_ts:
+                self.read_ts[attr] = np.full(n, np.nan)
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def age(self, attr: str) -> np.ndarray:
+        """Seconds since ``attr`` was read for each row (NaN = never)."""
+        return self.ts - self.read_ts[attr]
+
+    @property
+    def name(self) -> List[str]:
+        s = self.pool.strings
+        return [s[i] for i in self.name_id]
+
+    @property
+    def path(self) -> List[str]:
+        s = self.pool.strings
+        return [s[i] for i in self.path_id]
+
+    def take(self, idx: np.ndarray) -> "ProcFrame":
+        """Rows ``idx`` as a new frame (fancy indexing on every column)."""
+        idx = np.asarray(idx, dtype=np.intp)
+        return ProcFrame(
+            ts=self.ts,
+            pid=self.pid[idx], ppid=self.ppid[idx], start=self.start[idx],
+            cpu=self.cpu[idx], rss=self.rss[idx], status=self.status[idx],
+            name_id=self.name_id[idx], path_id=self.path_id[idx], pool=self.pool,
+            io_read=self.io_read[idx], io_write=self.io_write[idx], fds=self.fds[idx],
+            sockets=self.sockets[idx], read_ts={k: v[idx] for k, v in self.read_ts.items()},
+            hist_slot=self.hist_slot[idx], leak=self.leak[idx], score=self.score[idx], flags=self.flags[idx],
+        )
+
+
+def _empty_frame(ts: float, pool: StringPool) -> ProcFrame:
+    i64 = np.empty(0, dtype=np.int64)
+    i32 = np.empty(0, dtype=np.int32)
+    return ProcFrame(ts, i64, i64, np.empty(0), np.empty(0), i64, np.empty(0, dtype=np.int8), i32, i32, pool)
+
+
+class ProcScanner:
+    """
+    Stateful scanner: CPU % is the share of machine time used since the
+    previous ``scan()`` (0 for processes seen for the first time).
+
+    ``budget_s`` bounds a scan's wall time: the cheap pass always completes,
+    expensive attributes are refreshed only until the budget is spent and
+    the rest continue on the next scan (``None`` = refresh everything due).
+    """
+
+    def __init__(
+        self,
+        proc_root: str = "/proc",
+        use_procfs: Optional[bool] = None,
+        pool: Optional[StringPool] = None,
+        budget_s: Optional[float] = None,
+    ) -> None:
+        self.proc_root = proc_root
+        self.pool = pool or StringPool()
+        if use_procfs is None:
+            use_procfs = sys.platform.startswith("linux") and os.path.isdir(proc_root)
+        self.use_procfs = bool(use_procfs)
+        self.budget_s = budget_s
+        self.ncpu = psutil.cpu_count(logical=True) or 1
+
+        self._clk_tck = float(os.sysconf("SC_CLK_TCK")) if hasattr(os, "sysconf") else 100.0
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+        # previous scan, sorted by pid (for vectorized deltas)
+        self._prev_pid = np.empty(0, dtype=np.int64)
+        self._prev_start = np.empty(0)
+        self._prev_ticks = np.empty(0)
+        self._prev_ts: Optional[float] = None
+
+        # expensive attributes per process lifetime: attr -> (pid, start) -> (read ts, value or None)
+        self._attrs: Dict[str, Dict[Tuple[int, float], Tuple[float, Any]]] = {a: {} for a in ATTR_PERIODS}
+        self._cursor = 0   # round-robin position (a pid; the next refresh starts there)
+        if self.use_procfs:
+            self._readers: Dict[str, Callable[[int], Any]] = {
+                "static": self._read_static, "io": self._read_io,
+                "fds": self._read_fds, "sockets": self._read_sockets,
+            }
+        else:
+            self._readers = {
+                "static": self._psutil_static, "io": self._psutil_io,
+                "fds": self._psutil_fds, "sockets": self._psutil_sockets,
+            }
+
+    def cmdline(self, pid: int, start: float) -> str:
+        """Cached command line of a process seen by the last scan ("" if unknown)."""
+        got = self._attrs["static"].get((int(pid), float(start)))
+        return got[1][2] if got else ""
+
+    def scan(self) -> ProcFrame:
+        t0 = time.perf_counter()
+        if self.use_procfs:
+            ts, pid, ppid, start, ticks, rss, status, names = self._scan_procfs()
+        else:
+            ts, pid, ppid, start, ticks, rss, status, names = self._scan_psutil()
+        if len(pid) == 0:
+            self._prev_pid = pid
+            self._prev_ts = ts
+            for cache in self._attrs.values():
+                cache.clear()
+            return _empty_frame(ts, self.pool)
+
+        order = np.argsort(pid, kind="stable")
+        pid, ppid, start, ticks, rss, status = (
+            pid[order], ppid[order], start[order], ticks[order], rss[order], status[order],
+        )
+        names = [names[i] for i in order]
+
+        cpu = np.zeros(len(pid))
+        if self._prev_ts is not None and len(self._prev_pid):
+            dt = ts - self._prev_ts
+            j = np.searchsorted(self._prev_pid, pid)
+            j_ok = np.minimum(j, len(self._prev_pid) - 1)
+            same = (self._prev_pid[j_ok] == pid) & (self._prev_start[j_ok] == start)
+            if dt > 0:
+                dticks = np.where(same, ticks - self._prev_ticks[j_ok], 0.0)
+                cpu = np.clip(dticks / (dt * self.ncpu) * 100.0, 0.0, 100.0)
+        self._prev_pid, self._prev_start, self._prev_ticks, self._prev_ts = pid, start, ticks, ts
+
+        keys = list(zip(pid.tolist(), start.tolist(), strict=True))
+        self._evict(keys)
+        deadline = None if self.budget_s is None else t0 + self.budget_s
+        self._refresh(ts, keys, deadline)
+        return self._frame(ts, keys, pid, ppid, start, np.round(cpu, 1), rss, status, names)
+
+    # -------------------------
+    # Expensive attributes
+    # -------------------------
+    def _evict(self, keys: List[Tuple[int, float]]) -> None:
+        live = set(keys)
+        for cache in self._attrs.values():
+            for k in [k for k in cache if k not in live]:
+                del cache[k]
+
+    def _refresh(self, ts: float, keys: List[Tuple[int, float]], deadline: Optional[float]) -> None:
+        """Read attributes that are due: never-read static ones first, then round-robin."""
+        attrs = self._attrs
+        static = attrs["static"]
+        clock = time.perf_counter
+        for key in keys:
+            if key not in static:
+                if deadline is not None and clock() >= deadline:
+                    return
+                static[key] = (ts, self._readers["static"](key[0]))
+
+        n = len(keys)
+        first = next((i for i, k in enumerate(keys) if k[0] >= self._cursor), 0)
+        periodic = [(a, p, attrs[a], self._readers[a]) for a, p in ATTR_PERIODS.items() if a != "static"]
+        sock = attrs["sockets"]
+        for step in range(n):
+            key = keys[(first + step) % n]
+            for attr, period, cache, read in periodic:
+                got = cache.get(key)
+                if got is not None and ts - got[0] < period:
+                    continue
+                if deadline is not None and clock() >= deadline:
+                    self._cursor = key[0]
+                    return
+                if attr == "fds" and self.use_procfs and self._due(sock, key, ts, ATTR_PERIODS["sockets"]):
+                    # both count /proc/<pid>/fd: list it once (sockets is then fresh)
+                    fds, sockets = self._read_fd_counts(key[0])
+                    cache[key], sock[key] = (ts, fds), (ts, sockets)
+                    continue
+                cache[key] = (ts, read(key[0]))
+
+    @staticmethod
+    def _due(cache: Dict[Tuple[int, float], Tuple[float, Any]], key: Tuple[int, float], ts: float, period: float) -> bool:
+        got = cache.get(key)
+        return got is None or ts - got[0] >= period
+
+    def _frame(self, ts, keys, pid, ppid, start, cpu, rss, status, names) -> ProcFrame:
+        n = len(keys)
+        read_ts = {a: np.full(n, np.nan) for a in ATTR_PERIODS}
+        io_read, io_write, fds, sockets = (np.full(n, np.nan) for _ in range(4))
+        path_id = np.full(n, self.pool.intern(""), dtype=np.int32)
+        name_id = np.empty(n, dtype=np.int32)
+        intern = self.pool.intern
+        static, io, fd, sock = (self._attrs[a] for a in ("static", "io", "fds", "sockets"))
+
+        for i, key in enumerate(keys):
+            name = names[i]
+            got = static.get(key)
+            if got is not None:
+                read_ts["static"][i] = got[0]
+                argv0, exe_id, _cmd = got[1]
+                path_id[i] = exe_id
+                # procfs comm is truncated to 15 chars (and may change); use argv[0] then, like psutil
+                if self.use_procfs and len(name) >= 15 and argv0.startswith(name):
+                    name = argv0
+            name_id[i] = intern(name)
+
+            got = io.get(key)
+            if got is not None:
+                read_ts["io"][i] = got[0]
+                if got[1] is not None:
+                    io_read[i], io_write[i] = got[1]
+            got = fd.get(key)
+            if got is not None:
+                read_ts["fds"][i] = got[0]
+                if got[1] is not None:
+                    fds[i] = got[1]
+            got = sock.get(key)
+            if got is not None:
+                read_ts["sockets"][i] = got[0]
+                if got[1] is not None:
+                    sockets[i] = got[1]
+
+        return ProcFrame(
+            ts, pid, ppid, start, cpu, rss, status, name_id, path_id, self.pool,
+            io_read=io_read, io_write=io_write, fds=fds, sockets=sockets, read_ts=read_ts,
+        )
+
+    # -------------------------
+    # Backends (ticks in seconds of CPU time)
+    # -------------------------
+    def _scan_procfs(self):
+        root = self.proc_root
+        pids: List[int] = []
+        ppids: List[int] = []
+        starts: List[float] = []
+        ticks: List[float] = []
+        rss: List[int] = []
+        status: List[int] = []
+        names: List[str] = []
+
+        with os.scandir(root) as it:
+            entries = [e.name for e in it if e.name.isdigit()]
+        ts = time.time()
+
+        for d in entries:
+            try:
+                with open(f"{root}/{d}/stat", "rb") as f:
+                    raw = f.read()
+            except OSError:
+                continue                       # exited between listdir and open
+            lp, rp = raw.find(b"("), raw.rfind(b")")
+            if lp < 0 or rp < 0:
+                continue
+            fields = raw[rp + 2:].split()
+            if len(fields) < 22:
+                continue
+
+            pids.append(int(d))
+            ppids.append(int(fields[1]))
+            starts.append(float(fields[19]))
+            ticks.append(int(fields[11]) + int(fields[12]))
+            rss.append(int(fields[21]))
+            status.append(_STATE_CODE.get(fields[0].decode(), UNKNOWN_STATUS))
+            names.append(raw[lp + 1:rp].decode("utf-8", "replace"))
+
+        return (
+            ts,
+            np.array(pids, dtype=np.int64),
+            np.array(ppids, dtype=np.int64),
+            np.array(starts, dtype=np.float64),
+            np.array(ticks, dtype=np.float64) / self._clk_tck,
+            np.array(rss, dtype=np.int64) * self._page,
+            np.array(status, dtype=np.int8),
+            names,
+        )
+
+    def _read_static(self, pid: int) -> Tuple[str, int, str]:
+        """(argv[0] basename, exe id, cmdline); empty strings when denied."""
+        base = f"{self.proc_root}/{pid}"
+        try:
+            exe = os.readlink(f"{base}/exe")
+            if exe.endswith(" (deleted)"):
+                exe = exe[:-10]
+        except OSError:
+            exe = ""                           # kernel thread or access denied
+        try:
+            with open(f"{base}/cmdline", "rb") as f:
+                argv = f.read().split(b"\0")
+            cmdline = " ".join(a.decode("utf-8", "replace") for a in argv if a)
+            first = argv[0].decode("utf-8", "replace") if argv and argv[0] else ""
+        except OSError:
+            cmdline, first = "", ""
+        return os.path.basename(first.split(" ")[0]), self.pool.intern(exe), cmdline
+
+    def _read_io(self, pid: int) -> Optional[Tuple[float, float]]:
+        try:
+            with open(f"{self.proc_root}/{pid}/io", "rb") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None                        # other users' processes: root only
+        vals = dict(line.split(b":", 1) for line in lines if b":" in line)
+        try:
+            return float(vals[b"read_bytes"]), float(vals[b"write_bytes"])
+        except (KeyError, ValueError):
+            return None
+
+    def _read_fds(self, pid: int) -> Optional[int]:
+        try:
+            return len(os.listdir(f"{self.proc_root}/{pid}/fd"))
+        except OSError:
+            return None
+
+    def _read_sockets(self, pid: int) -> Optional[int]:
+        return self._read_fd_counts(pid)[1]
+
+    def _read_fd_counts(self, pid: int) -> Tuple[Optional[int], Optional[int]]:
+        """(open fds, sockets among them) from one listing of /proc/<pid>/fd."""
+        base = f"{self.proc_root}/{pid}/fd"
+        try:
+            fds = os.listdir(base)
+        except OSError:
+            return None, None
+        n = 0
+        for fd in fds:
+            try:
+                n += os.readlink(f"{base}/{fd}").startswith("socket:")
+            except OSError:
+                pass                           # closed meanwhile
+        return len(fds), n
+
+    def _scan_psutil(self):
+        pids: List[int] = []
+        ppids: List[int] = []
+        starts: List[float] = []
+        ticks: List[float] = []
+        rss: List[int] = []
+        status: List[int] = []
+        names: List[str] = []
+
+        ts = time.time()
+        attrs = ["pid", "ppid", "name", "status", "create_time", "cpu_times", "memory_info"]
+        for p in psutil.process_iter(attrs=attrs):
+            info = p.info
+            ct = info.get("cpu_times")
+            mi = info.get("memory_info")
+            pids.append(int(info.get("pid") or 0))
+            ppids.append(int(info.get("ppid") or 0))
+            starts.append(float(info.get("create_time") or 0.0))
+            ticks.append(float(ct.user + ct.system) if ct else 0.0)
+            rss.append(int(mi.rss) if mi else 0)
+            status.append(_STATUS_CODE.get(str(info.get("status") or ""), UNKNOWN_STATUS))
+            names.append(str(info.get("name") or ""))
+
+        return (
+            ts,
+            np.array(pids, dtype=np.int64),
+            np.array(ppids, dtype=np.int64),
+            np.array(starts, dtype=np.float64),
+            np.array(ticks, dtype=np.float64),
+            np.array(rss, dtype=np.int64),
+            np.array(status, dtype=np.int8),
+            names,
+        )
+
+    @staticmethod
+    def _psutil_call(pid: int, fn: Callable[[psutil.Process], Any]) -> Any:
+        try:
+            return fn(psutil.Process(pid))
+        except (psutil.Error, OSError, AttributeError, NotImplementedError):
+            return None                        # gone, denied, or not on this platform
+
+    def _psutil_static(self, pid: int) -> Tuple[str, int, str]:
+        exe = self._psutil_call(pid, lambda p: p.exe()) or ""
+        argv = self._psutil_call(pid, lambda p: p.cmdline()) or []
+        first = os.path.basename(argv[0]) if argv else ""
+        return first, self.pool.intern(exe), " ".join(argv)
+
+    def _psutil_io(self, pid: int) -> Optional[Tuple[float, float]]:
+        io = self._psutil_call(pid, lambda p: p.io_counters())
+        return (float(io.read_bytes), float(io.write_bytes)) if io is not None else None
+
+    def _psutil_fds(self, pid: int) -> Optional[int]:
+        if hasattr(psutil.Process, "num_fds"):
+            return self._psutil_call(pid, lambda p: p.num_fds())
+        return self._psutil_call(pid, lambda p: p.num_handles())
+
+    def _psutil_sockets(self, pid: int) -> Optional[int]:
+        conns = self._psutil_call(
+            pid, lambda p: p.net_connections() if hasattr(p, "net_connections") else p.connections()
+        )
+        return len(conns) if conns is not None else None
@@ -0,0 +1,88 @@
+"""Substring search over interned process names / paths.
+
+Queries are answered per distinct string (pool id), not per process:
+``SearchIndex.matches(q)`` returns the ids whose lowercased text contains
+``q``. A query that extends the previous one (typing another character)
+only re-tests the previous hits plus strings interned since. Once the pool
+is large, a trigram index narrows the candidates for a fresh query to
+the ids containing all of its trigrams before any substring test.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import StringPool
+
+
+class SearchIndex:
+    """
+    Incremental substring index over one ``StringPool``. The pool only
+    grows, so new ids are indexed lazily on the next query; a caller on
+    another thread than the pool's writer only ever sees a consistent prefix.
+    """
+
+    def __init__(self, pool: StringPool, trigram_min: int = 2000) -> None:
+        self.pool = pool
+        self.trigram_min = int(trigram_min)
+        self._grams: Optional[Dict[str, List[int]]] = None   # built once the pool is large
+        self._indexed = 0                                   # ids [0, _indexed) are in _grams
+
+        self._last_q = ""
+        self._last_hits: Set[int] = set()
+        self._last_n = 0                                    # pool size when _last_hits was computed
+
+    def _sync_grams(self) -> None:
+        n = len(self.pool)
+        if self._grams is None:
+            if n < self.trigram_min:
+                return
+            self._grams = {}
+        lower = self.pool.lower
+        grams = self._grams
+        for i in range(self._indexed, n):
+            s = lower[i]
+            for g in {s[k:k + 3] for k in range(len(s) - 2)}:
+                grams.setdefault(g, []).append(i)
+        self._indexed = n
+
+    def _candidates(self, q: str, n: int) -> range | List[int] | Set[int]:
+        last = self._last_q
+        if last and last in q and self._last_n <= n:
+            # narrowing: old hits plus whatever was interned since
+            return self._last_hits | set(range(self._last_n, n))
+        self._sync_grams()
+        if self._grams is not None and len(q) >= 3:
+            posting = sorted(
+                (self._grams.get(q[k:k + 3], []) for k in range(len(q) - 2)), key=len
+            )
+            if not posting[0]:
+                return set(range(self._indexed, n))
+            out = set(posting[0])
+            for p in posting[1:]:
+                out.intersection_update(p)
+                if not out:
+                    break
+            out.update(range(self._indexed, n))
+            return out
+        return range(n)
+
+    def matches(self, q: str) -> Set[int]:
+        """Ids of pool strings whose lowercased form contains ``q`` (already lowercase)."""
+        n = len(self.pool)
+        lower = self.pool.lower
+        hits = {i for i in self._candidates(q, n) if q in lower[i]}
+        self._last_q, self._last_hits, self._last_n = q, hits, n
+        return hits
+
+    def accept(self, q: str, pid: np.ndarray, name_id: np.ndarray, path_id: np.ndarray) -> np.ndarray:
+        """Row mask for a table: name or path contains ``q``, or the pid equals it."""
+        if not q:
+            return np.ones(len(pid), dtype=bool)
+        hits = np.fromiter(self.matches(q), dtype=np.int32)
+        mask = np.isin(name_id, hits) | np.isin(path_id, hits)
+        if q.isdigit():
+            mask |= pid == int(q)
+        return mask
@@ -0,0 +1,138 @@
+"""Columnar process table for the Processes page.
+
+``ProcTable`` keeps one NumPy column per field, in view row order, with
+names and paths as ids into the scanner's ``StringPool``. ``plan(frame)``
+matches a new ``ProcFrame`` against the current rows by (pid, start time)
+with a sort + ``searchsorted`` and returns which rows vanished, which
+changed and which are new, so a Qt model can emit minimal row signals;
+``remove`` / ``update`` / ``append`` then apply it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import ProcFrame, StringPool
+
+
+@dataclass
+class TablePlan:
+    removed: np.ndarray   # current rows to delete (ascending)
+    src: np.ndarray       # for each row kept (in order): its index in the frame
+    changed: np.ndarray   # rows (after removal) whose values differ
+    inserted: np.ndarray  # frame indices to append, in frame order
+    values: Dict[str, np.ndarray]   # frame as table columns (strings interned)
+
+
+class ProcTable:
+    _COLUMNS = {
+        "pid": np.int64,
+        "start": np.float64,
+        "ppid": np.int64,
+        "cpu": np.float64,
+        "rss": np.int64,
+        "status": np.int8,
+        "name_id": np.int32,
+        "path_id": np.int32,
+        "io_read": np.float64,
+        "io_write": np.float64,
+        "fds": np.float64,
+        "sockets": np.float64,
+        "hist_slot": np.int32,
+        "leak": np.float64,
+        "score": np.float64,
+        "flags": np.int8,
+    }
+    _VALUES = (
+        "ppid", "cpu", "rss", "status", "name_id", "path_id", "io_read", "io_write", "fds", "sockets",
+        "hist_slot", "leak", "score", "flags",
+    )
+
+    def __init__(self, pool: Optional[StringPool] = None) -> None:
+        self.pool = pool or StringPool()   # replaced by the frames' pool on first plan()
+        self.version = 0                   # bumped on every change (for derived caches)
+        for name, dtype in self._COLUMNS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def plan(self, f: ProcFrame) -> TablePlan:
+        if f.pool is not self.pool:
+            if len(self):
+                raise ValueError("frame uses a different string pool")
+            self.pool = f.pool
+        new = {name: getattr(f, name) for name in self._COLUMNS}
+        m = len(f)
+        if m and len(self):
+            sorter = np.argsort(new["pid"], kind="stable")
+            spid = new["pid"][sorter]
+            pos = np.minimum(np.searchsorted(spid, self.pid), m - 1)
+            j = sorter[pos]
+            found = (spid[pos] == self.pid) & (new["start"][j] == self.start)
+        else:
+            j = np.zeros(len(self), dtype=np.intp)
+            found = np.zeros(len(self), dtype=bool)
+
+        src = j[found]
+        changed = np.zeros(len(src), dtype=bool)
+        for name in self._VALUES:
+            a, b = getattr(self, name)[found], new[name][src]
+            diff = a != b
+            if a.dtype.kind == "f":
+                diff &= ~(np.isnan(a) & np.isnan(b))   # unknown stays unknown
+            changed |= diff
+
+        fresh = np.ones(m, dtype=bool)
+        fresh[src] = False
+        return TablePlan(np.flatnonzero(~found), src, np.flatnonzero(changed), np.flatnonzero(fresh), new)
+
+    def remove(self, lo: int, hi: int) -> None:
+        """Delete rows ``lo..hi`` inclusive."""
+        for name in self._COLUMNS:
+            col = getattr(self, name)
+            setattr(self, name, np.concatenate([col[:lo], col[hi + 1:]]))
+        self.version += 1
+
+    def drop(self, rows: np.ndarray) -> None:
+        """Delete the given rows in one pass."""
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        for name in self._COLUMNS:
+            setattr(self, name, getattr(self, name)[keep])
+        self.version += 1
+
+    def update(self, plan: TablePlan) -> None:
+        """Overwrite kept rows with the frame's values (call after the removals)."""
+        new = plan.values
+        rows = plan.changed
+        for name in self._VALUES:
+            getattr(self, name)[rows] = new[name][plan.src[rows]]
+        self.version += 1
+
+    def append(self, plan: TablePlan) -> None:
+        new = plan.values
+        idx = plan.inserted
+        for name in self._COLUMNS:
+            setattr(self, name, np.concatenate([getattr(self, name), new[name][idx]]))
+        self.version += 1
+
+    def name(self, i: int) -> str:
+        return self.pool[self.name_id[i]]
+
+    def path(self, i: int) -> str:
+        """Executable path, or the name when it is unknown."""
+        return self.pool[self.path_id[i]] or self.pool[self.name_id[i]]
+
+
+def runs(rows: np.ndarray) -> List[tuple[int, int]]:
+    """Sorted row indices -> inclusive (lo, hi) ranges of consecutive rows."""
+    if len(rows) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    lo = np.r_[rows[0], rows[breaks + 1]]
+    hi = np.r_[rows[breaks], rows[-1]]
+    return list(zip(lo.tolist(), hi.tolist(), strict=True))
@@ -0,0 +1,272 @@
+"""Process tree with incrementally maintained subtree totals.
+
+``ProcTree`` stores processes in slot arrays (slots are reused after a
+process exits) with a parent pointer, the slot's position among its
+siblings and per-slot children lists. Each slot also holds the CPU % and
+RSS summed over its subtree. ``update(frame)`` matches processes by
+(pid, start time) and keeps those totals current by pushing deltas up the
+parent pointers (one vectorized step per tree level) for changed values,
+new processes, exits and reparenting, instead of re-summing the tree.
+
+Structure changes are reported to a ``TreeListener`` around each mutation
+so a Qt model can emit exact insert / move / remove signals and views keep
+their expansion state.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import ProcFrame, StringPool
+from sba.guardian_gui.core.proctable import runs
+
+ROOT = -1
+
+
+class TreeListener:
+    """Hooks around ``ProcTree`` changes; parents are slots, ``ROOT`` for top level."""
+
+    def begin_insert(self, parent: int, first: int, last: int) -> None: ...
+    def end_insert(self) -> None: ...
+    def begin_move(self, src_parent: int, row: int, dst_parent: int, dst_row: int) -> None: ...
+    def end_move(self) -> None: ...
+    def begin_remove(self, parent: int, first: int, last: int) -> None: ...
+    def end_remove(self) -> None: ...
+
+    def changed(self, slots: np.ndarray) -> None:
+        """Own values or subtree totals of these (live) slots changed."""
+
+
+class ProcTree:
+    _COLUMNS = {
+        "pid": np.int64,       # -1 = free slot
+        "start": np.float64,
+        "ppid": np.int64,
+        "cpu": np.float64,
+        "rss": np.int64,
+        "status": np.int8,
+        "name_id": np.int32,
+        "path_id": np.int32,
+        "io_read": np.float64,
+        "io_write": np.float64,
+        "fds": np.float64,
+        "sockets": np.float64,
+        "flags": np.int8,
+        "parent": np.int64,    # slot of the parent, ROOT for top level
+        "pos": np.int64,       # index in the parent's children list
+        "sub_cpu": np.float64,  # cpu of the slot and all descendants
+        "sub_rss": np.int64,
+    }
+    _VALUES = ("ppid", "cpu", "rss", "status", "name_id", "path_id", "io_read", "io_write", "fds", "sockets", "flags")
+
+    def __init__(self, pool: Optional[StringPool] = None) -> None:
+        self.pool = pool or StringPool()   # replaced by the frames' pool on first update()
+        self.version = 0                   # bumped on every change (for derived caches)
+        for name, dtype in self._COLUMNS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self.roots: List[int] = []
+        self.children: List[List[int]] = []
+        self._slot: Dict[Tuple[int, float], int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        """Number of live processes (slot arrays may be longer)."""
+        return len(self._slot)
+
+    def kids(self, slot: int) -> List[int]:
+        return self.roots if slot == ROOT else self.children[slot]
+
+    def name(self, s: int) -> str:
+        return self.pool[self.name_id[s]]
+
+    def path(self, s: int) -> str:
+        """Executable path, or the name when it is unknown."""
+        return self.pool[self.path_id[s]] or self.pool[self.name_id[s]]
+
+    def depth(self, slots: np.ndarray) -> np.ndarray:
+        d = np.zeros(len(slots), dtype=np.int64)
+        cur = np.asarray(slots, dtype=np.int64)
+        live = np.ones(len(cur), dtype=bool)
+        for _ in range(len(self.pid) + 1):
+            up = np.where(live, self.parent[cur], ROOT)
+            live = up != ROOT
+            if not live.any():
+                break
+            d += live
+            cur = np.where(live, up, 0)
+        return d
+
+    # -------------------------
+    # Incremental update
+    # -------------------------
+    def update(self, f: ProcFrame, listener: Optional[TreeListener] = None) -> None:
+        lst = listener or TreeListener()
+        if f.pool is not self.pool:
+            if len(self):
+                raise ValueError("frame uses a different string pool")
+            self.pool = f.pool
+        keys = list(zip(f.pid.tolist(), f.start.tolist(), strict=True))
+        slots = np.fromiter((self._slot.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+        old = slots >= 0
+        seen = np.zeros(len(self.pid), dtype=bool)
+        seen[slots[old]] = True
+        gone = np.flatnonzero((self.pid >= 0) & ~seen)
+
+        # 1) values of known processes; deltas go up the current parent chains
+        sub_before = (self.sub_cpu.copy(), self.sub_rss.copy())
+        kept, src = slots[old], np.flatnonzero(old)
+        changed = np.zeros(len(kept), dtype=bool)
+        for name in self._VALUES:
+            a, b = getattr(self, name)[kept], getattr(f, name)[src]
+            diff = a != b
+            if a.dtype.kind == "f":
+                diff &= ~(np.isnan(a) & np.isnan(b))   # unknown stays unknown
+            changed |= diff
+        self._propagate(kept, f.cpu[src] - self.cpu[kept], f.rss[src] - self.rss[kept])
+        for name in self._VALUES:
+            getattr(self, name)[kept] = getattr(f, name)[src]
+        own_changed = kept[changed]
+
+        # 2) slots for new processes (attached below)
+        fresh = np.flatnonzero(~old)
+        slots[fresh] = self._alloc(len(fresh))
+        for name in ("pid", "start") + self._VALUES:
+            getattr(self, name)[slots[fresh]] = getattr(f, name)[fresh]
+        self.sub_cpu[slots[fresh]] = f.cpu[fresh]
+        self.sub_rss[slots[fresh]] = f.rss[fresh]
+        for i in fresh.tolist():
+            self._slot[keys[i]] = int(slots[i])
+        self.version += 1
+
+        # parent each process should have now
+        by_pid = dict(zip(f.pid.tolist(), slots.tolist(), strict=True))
+        want = np.fromiter(
+            (by_pid.get(pp, ROOT) if pp != p else ROOT for p, pp in zip(f.pid.tolist(), f.ppid.tolist(), strict=True)),
+            dtype=np.int64, count=len(keys),
+        )
+
+        # 3) insert new processes, parents before children, one signal per sibling group
+        self._insert(slots[fresh], want[fresh], lst)
+
+        # 4) move known processes whose parent changed (incl. orphans of exited ones)
+        moving = np.flatnonzero(old & (want != self.parent[slots]))
+        for i in moving.tolist():
+            self._move(int(slots[i]), int(want[i]), lst)
+
+        # 5) remove exited processes, deepest first (their live children moved already)
+        self._remove(gone, lst)
+        self.version += 1
+
+        n = len(sub_before[0])
+        live = np.flatnonzero(self.pid[:n] >= 0)
+        totals = live[(self.sub_cpu[live] != sub_before[0][live]) | (self.sub_rss[live] != sub_before[1][live])]
+        touched = np.union1d(own_changed, totals)
+        if len(touched):
+            lst.changed(touched)
+
+    def _alloc(self, k: int) -> np.ndarray:
+        reuse = [self._free.pop() for _ in range(min(k, len(self._free)))]
+        need = k - len(reuse)
+        if need:
+            cap = len(self.pid)
+            grow = max(need, cap)            # double, amortized O(1)
+            for name, dtype in self._COLUMNS.items():
+                pad = np.full(grow, -1 if name in ("pid", "parent") else 0, dtype=dtype)
+                setattr(self, name, np.concatenate([getattr(self, name), pad]))
+            self.children.extend([] for _ in range(grow))
+            self._free.extend(range(cap + grow - 1, cap + need - 1, -1))
+            reuse.extend(range(cap, cap + need))
+        return np.array(reuse, dtype=np.int64)
+
+    def _propagate(self, nodes: np.ndarray, dcpu: np.ndarray, drss: np.ndarray) -> None:
+        """Add deltas to the subtree totals of ``nodes`` and all their ancestors."""
+        cur = np.asarray(nodes, dtype=np.int64)
+        dcpu = np.broadcast_to(np.asarray(dcpu, dtype=np.float64), cur.shape)
+        drss = np.broadcast_to(np.asarray(drss, dtype=np.int64), cur.shape)
+        for _ in range(len(self.pid) + 1):
+            if not len(cur):
+                break
+            np.add.at(self.sub_cpu, cur, dcpu)
+            np.add.at(self.sub_rss, cur, drss)
+            up = self.parent[cur]
+            keep = up != ROOT
+            cur, dcpu, drss = up[keep], dcpu[keep], drss[keep]
+
+    def _insert(self, new: np.ndarray, want: np.ndarray, lst: TreeListener) -> None:
+        pending = set(new.tolist())
+        order = list(zip(new.tolist(), want.tolist(), strict=True))
+        while order:
+            ready = [(s, p) for s, p in order if p not in pending]
+            if not ready:                    # ppid cycle among new processes
+                ready = [(s, ROOT) for s, _p in order]
+            groups: Dict[int, List[int]] = defaultdict(list)
+            for s, p in ready:
+                groups[p].append(s)
+            for p, group in groups.items():
+                kids = self.kids(p)
+                first = len(kids)
+                lst.begin_insert(p, first, first + len(group) - 1)
+                kids.extend(group)
+                g = np.array(group, dtype=np.int64)
+                self.parent[g] = p
+                self.pos[g] = np.arange(first, first + len(group))
+                lst.end_insert()
+            # one pass up the tree for the whole round
+            g = np.array([s for s, p in ready if p != ROOT], dtype=np.int64)
+            if len(g):
+                self._propagate(self.parent[g], self.sub_cpu[g], self.sub_rss[g])
+            done = {s for s, _p in ready}
+            pending -= done
+            order = [(s, p) for s, p in order if s not in done]
+
+    def _move(self, s: int, p: int, lst: TreeListener) -> None:
+        up = p
+        while up != ROOT:                    # never under its own subtree
+            if up == s:
+                p = ROOT
+                break
+            up = int(self.parent[up])
+        old = int(self.parent[s])
+        if p == old:
+            return
+        row = int(self.pos[s])
+        src, dst = self.kids(old), self.kids(p)
+        lst.begin_move(old, row, p, len(dst))
+        del src[row]
+        self.pos[np.array(src[row:], dtype=np.int64)] = np.arange(row, len(src))
+        if old != ROOT:
+            self._propagate(np.array([old]), -self.sub_cpu[s], -self.sub_rss[s])
+        self.parent[s] = p
+        self.pos[s] = len(dst)
+        dst.append(s)
+        if p != ROOT:
+            self._propagate(np.array([p]), self.sub_cpu[s], self.sub_rss[s])
+        lst.end_move()
+
+    def _remove(self, gone: np.ndarray, lst: TreeListener) -> None:
+        if not len(gone):
+            return
+        depth = self.depth(gone)
+        for d in sorted(set(depth.tolist()), reverse=True):
+            level = gone[depth == d]
+            for p in np.unique(self.parent[level]).tolist():
+                group = level[self.parent[level] == p]
+                if p != ROOT:
+                    self._propagate(np.array([p]), -self.sub_cpu[group].sum(), -self.sub_rss[group].sum())
+                kids = self.kids(p)
+                for lo, hi in reversed(runs(np.sort(self.pos[group]))):
+                    lst.begin_remove(p, lo, hi)
+                    del kids[lo:hi + 1]
+                    self.pos[np.array(kids[lo:], dtype=np.int64)] = np.arange(lo, len(kids))
+                    lst.end_remove()
+            for s in level.tolist():
+                del self._slot[(int(self.pid[s]), float(self.start[s]))]
+                self.pid[s] = -1
+                self.parent[s] = ROOT
+                self.sub_cpu[s] = 0.0
+                self.sub_rss[s] = 0
+                self.children[s] = []
+            self._free.extend(level.tolist())
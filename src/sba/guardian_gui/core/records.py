@@ -0,0 +1,48 @@
+"""Plain records shared by the Guardian session and its stores."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Sample:
+    ts: float
+    cpu: float
+    ram: float
+    disk: float
+    net_kbps: float
+
+
+@dataclass(frozen=True)
+class Model:
+    mean: np.ndarray  # shape (4,)
+    std: np.ndarray   # shape (4,)
+    trained_on: int
+
+
+@dataclass(frozen=True)
+class Anomaly:
+    ts: float
+    cpu: float
+    ram: float
+    disk: float
+    net_kbps: float
+    z: Tuple[float, float, float, float]
+    score: float
+    reason: str
+
+
+@dataclass(frozen=True)
+class ProcAnomaly:
+    ts: float
+    pid: int
+    name: str
+    path: str
+    metric: str      # "CPU" or "RAM"
+    value: float     # CPU % or RSS bytes
+    usual: float     # the program's baseline mean, same unit
+    z: float
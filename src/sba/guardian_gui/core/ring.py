@@ -0,0 +1,113 @@
+"""Fixed-capacity columnar ring buffer for live samples.
+
+Storage is preallocated once: a float64 timestamp column and an (n, F)
+float64 value matrix. Every row is written twice, at ``i`` and ``i + capacity``
+("mirrored" ring), so the most recent ``k`` rows are always one contiguous
+slice. Appending is O(1) and ``window(k)`` returns views, never copies;
+memory stays at ``2 * capacity`` rows whatever the run length.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SampleRing:
+    def __init__(self, capacity: int, n_features: int = 4) -> None:
+        if capacity < 1 or n_features < 1:
+            raise ValueError("capacity and n_features must be >= 1")
+        self.capacity = int(capacity)
+        self.n_features = int(n_features)
+
+        self._ts = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._X = np.zeros((2 * self.capacity, self.n_features), dtype=np.float64)
+        self._head = 0      # next write slot, in [0, capacity)
+        self._size = 0
+        self._total = 0     # rows ever appended (also counts overwritten ones)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def nbytes(self) -> int:
+        return self._ts.nbytes + self._X.nbytes
+
+    def append(self, ts: float, row: Sequence[float]) -> None:
+        i = self._head
+        j = i + self.capacity
+        self._ts[i] = self._ts[j] = ts
+        self._X[i] = row
+        self._X[j] = self._X[i]
+
+        self._head = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self._total += 1
+
+    def extend(self, ts: np.ndarray, X: np.ndarray) -> None:
+        """Append a batch of rows (oldest first) with vectorized writes."""
+        k = len(ts)
+        if k == 0:
+            return
+        if k > self.capacity:
+            ts, X = ts[k - self.capacity:], X[k - self.capacity:]
+        m = len(ts)
+        pos = (self._head + np.arange(m)) % self.capacity
+        self._ts[pos] = self._ts[pos + self.capacity] = ts
+        self._X[pos] = X
+        self._X[pos + self.capacity] = self._X[pos]
+
+        self._head = int((self._head + m) % self.capacity)
+        self._size = min(self._size + m, self.capacity)
+        self._total += k
+
+    def load(self, ts: np.ndarray, X: np.ndarray, total: Optional[int] = None) -> None:
+        """
+        Replace the contents with ``ts``/``X`` (oldest first) in one bulk copy;
+        only the newest ``capacity`` rows are kept. ``total`` restores the
+        lifetime row counter (defaults to ``len(ts)``).
+        """
+        n = len(ts)
+        k = min(n, self.capacity)
+        cap = self.capacity
+        self._ts[:k] = ts[n - k:]
+        self._X[:k] = X[n - k:]
+        self._ts[cap:cap + k] = self._ts[:k]
+        self._X[cap:cap + k] = self._X[:k]
+
+        self._head = k % cap
+        self._size = k
+        self._total = n if total is None else max(int(total), k)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+        self._total = 0
+
+    def window(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Oldest-to-newest ``(ts, X)`` views over the last ``n`` rows (all rows if
+        ``n`` is None or <= 0). Read-only; they alias the buffer, so copy them if
+        they must outlive later appends.
+        """
+        k = self._size if not n or n <= 0 else min(int(n), self._size)
+        end = self._head + self.capacity
+        ts = self._ts[end - k:end]
+        X = self._X[end - k:end]
+        ts.flags.writeable = False
+        X.flags.writeable = False
+        return ts, X
+
+    def last(self) -> Optional[Tuple[float, np.ndarray]]:
+        """``(ts, row view)`` of the newest row, or None when empty."""
+        if self._size == 0:
+            return None
+        i = self._head - 1 + self.capacity
+        row = self._X[i]
+        row.flags.writeable = False
+        return float(self._ts[i]), row
@@ -1,114 +1,373 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 import numpy as np
 
+from sba.guardian_gui.core.anomaly_log import AnomalyLog
+from sba.guardian_gui.core.records import Anomaly, Model, Sample
+from sba.guardian_gui.core.ring import SampleRing
+from sba.guardian_gui.core.stats import EwmaStats, RunningStats, WindowStats, snapshot_std
+from sba.ml.detectors import Detector, HalfSpaceTreesDetector
+from sba.ml.incidents import Incident, IncidentBuilder
+from sba.ml.seasonal import SeasonalBaseline
+from sba.ml.sketch import RobustStats
 
-@dataclass(frozen=True)
-class Sample:
-    ts: float
-    cpu: float
-    ram: float
-    disk: float
-    net_kbps: float
+LABELS = ("CPU", "RAM", "Disk", "Net")
 
 
 @dataclass(frozen=True)
-class Model:
-    mean: np.ndarray  # shape (4,)
-    std: np.ndarray   # shape (4,)
-    trained_on: int
+class Detection:
+    """
+    Batch z-score detection over a window, one entry per sample (columnar).
+    ``metric`` is the index of the metric with the largest |z| (see LABELS);
+    ``seasonal`` marks rows scored against the time-of-week baseline.
+    """
 
+    ts: np.ndarray        # (n,)
+    X: np.ndarray         # (n, 4)
+    z: np.ndarray         # (n, 4)
+    scores: np.ndarray    # (n,)  max |z|
+    metric: np.ndarray    # (n,)  int
+    seasonal: np.ndarray  # (n,)  bool
+    is_anomaly: np.ndarray  # (n,) bool
 
-@dataclass(frozen=True)
-class Anomaly:
-    ts: float
-    cpu: float
-    ram: float
-    disk: float
-    net_kbps: float
-    z: Tuple[float, float, float, float]
-    score: float
-    reason: str
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    @property
+    def reasons(self) -> np.ndarray:
+        """Reason strings for every row, e.g. ``"CPU z=4.20 (seasonal)"``."""
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=object)
+        zsel = self.z[np.arange(n), self.metric]
+        out = np.char.add(np.asarray(LABELS)[self.metric], " z=")
+        out = np.char.add(out, np.char.mod("%.2f", zsel))
+        out = np.char.add(out, np.where(self.seasonal, " (seasonal)", ""))
+        return out.astype(object)
+
+    def anomalies(self) -> List[Anomaly]:
+        idx = np.flatnonzero(self.is_anomaly)
+        reasons = self.reasons[idx] if idx.size else []
+        return [
+            Anomaly(
+                ts=float(self.ts[i]),
+                cpu=float(self.X[i, 0]),
+                ram=float(self.X[i, 1]),
+                disk=float(self.X[i, 2]),
+                net_kbps=float(self.X[i, 3]),
+                z=tuple(float(v) for v in self.z[i]),
+                score=float(self.scores[i]),
+                reason=str(r),
+            )
+            for i, r in zip(idx, reasons, strict=True)
+        ]
 
 
 class Session:
     """
-    Stores samples, trains a baseline model (mean/std), runs z-score detection.
+    Keeps the last `capacity` samples in a columnar ring buffer and running
+    mean/std statistics (cumulative, last `window` samples, EWMA) updated per
+    sample, so training a baseline model is a snapshot; a median/MAD variant
+    (streaming quantile sketches) is robust to spikes. Runs z-score detection.
+    Optionally keeps a streaming detector (any ``sba.ml.detectors.Detector``,
+    Half-Space Trees by default) learning on every sample, and a seasonal
+    (time-of-week) baseline that replaces mean/std wherever its bucket is filled.
     """
 
-    def __init__(self) -> None:
-        self.samples: List[Sample] = []
+    def __init__(
+        self,
+        capacity: int = 86_400,
+        window: int = 300,
+        alpha: float = 0.02,
+        max_anomalies: int = 100_000,
+        incident_gap_s: float = 30.0,
+    ) -> None:
+        # columns: cpu, ram, disk, net_kbps
+        self.buffer = SampleRing(capacity, n_features=4)
+        self.cumulative = RunningStats(4)
+        self.rolling = WindowStats(window, 4)
+        self.ewma = EwmaStats(alpha, 4)
+        self.robust = RobustStats(4, half_life=window)
         self.model: Optional[Model] = None
-        self.anomalies: List[Anomaly] = []
+        # raw anomalies are capped; incidents merge runs of them (gap <= incident_gap_s)
+        self.anomalies = AnomalyLog(max_rows=max_anomalies)
+        self.incidents = IncidentBuilder((*LABELS, "—"), gap_s=incident_gap_s)
+
+        self.online: Optional[Detector] = None
+        self._online_last: Optional[float] = None  # online score of the last sample
+        self._online_scores = np.empty(0)           # per sample of the last batch (NaN: unscored)
+
+        self.seasonal: Optional[SeasonalBaseline] = None
+
+    def enable_online(self, detector: Optional[Detector] = None) -> None:
+        """
+        Attach a streaming detector. It scores each new sample against what it
+        has learned so far, then learns from it; no explicit training needed.
+        Pick detectors with a cheap ``partial_fit`` (hst, zscore, ewma, mad).
+        """
+        self.online = detector or HalfSpaceTreesDetector(window_size=120, contamination=0.005)
+        self._online_last = None
+        self._online_scores = np.empty(0)
+
+    def enable_seasonal(self, baseline: Optional[SeasonalBaseline] = None) -> None:
+        """Attach a seasonal baseline (4 metrics: cpu, ram, disk, net); updated per sample."""
+        self.seasonal = baseline or SeasonalBaseline()
 
     def add(self, s: Sample) -> None:
-        self.samples.append(s)
+        self.add_samples([s])
+
+    def add_samples(self, samples: Sequence[Sample]) -> None:
+        ts = np.fromiter((s.ts for s in samples), dtype=np.float64, count=len(samples))
+        X = np.array([(s.cpu, s.ram, s.disk, s.net_kbps) for s in samples], dtype=np.float64)
+        self.add_batch(ts, X.reshape(-1, 4))
+
+    def add_batch(self, ts: np.ndarray, X: np.ndarray) -> None:
+        """
+        Append a batch of samples (oldest first) and update every running
+        statistic / learner once for the whole batch. The streaming detector
+        scores the batch against what it knew before it, then learns from it.
+        """
+        if len(ts) == 0:
+            return
+        self.buffer.extend(ts, X)
+        finite = np.isfinite(X).all(axis=1)
+        F, tf = (X, ts) if finite.all() else (X[finite], ts[finite])
+
+        if len(F):
+            self.cumulative.update_batch(F)
+            self.rolling.update_batch(F)
+            self.ewma.update_batch(F)
+            self.robust.update_batch(F)
+            if self.seasonal is not None:
+                self.seasonal.partial_fit(F, tf)
+
+        if self.online is not None:
+            scores = np.full(len(ts), np.nan)
+            if len(F):
+                F32 = F.astype(np.float32)
+                if self.online.is_fitted:
+                    scores[finite] = self.online.score_batch(F32)
+                self.online.partial_fit(F32)
+            self._online_scores = scores
+            self._online_last = None if np.isnan(scores[-1]) else float(scores[-1])
 
     def count(self) -> int:
-        return len(self.samples)
+        return len(self.buffer)
+
+    def last(self) -> Optional[Sample]:
+        item = self.buffer.last()
+        if item is None:
+            return None
+        ts, x = item
+        return Sample(ts=ts, cpu=float(x[0]), ram=float(x[1]), disk=float(x[2]), net_kbps=float(x[3]))
+
+    def window(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Read-only ``(ts, X)`` views over the last `n` samples (all if None)."""
+        return self.buffer.window(n)
+
+    def thresholds(
+        self, warn_q: float = 0.95, crit_q: float = 0.99, min_samples: int = 300
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Recent (warn, crit) percentiles per metric, or None until `min_samples` seen."""
+        if self.robust.n < min_samples:
+            return None
+        return self.robust.quantile(warn_q), self.robust.quantile(crit_q)
 
     def can_train(self, min_samples: int = 60) -> bool:
-        return len(self.samples) >= min_samples
+        return len(self.buffer) >= min_samples
 
-    def train(self, window: Optional[int] = None) -> Model:
+    def train(self, window: Optional[int] = None, ewma: bool = False, robust: bool = False) -> Model:
         """
-        Train baseline on all samples or last `window` samples.
+        Train baseline on all samples seen, the last `window` samples, or
+        (with `ewma`) the exponentially weighted statistics. With `robust`,
+        use median and 1.4826 * MAD over recent history (half-life = the
+        rolling window) instead, so one spike does not inflate the baseline.
+        Constant time unless `window` differs from the session's rolling window.
         """
-        if not self.samples:
+        if not len(self.buffer):
             raise ValueError("No samples to train on.")
 
-        data = self.samples[-window:] if window and window > 0 else self.samples
-        X = np.array([[s.cpu, s.ram, s.disk, s.net_kbps] for s in data], dtype=float)
+        if robust and self.robust.n > 0:
+            std = snapshot_std(self.robust.spread)
+            m = Model(mean=self.robust.median, std=std, trained_on=self.robust.n)
+            self.model = m
+            return m
+
+        if ewma:
+            stats = self.ewma
+        elif not window or window <= 0:
+            stats = self.cumulative
+        elif window == self.rolling.window:
+            stats = self.rolling
+        else:
+            stats = None
 
-        mean = X.mean(axis=0)
-        std = X.std(axis=0)
+        if stats is not None and stats.n > 0:
+            mean, std, n = stats.mean.copy(), stats.std, stats.n
+        else:
+            _, X = self.buffer.window(window)
+            mean, std, n = X.mean(axis=0), X.std(axis=0), len(X)
 
         # avoid division by zero
-        std = np.where(std < 1e-6, 1.0, std)
+        std = snapshot_std(std)
 
-        m = Model(mean=mean, std=std, trained_on=len(data))
+        m = Model(mean=mean, std=std, trained_on=n)
         self.model = m
         return m
 
     def can_detect(self) -> bool:
-        return self.model is not None and len(self.samples) > 0
+        return self.model is not None and len(self.buffer) > 0
+
+    def _score(self, ts: np.ndarray, X: np.ndarray, z_thresh: float) -> Detection:
+        """z-scores against the model, or the seasonal bucket wherever it is filled."""
+        mean = np.broadcast_to(self.model.mean, X.shape)
+        std = np.broadcast_to(self.model.std, X.shape)
+        seasonal = np.zeros(len(ts), dtype=bool)
+
+        # time-of-week expectation, once that bucket has seen enough samples
+        if self.seasonal is not None and self.seasonal.is_fitted and len(ts):
+            seasonal = self.seasonal.count_[self.seasonal.bucket_of(ts)] >= self.seasonal.min_count
+            if seasonal.any():
+                center, spread = self.seasonal.expected(ts)
+                mean = np.where(seasonal[:, None], center, mean)
+                std = np.where(seasonal[:, None], spread, std)
+
+        z = (X - mean) / std
+        absz = np.abs(z)
+        metric = absz.argmax(axis=1) if len(ts) else np.zeros(0, dtype=np.intp)
+        scores = absz.max(axis=1, initial=0.0)
+        return Detection(
+            ts=ts, X=X, z=z, scores=scores, metric=metric, seasonal=seasonal,
+            is_anomaly=scores >= z_thresh,
+        )
+
+    def detect_range(
+        self, start: Optional[float] = None, end: Optional[float] = None, z_thresh: float = 3.0
+    ) -> Detection:
+        """
+        Score every retained sample with ``start <= ts < end`` in one vectorized
+        pass (e.g. to re-evaluate history after retraining). Nothing is recorded.
+        """
+        if self.model is None:
+            raise ValueError("Train the model first.")
+        ts, X = self.buffer.window()
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="left"))
+        return self._score(ts[lo:hi], X[lo:hi], z_thresh)
+
+    def redetect(
+        self, start: Optional[float] = None, end: Optional[float] = None, z_thresh: float = 3.0
+    ) -> Detection:
+        """detect_range() whose flagged rows replace the recorded anomalies and incidents."""
+        det = self.detect_range(start, end, z_thresh)
+        self.clear_anomalies()
+
+        idx = np.flatnonzero(det.is_anomaly)
+        reasons = det.reasons[idx] if idx.size else np.empty(0, dtype=object)
+        self.anomalies.extend(det.ts[idx], det.X[idx], det.z[idx], det.scores[idx], det.metric[idx], reasons)
+        for i, r in zip(idx, reasons, strict=True):
+            self.incidents.add(float(det.ts[i]), float(det.scores[i]), int(det.metric[i]), r)
+        return det
+
+    def _record(self, a: Anomaly) -> Incident:
+        z = np.abs(a.z)
+        metric = int(z.argmax()) if z.any() else len(LABELS)
+        self.anomalies.append(a, metric)
+        return self.incidents.add(a.ts, a.score, metric, a.reason)
+
+    def clear_anomalies(self) -> None:
+        self.anomalies.clear()
+        self.incidents.clear()
+
+    def detect_batch(self, n: int, z_thresh: float = 3.0, record: bool = True) -> List[Anomaly]:
+        """z-score the newest `n` samples in one pass; returns (and records) the anomalies."""
+        if not self.can_detect() or n <= 0:
+            return []
+        ts, X = self.buffer.window(n)
+        found = self._score(ts, X, z_thresh).anomalies()
+        if record:
+            for a in found:
+                self._record(a)
+        return found
+
+    def detect_recent(self, n: int, z_thresh: float = 3.0) -> List[Anomaly]:
+        """
+        Anomalies among the newest `n` samples (normally the last added batch):
+        baseline z-scores if a model is trained, plus streaming-detector hits
+        on the samples the baseline didn't flag. Recorded in time order.
+        """
+        found = self.detect_batch(n, z_thresh, record=False) if self.model is not None else []
+        found += self.detect_online_batch(skip_ts=[a.ts for a in found], record=False)
+        found.sort(key=lambda a: a.ts)
+        for a in found:
+            self._record(a)
+        return found
 
     def detect_last(self, z_thresh: float = 3.0) -> Optional[Anomaly]:
         """
         Detect anomaly on last sample using z-score.
         Returns Anomaly or None.
         """
-        if not self.can_detect():
-            return None
+        found = self.detect_batch(1, z_thresh)
+        return found[0] if found else None
 
-        s = self.samples[-1]
-        x = np.array([s.cpu, s.ram, s.disk, s.net_kbps], dtype=float)
-
-        mean = self.model.mean
-        std = self.model.std
+    def detect_online_batch(
+        self, skip_ts: Optional[Sequence[float]] = None, record: bool = True
+    ) -> List[Anomaly]:
+        """
+        Anomalies in the last added batch according to the streaming detector
+        (samples whose ts is in `skip_ts` are ignored, e.g. already flagged by
+        the baseline). z/reason come from the baseline model if one is trained.
+        """
+        return self._online_anomalies(self._online_scores, skip_ts, record)
 
-        z = (x - mean) / std
-        score = float(np.max(np.abs(z)))
+    def _online_anomalies(
+        self, scores: np.ndarray, skip_ts: Optional[Sequence[float]], record: bool
+    ) -> List[Anomaly]:
+        """Anomalies among the newest ``len(scores)`` samples, given their online scores."""
+        k = len(scores)
+        if self.online is None or k == 0 or k > len(self.buffer):
+            return []
+        hit = np.nan_to_num(scores, nan=-np.inf) >= self.online.threshold_
+        ts, X = self.buffer.window(k)
+        if skip_ts:
+            hit &= ~np.isin(ts, np.asarray(skip_ts, dtype=np.float64))
+        if not hit.any():
+            return []
 
-        # Identify reason
-        labels = ["CPU", "RAM", "Disk", "Net"]
-        idx = int(np.argmax(np.abs(z)))
-        reason = f"{labels[idx]} z={z[idx]:.2f}"
+        idx = np.flatnonzero(hit)
+        if self.model is not None:
+            z = (X[idx] - self.model.mean) / self.model.std
+        else:
+            z = np.zeros((len(idx), 4))
 
-        if score >= z_thresh:
+        found = []
+        for j, i in enumerate(idx):
+            reason = f"{self.online.name} score={scores[i]:.3f}"
+            if self.model is not None:
+                m = int(np.argmax(np.abs(z[j])))
+                reason += f" • {LABELS[m]} z={z[j, m]:.2f}"
             a = Anomaly(
-                ts=s.ts,
-                cpu=s.cpu,
-                ram=s.ram,
-                disk=s.disk,
-                net_kbps=s.net_kbps,
-                z=(float(z[0]), float(z[1]), float(z[2]), float(z[3])),
-                score=score,
+                ts=float(ts[i]),
+                cpu=float(X[i, 0]),
+                ram=float(X[i, 1]),
+                disk=float(X[i, 2]),
+                net_kbps=float(X[i, 3]),
+                z=tuple(float(v) for v in z[j]),
+                score=float(scores[i]),
                 reason=reason,
             )
-            self.anomalies.append(a)
-            return a
+            if record:
+                self._record(a)
+            found.append(a)
+        return found
 
-        return None
+    def detect_last_online(self) -> Optional[Anomaly]:
+        """
+        Anomaly for the last sample according to the streaming detector, or None.
+        z/reason come from the baseline model if one is trained.
+        """
+        found = self._online_anomalies(self._online_scores[-1:], None, True)
+        return found[0] if found else None
@@ -0,0 +1,133 @@
+"""Save / restore a Guardian ``Session`` to disk.
+
+A snapshot is a directory:
+
+- ``samples.<gen>.ts.npy``: float64 timestamps, oldest first
+- ``samples.<gen>.X.npy``: (n, 4) float64 cpu, ram, disk, net_kbps
+- ``state.joblib``: everything small (model, running statistics, sketches,
+  seasonal/streaming detectors, anomalies, incidents) and the generation
+  ``gen`` of the sample pair it belongs to
+
+The sample arrays are plain ``.npy`` so they can be memory-mapped on restore
+(NPZ members cannot) and copied into the ring buffer in one bulk copy. Every
+save writes its sample pair under a fresh generation and then swaps in
+``state.joblib`` naming it, so that single ``os.replace`` commits the whole
+snapshot: a crash mid-save leaves the previous state with its own pair.
+Older generations are removed after the swap.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+
+from sba.guardian_gui.core.session import Session
+
+SNAPSHOT_VERSION = 3
+STATE_FILE = "state.joblib"
+
+
+def _sample_paths(path: Path, gen: str) -> tuple[Path, Path]:
+    return path / f"samples.{gen}.ts.npy", path / f"samples.{gen}.X.npy"
+
+
+def _replace_npy(path: Path, arr: np.ndarray) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(arr))
+    os.replace(tmp, path)
+
+
+def save_session(session: Session, path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    gen = uuid.uuid4().hex[:12]
+    ts_path, x_path = _sample_paths(path, gen)
+    state_path = path / STATE_FILE
+
+    ts, X = session.buffer.window()
+    _replace_npy(ts_path, ts)
+    _replace_npy(x_path, X)
+
+    state = {
+        "version": SNAPSHOT_VERSION,
+        "gen": gen,
+        "n": len(ts),
+        "capacity": session.buffer.capacity,
+        "total": session.buffer.total,
+        "model": session.model,
+        "anomalies": session.anomalies,
+        "incidents": session.incidents,
+        "cumulative": session.cumulative,
+        "rolling": session.rolling,
+        "ewma": session.ewma,
+        "robust": session.robust,
+        "seasonal": session.seasonal,
+        "online": session.online,
+        "online_last": session._online_last,
+    }
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    joblib.dump(state, tmp)
+    os.replace(tmp, state_path)   # commits the snapshot
+
+    keep = {ts_path.name, x_path.name}
+    for old in path.glob("samples.*.npy*"):
+        if old.name not in keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass          # still mapped elsewhere (Windows): removed by a later save
+
+
+def load_session(
+    path: Path,
+    capacity: Optional[int] = None,
+    max_anomalies: Optional[int] = None,
+    incident_gap_s: Optional[float] = None,
+) -> Session:
+    """
+    Rebuild a Session from a snapshot directory. ``capacity`` overrides the
+    saved ring size (the newest samples are kept if it is smaller);
+    ``max_anomalies`` / ``incident_gap_s`` override the anomaly log cap and
+    the incident gap that were in effect when it was saved.
+    Raises FileNotFoundError if there is no snapshot and ValueError if its
+    sample arrays do not match the state.
+    """
+    state = joblib.load(path / STATE_FILE)
+    if state.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported session snapshot version: {state.get('version')!r}")
+
+    ts_path, x_path = _sample_paths(path, state["gen"])
+    ts = np.load(ts_path, mmap_mode="r")
+    X = np.load(x_path, mmap_mode="r")
+    n = int(state["n"])
+    if len(ts) != n or X.shape != (n, 4):
+        raise ValueError(f"Session snapshot samples do not match its state (gen {state['gen']})")
+
+    s = Session(
+        capacity=int(capacity or state["capacity"]),
+        window=state["rolling"].window,
+        alpha=state["ewma"].alpha,
+    )
+    s.buffer.load(ts[:n], X[:n], total=int(state["total"]))
+
+    s.model = state["model"]
+    s.anomalies = state["anomalies"]
+    s.incidents = state["incidents"]
+    s.cumulative = state["cumulative"]
+    s.rolling = state["rolling"]
+    s.ewma = state["ewma"]
+    s.robust = state["robust"]
+    s.seasonal = state["seasonal"]
+    s.online = state["online"]
+    s._online_last = state["online_last"]
+
+    if max_anomalies is not None:
+        s.anomalies.set_max_rows(max_anomalies)
+    if incident_gap_s is not None:
+        s.incidents.gap_s = float(incident_gap_s)
+    return s
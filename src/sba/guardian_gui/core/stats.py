@@ -0,0 +1,171 @@
+"""Incremental per-metric statistics, O(F) per sample.
+
+- ``RunningStats``: Welford mean/variance over everything seen.
+- ``WindowStats``: mean/variance over the last ``window`` samples (Welford
+  add/remove, with an exact recompute once per window to cancel drift).
+- ``EwmaStats``: exponentially weighted mean/variance.
+
+All three expose ``n``, ``mean`` and ``std`` so a baseline snapshot is
+constant time.
+
+- ``SlidingExtrema``: min / max / last of one series over the last
+  ``window`` values (monotonic deques, amortized O(1) per value).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+
+class RunningStats:
+    def __init__(self, n_features: int = 4) -> None:
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+
+    def update(self, x: np.ndarray) -> None:
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self._m2 += d * (x - self.mean)
+
+    def update_batch(self, X: np.ndarray) -> None:
+        """Merge a (k, F) batch (Chan et al. parallel update)."""
+        k = len(X)
+        if k == 0:
+            return
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+        n = self.n + k
+        d = mean_b - self.mean
+        self.mean = self.mean + d * (k / n)
+        self._m2 = self._m2 + m2_b + d * d * (self.n * k / n)
+        self.n = n
+
+    @property
+    def var(self) -> np.ndarray:
+        return self._m2 / self.n if self.n else np.zeros_like(self._m2)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(np.maximum(self.var, 0.0))
+
+
+class WindowStats(RunningStats):
+    def __init__(self, window: int = 300, n_features: int = 4) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        super().__init__(n_features)
+        self.window = int(window)
+        self._buf = np.zeros((self.window, n_features))
+        self._pos = 0
+        self._since_exact = 0
+
+    def update(self, x: np.ndarray) -> None:
+        if self.n < self.window:
+            self._buf[self._pos] = x
+            super().update(x)
+        else:
+            old = self._buf[self._pos].copy()
+            self._buf[self._pos] = x
+            # replace `old` by `x` at constant n
+            mean0 = self.mean.copy()
+            self.mean += (x - old) / self.n
+            self._m2 += (x - old) * (x - self.mean + old - mean0)
+            np.maximum(self._m2, 0.0, out=self._m2)
+            self._since_exact += 1
+            if self._since_exact >= self.window:
+                self._exact()
+        self._pos = (self._pos + 1) % self.window
+
+    def update_batch(self, X: np.ndarray) -> None:
+        for x in X:
+            self.update(x)
+
+    def _exact(self) -> None:
+        self.mean = self._buf.mean(axis=0)
+        self._m2 = ((self._buf - self.mean) ** 2).sum(axis=0)
+        self._since_exact = 0
+
+
+class EwmaStats:
+    def __init__(self, alpha: float = 0.02, n_features: int = 4) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = float(alpha)
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.var = np.zeros(n_features)
+
+    def update(self, x: np.ndarray) -> None:
+        self.n += 1
+        if self.n == 1:
+            self.mean = np.array(x, dtype=float)
+            return
+        d = x - self.mean
+        incr = self.alpha * d
+        self.mean += incr
+        self.var = (1.0 - self.alpha) * (self.var + d * incr)
+
+    def update_batch(self, X: np.ndarray) -> None:
+        for x in X:
+            self.update(x)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+
+class SlidingExtrema:
+    """NaN values take a slot in the window but are never the min / max / last."""
+
+    def __init__(self, window: int) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = int(window)
+        self.n = 0                                  # values ever pushed
+        self._min: Deque[Tuple[int, float]] = deque()   # (index, value), values increasing
+        self._max: Deque[Tuple[int, float]] = deque()   # values decreasing
+        self._last: Optional[Tuple[int, float]] = None
+
+    def push(self, v: float) -> None:
+        i = self.n
+        self.n += 1
+        if math.isfinite(v):
+            while self._min and self._min[-1][1] >= v:
+                self._min.pop()
+            self._min.append((i, v))
+            while self._max and self._max[-1][1] <= v:
+                self._max.pop()
+            self._max.append((i, v))
+            self._last = (i, v)
+        # one index leaves the window per push, so at most one entry expires
+        oldest = self.n - self.window
+        if self._min and self._min[0][0] < oldest:
+            self._min.popleft()
+        if self._max and self._max[0][0] < oldest:
+            self._max.popleft()
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def last(self) -> Optional[float]:
+        """Newest finite value still in the window."""
+        if self._last is None or self._last[0] < self.n - self.window:
+            return None
+        return self._last[1]
+
+
+def snapshot_std(std: np.ndarray, floor: float = 1e-6) -> np.ndarray:
+    """Replace degenerate spreads by 1.0 (avoids division by zero in z-scores)."""
+    return np.where(std < floor, 1.0, std)
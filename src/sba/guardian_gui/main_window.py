@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import List
 
 import numpy as np
 from PySide6.QtCore import Qt, QTimer, QEasingCurve, QPropertyAnimation, QRect
@@ -18,10 +19,16 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from sba.guardian_gui.pages.dashboard import DashboardPage
+from sba.collectors.adaptive import AdaptiveInterval
+from sba.config import config
+from sba.guardian_gui.activity import ActivityManager
+from sba.guardian_gui.pages.dashboard import CFG as DASH_CFG, DashboardPage
 from sba.guardian_gui.pages.anomalies import AnomaliesPage
-from sba.guardian_gui.workers.system_worker import SystemWorker, SystemSample
-from sba.guardian_gui.core.session import Session, Sample
+from sba.guardian_gui.pages.processes import ProcessesPage
+from sba.guardian_gui.workers.hub import SYSTEM, SamplingHub, Snapshot
+from sba.guardian_gui.workers.system_worker import SystemSample
+from sba.guardian_gui.core.session import Session
+from sba.guardian_gui.core.snapshot import load_session, save_session
 
 
 # ==========================================================
@@ -165,9 +172,19 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1120, 720)
         self.resize(1400, 860)
 
-        # Live worker + session
-        self._sys_worker: Optional[SystemWorker] = None
-        self.session = Session()
+        # One sampling clock for every view; live collect = subscribing to system samples
+        self._collecting = False
+        self.session = self._restore_session()
+        self._saved_ts = 0.0
+        adaptive = (
+            AdaptiveInterval(config.sample_interval_min_sec, config.sample_interval_max_sec, start_s=1.0)
+            if config.adaptive_sampling
+            else None
+        )
+        self.hub = SamplingHub(interval_s=1.0, disk_path="C:\\", adaptive=adaptive)
+        self.hub.snapshots.connect(self._on_snapshots)
+        self.hub.error.connect(lambda msg: self._toast(f"Collector error: {msg}", "crit"))
+        self.hub.start()
 
         # Root
         root = QWidget()
@@ -196,11 +213,16 @@ class MainWindow(QMainWindow):
         self.pages = FadeStack()
         right_layout.addWidget(self.pages, 1)
 
-        self.dashboard = DashboardPage()
-        self.anomalies_page = AnomaliesPage()
+        # pause off-screen pages, slow down in the background, catch up on return
+        self.activity = ActivityManager(self)
+
+        self.dashboard = DashboardPage(self.activity)
+        self.anomalies_page = AnomaliesPage(self.session.anomalies)
+        self.processes_page = ProcessesPage(self.activity, self.hub)
 
         self.pages.addWidget(self.dashboard)
         self.pages.addWidget(self.anomalies_page)
+        self.pages.addWidget(self.processes_page)
         self.pages.addWidget(self._placeholder_page("Assistant", "Coming next: chat + explanations + guided actions"))
         self.pages.addWidget(self._placeholder_page("Settings", "Coming next: paths, preferences, diagnostics"))
 
@@ -212,6 +234,7 @@ class MainWindow(QMainWindow):
         self._meta = [
             PageMeta("Dashboard", "Live overview and system health"),
             PageMeta("Anomalies", "Review detected anomalies"),
+            PageMeta("Processes", "Running programs and their usual behaviour"),
             PageMeta("Assistant", "Ask Guardian for explanations & tips"),
             PageMeta("Settings", "Paths, preferences, and diagnostics"),
         ]
@@ -228,10 +251,17 @@ class MainWindow(QMainWindow):
 
         # Anomalies: clear button
         self.anomalies_page.btn_clear.clicked.connect(self._clear_anomalies)
+        self.processes_page.process_anomalies.connect(self._on_process_anomalies)
 
         self._refresh_ui_state()
         self._go(0)
 
+        self.activity.register(
+            self.anomalies_page,
+            on_pause=self.anomalies_page.pause_sync,
+            on_resume=self.anomalies_page.resume_sync,
+        )
+
     # -------------------------
     # Build UI
     # -------------------------
@@ -290,7 +320,7 @@ class MainWindow(QMainWindow):
         nav.setContentsMargins(0, 0, 0, 0)
         nav.setSpacing(8)
 
-        for name in ["🏠 Dashboard", "🚨 Anomalies", "🤖 Assistant", "⚙ Settings"]:
+        for name in ["🏠 Dashboard", "🚨 Anomalies", "📋 Processes", "🤖 Assistant", "⚙ Settings"]:
             b = QPushButton(name)
             b.setCheckable(True)
             b.setCursor(Qt.PointingHandCursor)
@@ -410,7 +440,7 @@ class MainWindow(QMainWindow):
     # Collect
     # -------------------------
     def _toggle_collect(self) -> None:
-        if self._sys_worker is None:
+        if not self._collecting:
             self._start_collect()
         else:
             self._stop_collect()
@@ -428,15 +458,13 @@ class MainWindow(QMainWindow):
             data_ok=True,
         )
 
-        self._sys_worker = SystemWorker(interval_s=1.0, disk_path="C:\\")
-        self._sys_worker.sample.connect(self._on_system_sample)
-        self._sys_worker.error.connect(lambda msg: self._toast(f"Collector error: {msg}", "crit"))
-        self._sys_worker.start()
+        self._collecting = True
+        self.hub.subscribe(self, SYSTEM)
 
         self.btn_collect.setText("Stop")
 
     def _stop_collect(self) -> None:
-        if self._sys_worker is None:
+        if not self._collecting:
             return
 
         self._toast("Live collect stopped", "warn")
@@ -451,25 +479,41 @@ class MainWindow(QMainWindow):
             data_ok=(self.session.count() > 0),
         )
 
-        self._sys_worker.stop()
-        self._sys_worker.wait(1500)
-        self._sys_worker = None
+        self._collecting = False
+        self.hub.unsubscribe(self, SYSTEM)
 
         self.btn_collect.setText("Collect")
 
-    def _on_system_sample(self, s: SystemSample) -> None:
-        # store
-        self.session.add(Sample(ts=s.ts, cpu=s.cpu, ram=s.ram, disk=s.disk, net_kbps=s.net_kbps))
+    def _on_snapshots(self, snaps: List[Snapshot]) -> None:
+        """Hub tick batch: session + dashboard take the system samples, then persistence."""
+        batch = [s.system for s in snaps if s.system is not None]
+        if self._collecting and batch:
+            self._on_system_batch(batch)
+            # periodic snapshot on the hub's clock, only while samples arrive (also saved on close)
+            if batch[-1].ts - self._saved_ts >= config.session_snapshot_interval_sec:
+                self._save_session()
+
+    def _on_system_batch(self, batch: List[SystemSample]) -> None:
+        if not batch:
+            return
+        # store (one bulk update of the ring + running statistics per batch)
+        before = self.session.buffer.total
+        self.session.add_samples(batch)
         self.sb_data.setText(f"Samples: {self.session.count()}")
 
-        # update dashboard UI
-        self.dashboard.push_sample(cpu=s.cpu, ram=s.ram, disk=s.disk, net_kbps=s.net_kbps)
+        # update dashboard UI (adaptive thresholds refreshed every 30 samples)
+        if DASH_CFG.adaptive_thresholds and before // 30 != self.session.buffer.total // 30:
+            levels = self.session.thresholds(DASH_CFG.warn_quantile, DASH_CFG.crit_quantile)
+            if levels is not None:
+                self.dashboard.set_thresholds(*levels)
+        self.dashboard.push_samples(batch)
 
-        # optionally auto-detect if model exists (lightweight)
-        if self.session.model is not None:
-            a = self.session.detect_last(z_thresh=3.0)
-            if a is not None:
-                self._on_anomaly(a)
+        # baseline z-scores if a model exists; the streaming detector needs
+        # no training and covers the rest
+        prev = self.session.incidents.current
+        found = self.session.detect_recent(len(batch), z_thresh=3.0)
+        if found:
+            self._on_anomalies(found, prev_id=prev.id if prev else 0)
 
     # -------------------------
     # Train / Detect
@@ -480,17 +524,23 @@ class MainWindow(QMainWindow):
             self._toast(f"Need more data to train (have {self.session.count()}, need {min_samples}+)", "warn")
             return
 
-        # Train on last 300 samples (more reactive). You can set None for all.
-        m = self.session.train(window=300)
+        # Robust baseline (median/MAD over ~the last 300 samples): a single
+        # spike doesn't inflate it. Use window=N for a mean/std baseline.
+        m = self.session.train(robust=True)
 
         self.sb_model.setText(f"Model: OK (n={m.trained_on})")
         self.dashboard.set_status_badges(
-            live=(self._sys_worker is not None),
+            live=self._collecting,
             model_ok=True,
             data_ok=True,
         )
 
-        self._toast("Model trained (baseline ready)", "ok")
+        # re-evaluate retained history against the new baseline
+        self.session.redetect(z_thresh=3.0)
+        self.anomalies_page.set_incidents(self.session.incidents.items())
+        self.anomalies_page.sync()
+
+        self._toast(f"Model trained (baseline ready) • {len(self.session.incidents)} incidents in history", "ok")
 
     def _detect_now(self) -> None:
         if not self.session.can_detect():
@@ -505,33 +555,90 @@ class MainWindow(QMainWindow):
             set_kind(self.p_state, "ok")
             return
 
-        self._on_anomaly(a)
-
-    def _on_anomaly(self, a) -> None:
-        self._toast(f"Anomaly detected • {a.reason} • score={a.score:.2f}", "crit")
+        self._on_anomalies([a], prev_id=self.session.incidents.current.id, notify=True)
+
+    def _on_anomalies(self, found, prev_id: int, notify: bool = False) -> None:
+        """
+        `found` were just recorded; `prev_id` is the id of the incident that was
+        current before them. One toast per new incident: later samples of the
+        same run only update its row.
+        """
+        touched = [inc for inc in self.session.incidents.items()[-len(found) - 1:] if inc.id >= prev_id]
+        if self._collecting:
+            self.hub.flag_hot()
+        if notify or any(inc.id > prev_id for inc in touched):
+            a = max(found, key=lambda x: x.score)
+            self._toast(f"Anomaly detected • {a.reason} • score={a.score:.2f}", "crit")
         self.sb_state.setText("Status: anomaly detected")
         self.p_state.setText("Alert")
         set_kind(self.p_state, "crit")
 
         # push into anomalies page
-        self.anomalies_page.append_anomaly(a)
+        for inc in touched:
+            self.anomalies_page.upsert_incident(inc)
+        self.anomalies_page.schedule_sync()
 
         # also move badges
         self.dashboard.set_status_badges(
-            live=(self._sys_worker is not None),
+            live=self._collecting,
             model_ok=True,
             data_ok=True,
         )
 
+    def _on_process_anomalies(self, found) -> None:
+        """Processes that just started behaving unlike their program's baseline."""
+        self.anomalies_page.add_process_anomalies(found)
+        a = max(found, key=lambda x: x.z)
+        self._toast(f"Unusual {a.metric} • {a.name} (PID {a.pid}) • score={a.z:.1f}", "warn")
+
     def _clear_anomalies(self) -> None:
-        self.session.anomalies.clear()
-        self.anomalies_page.set_anomalies([])
+        self.session.clear_anomalies()
+        self.anomalies_page.set_incidents([])
+        self.anomalies_page.clear_process_anomalies()
+        self.anomalies_page.sync()
         self._toast("Anomalies cleared", "ok")
 
     def _refresh_ui_state(self) -> None:
+        m = self.session.model
         self.sb_data.setText(f"Samples: {self.session.count()}")
-        self.sb_model.setText("Model: —")
-        self.dashboard.set_status_badges(live=False, model_ok=False, data_ok=False)
+        self.sb_model.setText(f"Model: OK (n={m.trained_on})" if m is not None else "Model: —")
+        self.dashboard.set_status_badges(live=False, model_ok=(m is not None), data_ok=(self.session.count() > 0))
+        if len(self.session.incidents):
+            self.anomalies_page.set_incidents(self.session.incidents.items())
+
+    # -------------------------
+    # Session persistence
+    # -------------------------
+    def _restore_session(self) -> Session:
+        try:
+            return load_session(
+                config.session_dir,
+                capacity=config.session_capacity,
+                max_anomalies=config.max_anomalies,
+                incident_gap_s=config.incident_gap_sec,
+            )
+        except FileNotFoundError:
+            pass
+        except Exception as ex:  # corrupt/old snapshot: start fresh rather than not at all
+            print("ERROR restoring session:", repr(ex))
+
+        s = Session(
+            capacity=config.session_capacity,
+            max_anomalies=config.max_anomalies,
+            incident_gap_s=config.incident_gap_sec,
+        )
+        s.enable_online()
+        s.enable_seasonal()
+        return s
+
+    def _save_session(self) -> None:
+        if not self.session.count():
+            return
+        self._saved_ts = time.time()
+        try:
+            save_session(self.session, config.session_dir)
+        except OSError as ex:
+            self._toast(f"Could not save session: {ex}", "warn")
 
     # -------------------------
     # Toast + Resize + Close
@@ -550,8 +657,8 @@ class MainWindow(QMainWindow):
             )
 
     def closeEvent(self, e) -> None:  # type: ignore[override]
-        if self._sys_worker is not None:
-            self._sys_worker.stop()
-            self._sys_worker.wait(1500)
-            self._sys_worker = None
+        self.processes_page.close()   # stops its scan thread
+        self.hub.stop()
+        self.hub.wait(1500)
+        self._save_session()
         super().closeEvent(e)
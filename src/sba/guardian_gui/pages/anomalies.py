@@ -1,18 +1,212 @@
 from __future__ import annotations
 
-from typing import List
+import datetime as dt
+import time
+from typing import List, Optional, Sequence
 
-from PySide6.QtCore import Qt
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
-    QPushButton, QSizePolicy
+    QPushButton, QSizePolicy, QStackedWidget, QTableView, QComboBox, QDoubleSpinBox,
+    QHeaderView,
 )
 
-from sba.guardian_gui.core.session import Anomaly
+from sba.guardian_gui.core.anomaly_log import AnomalyLog
+from sba.guardian_gui.core.records import ProcAnomaly
+from sba.guardian_gui.core.session import LABELS
+from sba.ml.incidents import Incident
+
+METRICS = (*LABELS, "—")
+
+
+class AnomalyTableModel(QAbstractTableModel):
+    """
+    Read-only view over an AnomalyLog. Nothing is formatted until data() asks
+    for a visible cell. Filtering and sorting build one index array with NumPy
+    (view row -> log row); while sorted by time ascending, new and evicted log
+    rows are applied incrementally as one insert / one remove per sync().
+    """
+
+    HEADERS = ["Time", "CPU %", "RAM %", "Disk %", "Net KB/s", "Score", "Metric", "Reason"]
+
+    def __init__(self, log: AnomalyLog) -> None:
+        super().__init__()
+        self._log = log
+        self._order: Optional[np.ndarray] = None   # None: identity (all rows, log order)
+        self._n_rows = len(log)                     # identity row count as of the last sync
+        self._seen_dropped = log.dropped
+        self._seen_total = log.total
+
+        self._sort_col = 0
+        self._sort_desc = False
+        self._since: Optional[float] = None
+        self._min_score = 0.0
+        self._metric: Optional[int] = None
+
+    # --------------------------
+    # Qt model API
+    # --------------------------
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        if parent is not None and parent.isValid():
+            return 0
+        return self._n_rows if self._order is None else len(self._order)
+
+    def columnCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        return 0 if parent is not None and parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def log_row(self, row: int) -> int:
+        return row if self._order is None else int(self._order[row])
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        c = index.column()
+
+        if role == Qt.DisplayRole:
+            i = self.log_row(index.row())
+            log = self._log
+            if i >= len(log):  # evicted since the last sync()
+                return None
+            if c == 0:
+                return dt.datetime.fromtimestamp(log.ts[i]).strftime("%Y-%m-%d %H:%M:%S")
+            if c in (1, 2, 3):
+                return f"{log.X[i, c - 1]:.1f}"
+            if c == 4:
+                return f"{log.X[i, 3]:.0f}"
+            if c == 5:
+                return f"{log.score[i]:.2f}"
+            if c == 6:
+                return METRICS[log.metric[i]]
+            if c == 7:
+                return str(log.reason[i])
+
+        if role == Qt.TextAlignmentRole:
+            if 1 <= c <= 5:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder) -> None:
+        # the reason column has no useful order; sort it like time
+        self._sort_col = column if column != 7 else 0
+        self._sort_desc = order == Qt.DescendingOrder
+        self._rebuild()
+
+    # --------------------------
+    # Filters
+    # --------------------------
+    def set_filter(
+        self, since: Optional[float] = None, min_score: float = 0.0, metric: Optional[int] = None
+    ) -> None:
+        self._since, self._min_score, self._metric = since, float(min_score), metric
+        self._rebuild()
+
+    def _incremental(self) -> bool:
+        return self._sort_col == 0 and not self._sort_desc
+
+    def _mask(self, lo: int, hi: int) -> Optional[np.ndarray]:
+        """Filter mask for log rows [lo, hi), or None if nothing is filtered."""
+        log = self._log
+        m = None
+        if self._since is not None:
+            m = log.ts[lo:hi] >= self._since
+        if self._min_score > 0:
+            k = log.score[lo:hi] >= self._min_score
+            m = k if m is None else m & k
+        if self._metric is not None:
+            k = log.metric[lo:hi] == self._metric
+            m = k if m is None else m & k
+        return m
+
+    def _build_order(self) -> Optional[np.ndarray]:
+        n = len(self._log)
+        mask = self._mask(0, n)
+        if mask is None and self._incremental():
+            return None
+        idx = np.arange(n) if mask is None else np.flatnonzero(mask)
+        if not self._incremental():
+            log, c = self._log, self._sort_col
+            key = {0: log.ts, 5: log.score, 6: log.metric}.get(c)
+            if key is None:
+                key = log.X[:, c - 1]
+            idx = idx[np.argsort(key[idx], kind="stable")]
+            if self._sort_desc:
+                idx = idx[::-1].copy()
+        return idx
+
+    def _rebuild(self) -> None:
+        self.beginResetModel()
+        self._order = self._build_order()
+        self._n_rows = len(self._log)
+        self._seen_dropped = self._log.dropped
+        self._seen_total = self._log.total
+        self.endResetModel()
+
+    # --------------------------
+    # Live updates
+    # --------------------------
+    def sync(self) -> None:
+        """Apply rows appended to / evicted from the log since the last call."""
+        log = self._log
+        appended = log.total - self._seen_total
+        dropped = log.dropped - self._seen_dropped
+        if appended == 0 and dropped == 0:
+            return
+        if not self._incremental():
+            self._rebuild()
+            return
+
+        prev_len = self._seen_total - self._seen_dropped
+        old_gone = min(dropped, prev_len)          # old rows evicted from the front
+        n = len(log)
+        lo = prev_len - old_gone                   # first log row that is new
+        self._seen_dropped, self._seen_total = log.dropped, log.total
+
+        if old_gone:
+            if self._order is None:
+                k = min(old_gone, self._n_rows)
+            else:
+                k = int(np.searchsorted(self._order, old_gone))
+            if k:
+                self.beginRemoveRows(QModelIndex(), 0, k - 1)
+                if self._order is None:
+                    self._n_rows -= k
+                else:
+                    self._order = self._order[k:] - old_gone
+                self.endRemoveRows()
+            elif self._order is not None:
+                self._order = self._order - old_gone
+
+        # appends: one batched insert at the end
+        if self._order is None:
+            new_rows, new = n - lo, None
+        else:
+            mask = self._mask(lo, n)
+            new = np.arange(lo, n) if mask is None else lo + np.flatnonzero(mask)
+            new_rows = len(new)
+        if new_rows:
+            first = self.rowCount()
+            self.beginInsertRows(QModelIndex(), first, first + new_rows - 1)
+            if self._order is None:
+                self._n_rows += new_rows
+            else:
+                self._order = np.concatenate([self._order, new])
+            self.endInsertRows()
 
 
 class AnomaliesPage(QWidget):
-    def __init__(self) -> None:
+    MAX_PROCESS_ROWS = 1000   # oldest process anomalies scroll out
+
+    def __init__(self, log: Optional[AnomalyLog] = None) -> None:
         super().__init__()
 
         root = QVBoxLayout(self)
@@ -22,7 +216,10 @@ class AnomaliesPage(QWidget):
         header = QHBoxLayout()
         title = QLabel("Anomalies")
         title.setObjectName("TitleXL")
-        sub = QLabel("Detected anomalies (z-score baseline).")
+        sub = QLabel(
+            "Incidents merge consecutive anomalous samples; 'All anomalies' lists every flagged sample; "
+            "'Processes' lists programs behaving unlike their own baseline."
+        )
         sub.setObjectName("Muted")
         header_left = QVBoxLayout()
         header_left.addWidget(title)
@@ -30,15 +227,27 @@ class AnomaliesPage(QWidget):
 
         header.addLayout(header_left, 1)
 
+        self.btn_incidents = QPushButton("Incidents")
+        self.btn_raw = QPushButton("All anomalies")
+        self.btn_procs = QPushButton("Processes")
+        for i, b in enumerate((self.btn_incidents, self.btn_raw, self.btn_procs)):
+            b.setCheckable(True)
+            b.setCursor(Qt.PointingHandCursor)
+            b.clicked.connect(lambda _=False, idx=i: self._show(idx))
+            header.addWidget(b)
+        self.btn_incidents.setChecked(True)
+
         self.btn_clear = QPushButton("Clear")
         self.btn_clear.setCursor(Qt.PointingHandCursor)
         header.addWidget(self.btn_clear)
 
         root.addLayout(header)
 
-        self.table = QTableWidget(0, 7)
+        self._last_id: Optional[int] = None  # incident shown in the last row
+
+        self.table = QTableWidget(0, 6)
         self.table.setHorizontalHeaderLabels([
-            "Time", "CPU %", "RAM %", "Disk %", "Net KB/s", "Score", "Reason"
+            "Start", "Duration", "Samples", "Peak score", "Metric", "Reason (peak)"
         ])
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
@@ -46,37 +255,202 @@ class AnomaliesPage(QWidget):
         self.table.setAlternatingRowColors(True)
         self.table.horizontalHeader().setStretchLastSection(True)
 
-        root.addWidget(self.table, 1)
+        # raw anomalies: virtualized view + filters
+        raw = QWidget()
+        raw_lay = QVBoxLayout(raw)
+        raw_lay.setContentsMargins(0, 0, 0, 0)
+        raw_lay.setSpacing(8)
+
+        filters = QHBoxLayout()
+        self.cmb_since = QComboBox()
+        for text, secs in (("All time", None), ("Last 15 min", 900), ("Last hour", 3600), ("Last 24 h", 86400)):
+            self.cmb_since.addItem(text, secs)
+        self.cmb_metric = QComboBox()
+        self.cmb_metric.addItem("Any metric", None)
+        for i, name in enumerate(METRICS):
+            self.cmb_metric.addItem(name, i)
+        self.spin_score = QDoubleSpinBox()
+        self.spin_score.setPrefix("Score ≥ ")
+        self.spin_score.setRange(0.0, 1e6)
+        self.spin_score.setDecimals(1)
+        for w in (self.cmb_since, self.cmb_metric, self.spin_score):
+            filters.addWidget(w)
+        filters.addStretch(1)
+        self.cmb_since.currentIndexChanged.connect(self._apply_filter)
+        self.cmb_metric.currentIndexChanged.connect(self._apply_filter)
+        self.spin_score.valueChanged.connect(self._apply_filter)
+        raw_lay.addLayout(filters)
+
+        self.view = QTableView()
+        self.view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.view.setSelectionBehavior(QTableView.SelectRows)
+        self.view.setAlternatingRowColors(True)
+        self.view.setSortingEnabled(True)
+        self.view.verticalHeader().setVisible(False)
+        # fixed row height / no per-row measuring keeps a million rows cheap
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(26)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        raw_lay.addWidget(self.view, 1)
+
+        # processes flagged against their program's baseline (newest last)
+        self.proc_table = QTableWidget(0, 7)
+        self.proc_table.setHorizontalHeaderLabels(["Time", "Process", "PID", "Metric", "Value", "Usual", "Score"])
+        self.proc_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.proc_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.proc_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.proc_table.setAlternatingRowColors(True)
+        self.proc_table.horizontalHeader().setStretchLastSection(True)
+
+        self.stack = QStackedWidget()
+        self.stack.addWidget(self.table)
+        self.stack.addWidget(raw)
+        self.stack.addWidget(self.proc_table)
+        root.addWidget(self.stack, 1)
+
+        self.model: Optional[AnomalyTableModel] = None
+        if log is not None:
+            self.set_log(log)
+
+        # coalesce bursts of anomalies into one model update
+        self._sync_timer = QTimer(self)
+        self._sync_timer.setSingleShot(True)
+        self._sync_timer.setInterval(100)
+        self._sync_timer.timeout.connect(self.sync)
+        self._sync_paused = False   # off screen: syncs wait for resume_sync()
+        self._sync_pending = False
+
+    def set_log(self, log: AnomalyLog) -> None:
+        self.model = AnomalyTableModel(log)
+        self.view.setModel(self.model)
+        self.view.sortByColumn(0, Qt.AscendingOrder)
+
+    def sync(self) -> None:
+        """Show anomalies added to the log since the last call (batched)."""
+        if self.model is not None:
+            self.model.sync()
+            if self.stack.currentIndex() == 1:
+                self.view.scrollToBottom()
 
-    def set_anomalies(self, anomalies: List[Anomaly]) -> None:
-        self.table.setRowCount(0)
-        for a in anomalies:
-            self._append_row(a)
+    def schedule_sync(self) -> None:
+        if self._sync_paused:
+            self._sync_pending = True
+        elif not self._sync_timer.isActive():
+            self._sync_timer.start()
 
-    def append_anomaly(self, a: Anomaly) -> None:
-        self._append_row(a)
+    def pause_sync(self) -> None:
+        self._sync_paused = True
+        if self._sync_timer.isActive():
+            self._sync_timer.stop()
+            self._sync_pending = True
 
-    def _append_row(self, a: Anomaly) -> None:
-        r = self.table.rowCount()
-        self.table.insertRow(r)
+    def resume_sync(self) -> None:
+        """Catch up in one sync with everything logged while paused."""
+        self._sync_paused = False
+        if self._sync_pending:
+            self._sync_pending = False
+            self.sync()
 
-        def it(text: str) -> QTableWidgetItem:
-            item = QTableWidgetItem(text)
-            item.setTextAlignment(Qt.AlignVCenter | Qt.AlignLeft)
-            return item
+    def _show(self, idx: int) -> None:
+        self.btn_incidents.setChecked(idx == 0)
+        self.btn_raw.setChecked(idx == 1)
+        self.btn_procs.setChecked(idx == 2)
+        self.stack.setCurrentIndex(idx)
 
-        self.table.setItem(r, 0, it(self._fmt_time(a.ts)))
-        self.table.setItem(r, 1, it(f"{a.cpu:.1f}"))
-        self.table.setItem(r, 2, it(f"{a.ram:.1f}"))
-        self.table.setItem(r, 3, it(f"{a.disk:.1f}"))
-        self.table.setItem(r, 4, it(f"{a.net_kbps:.0f}"))
-        self.table.setItem(r, 5, it(f"{a.score:.2f}"))
-        self.table.setItem(r, 6, it(a.reason))
+    def _apply_filter(self) -> None:
+        if self.model is None:
+            return
+        secs = self.cmb_since.currentData()
+        self.model.set_filter(
+            since=(time.time() - secs) if secs else None,
+            min_score=self.spin_score.value(),
+            metric=self.cmb_metric.currentData(),
+        )
 
+    def set_incidents(self, incidents: Sequence[Incident]) -> None:
+        """Replace the table (one row per incident) in one pass."""
+        self._fill([self._row(inc) for inc in incidents])
+        self._last_id = incidents[-1].id if incidents else None
+
+    def upsert_incident(self, inc: Incident) -> None:
+        """Update the last row if `inc` is the incident it shows, else append a row."""
+        if inc.id == self._last_id and self.table.rowCount():
+            r = self.table.rowCount() - 1
+        else:
+            r = self.table.rowCount()
+            self.table.insertRow(r)
+            self._last_id = inc.id
+        for c, text in enumerate(self._row(inc)):
+            self.table.setItem(r, c, self._item(text))
+        self.table.scrollToBottom()
+
+    def add_process_anomalies(self, found: Sequence[ProcAnomaly]) -> None:
+        """Append one row per process anomaly, dropping the oldest beyond MAX_PROCESS_ROWS."""
+        t = self.proc_table
+        t.setUpdatesEnabled(False)
+        try:
+            for a in found:
+                r = t.rowCount()
+                t.insertRow(r)
+                for c, text in enumerate(self._proc_row(a)):
+                    item = self._item(text)
+                    if c == 1:
+                        item.setToolTip(a.path)
+                    t.setItem(r, c, item)
+            extra = t.rowCount() - self.MAX_PROCESS_ROWS
+            if extra > 0:
+                t.model().removeRows(0, extra)
+        finally:
+            t.setUpdatesEnabled(True)
+        t.scrollToBottom()
+
+    def clear_process_anomalies(self) -> None:
+        self.proc_table.setRowCount(0)
+
+    @staticmethod
+    def _proc_row(a: ProcAnomaly) -> List[str]:
+        if a.metric == "CPU":
+            value, usual = f"{a.value:.1f} %", f"{a.usual:.1f} %"
+        else:
+            mb = 1024.0 * 1024.0
+            value, usual = f"{a.value / mb:.0f} MB", f"{a.usual / mb:.0f} MB"
+        return [AnomaliesPage._fmt_time(a.ts), a.name, str(a.pid), a.metric, value, usual, f"{a.z:.1f}"]
+
+    def _row(self, inc: Incident) -> List[str]:
+        return [
+            self._fmt_time(inc.start),
+            self._fmt_duration(inc.duration_s),
+            str(inc.count),
+            f"{inc.peak_score:.2f}",
+            inc.dominant,
+            inc.reason,
+        ]
+
+    def _fill(self, rows: Sequence[Sequence[str]]) -> None:
+        """Rebuild the whole table in one pass (single resize, no repaint per row)."""
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table.setRowCount(0)
+            self.table.setRowCount(len(rows))
+            for r, row in enumerate(rows):
+                for c, text in enumerate(row):
+                    self.table.setItem(r, c, self._item(text))
+        finally:
+            self.table.setUpdatesEnabled(True)
         self.table.scrollToBottom()
 
+    @staticmethod
+    def _item(text: str) -> QTableWidgetItem:
+        item = QTableWidgetItem(text)
+        item.setTextAlignment(Qt.AlignVCenter | Qt.AlignLeft)
+        return item
+
+    @staticmethod
+    def _fmt_duration(seconds: float) -> str:
+        s = int(round(seconds))
+        return f"{s}s" if s < 60 else f"{s // 60}m {s % 60:02d}s"
+
     @staticmethod
     def _fmt_time(ts: float) -> str:
         # simple local time formatting
-        import datetime as dt
         return dt.datetime.fromtimestamp(ts).strftime("%H:%M:%S")
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Deque
+from dataclasses import dataclass, replace
+from typing import Optional, Deque, Iterable, Sequence, Tuple
 from collections import deque
+import itertools
 import math
 import time
 
@@ -11,7 +12,9 @@ from PySide6.QtCore import (
     QEasingCurve,
     QPropertyAnimation,
     QTimer,
-    QPoint,
+    QPointF,
+    QRect,
+    QSize,
     Property,
 )
 from PySide6.QtGui import (
@@ -19,7 +22,8 @@ from PySide6.QtGui import (
     QPainter,
     QPen,
     QBrush,
-    QPainterPath,
+    QPixmap,
+    QPolygonF,
 )
 from PySide6.QtWidgets import (
     QFrame,
@@ -34,6 +38,9 @@ from PySide6.QtWidgets import (
     QScrollArea,
 )
 
+from sba.guardian_gui.activity import ActivityManager
+from sba.guardian_gui.core.stats import SlidingExtrema
+
 
 
 # ==========================================================
@@ -61,6 +68,11 @@ class UiConfig:
     warn_net_kbps: float = 500.0
     crit_net_kbps: float = 900.0
 
+    # raise warn/crit to the host's own recent percentiles (never lower them)
+    adaptive_thresholds: bool = True
+    warn_quantile: float = 0.95
+    crit_quantile: float = 0.99
+
     kpi_anim_ms: int = 420
     hover_anim_ms: int = 140
 
@@ -263,89 +275,170 @@ class AnimatedBar(QProgressBar):
 
 
 class Sparkline(QWidget):
+    """
+    Recent history as a line with a soft fill.
+
+    Window min / max come from ``SlidingExtrema`` (no scan per push). The
+    rounded frame and the plotted line are cached as pixmaps. While the
+    window is full and the scale is unchanged, new points scroll the line
+    pixmap by whole device pixels and draw only the new segments; a new
+    size, color or min / max redraws the line once.
+    """
+
+    _LINE_COLORS = {
+        "neutral": QColor(78, 141, 255, 180),
+        "ok": QColor(70, 200, 140, 175),
+        "warn": QColor(255, 196, 0, 190),
+        "crit": QColor(255, 80, 80, 195),
+    }
+    _MARGIN = 3   # around the plot in the line pixmap (pen width, round caps)
+
     def __init__(self, height: int = CFG.sparkline_height) -> None:
         super().__init__()
         self.setFixedHeight(height)
         self._data: Deque[float] = deque(maxlen=CFG.history_len)
+        self.extrema = SlidingExtrema(CFG.history_len)
         self._kind: str = "neutral"
 
+        self._frame: Optional[QPixmap] = None   # background + border
+        self._line: Optional[QPixmap] = None    # line + fill of the plot rect
+        self._drawn: Optional[tuple] = None     # (size, kind, vmin, vmax, n) _line was drawn for
+        self._head_x = 0.0                      # x of the newest point in _line
+        self._new = 0                           # points pushed since _line was drawn
+
     def set_kind(self, kind: str) -> None:
-        self._kind = kind
-        self.update()
+        if kind != self._kind:
+            self._kind = kind
+            self.update()
 
     def push(self, v: Optional[float]) -> None:
-        self._data.append(float(v) if _is_finite(v) else float("nan"))
-        self.update()
-
-    def paintEvent(self, e) -> None:  # type: ignore[override]
-        p = QPainter(self)
+        self.push_many((v,))
+
+    def push_many(self, values: Iterable[Optional[float]], repaint: bool = True) -> None:
+        """Append several points; one repaint is scheduled for all of them."""
+        for v in values:
+            x = float(v) if _is_finite(v) else float("nan")
+            self._data.append(x)
+            self.extrema.push(x)
+            self._new += 1
+        if repaint:
+            self.update()
+
+    def _plot_rect(self) -> QRect:
+        return self.rect().adjusted(12, 12, -12, -12)
+
+    def _render_frame(self) -> QPixmap:
+        dpr = self.devicePixelRatioF()
+        pm = QPixmap(self.size() * dpr)
+        pm.setDevicePixelRatio(dpr)
+        pm.fill(Qt.transparent)
+        p = QPainter(pm)
         p.setRenderHint(QPainter.Antialiasing, True)
-
-        r = self.rect().adjusted(2, 2, -2, -2)
-
-        bg = QColor(7, 14, 26, 90)
-        bd = QColor(150, 190, 255, 45)
-        p.setPen(QPen(bd, 1))
-        p.setBrush(QBrush(bg))
-        p.drawRoundedRect(r, 12, 12)
-
-        if not self._data:
-            return
-
-        vals = [v for v in self._data if math.isfinite(v)]
-        if not vals:
-            return
-        vmin, vmax = min(vals), max(vals)
-        if abs(vmax - vmin) < 1e-6:
-            vmax = vmin + 1.0
-
-        line = {
-            "neutral": QColor(78, 141, 255, 180),
-            "ok": QColor(70, 200, 140, 175),
-            "warn": QColor(255, 196, 0, 190),
-            "crit": QColor(255, 80, 80, 195),
-        }.get(self._kind, QColor(78, 141, 255, 180))
-
-        pr = r.adjusted(10, 10, -10, -10)
-
-        path = QPainterPath()
-        n = len(self._data)
-        if n < 2:
-            return
-
-        def xy(i: int, v: float) -> QPoint:
-            x = pr.left() + (pr.width() * (i / (n - 1)))
-            t = (v - vmin) / (vmax - vmin)
-            y = pr.bottom() - (pr.height() * t)
-            return QPoint(int(x), int(y))
-
-        started = False
-        for i, v in enumerate(self._data):
-            if not math.isfinite(v):
-                started = False
-                continue
-            pt = xy(i, v)
-            if not started:
-                path.moveTo(pt)
-                started = True
+        p.setPen(QPen(QColor(150, 190, 255, 45), 1))
+        p.setBrush(QBrush(QColor(7, 14, 26, 90)))
+        p.drawRoundedRect(self.rect().adjusted(2, 2, -2, -2), 12, 12)
+        p.end()
+        return pm
+
+    def _draw_run(self, pm: QPixmap, xs: Sequence[float], vals: Sequence[float], vmin: float, vmax: float) -> None:
+        """Line + fill through (xs, vals) into `pm`; NaN values break the line."""
+        pr = self._plot_rect()
+        top = float(self._MARGIN)
+        h = float(pr.height())
+        bottom = top + h
+        pts = [
+            None if not math.isfinite(v) else QPointF(x, bottom - h * (v - vmin) / (vmax - vmin))
+            for x, v in zip(xs, vals, strict=True)
+        ]
+        runs, cur = [], []
+        for pt in pts:
+            if pt is None:
+                if len(cur) > 1:
+                    runs.append(cur)
+                cur = []
             else:
-                path.lineTo(pt)
-
-        fill = QPainterPath(path)
-        fill.lineTo(pr.right(), pr.bottom())
-        fill.lineTo(pr.left(), pr.bottom())
-        fill.closeSubpath()
+                cur.append(pt)
+        if len(cur) > 1:
+            runs.append(cur)
+        if not runs:
+            return
 
+        line = self._LINE_COLORS.get(self._kind, self._LINE_COLORS["neutral"])
         fill_color = QColor(line)
         fill_color.setAlpha(45)
 
+        p = QPainter(pm)
+        # fill without antialiasing: pieces drawn on later pushes meet without seams
         p.setPen(Qt.NoPen)
         p.setBrush(QBrush(fill_color))
-        p.drawPath(fill)
+        for run in runs:
+            poly = QPolygonF(run + [QPointF(run[-1].x(), bottom), QPointF(run[0].x(), bottom)])
+            p.drawPolygon(poly)
 
-        p.setPen(QPen(line, 2))
+        p.setRenderHint(QPainter.Antialiasing, True)
+        p.setPen(QPen(line, 2, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
         p.setBrush(Qt.NoBrush)
-        p.drawPath(path)
+        for run in runs:
+            p.drawPolyline(QPolygonF(run))
+        p.end()
+
+    def _update_line(self) -> Optional[QPixmap]:
+        n = len(self._data)
+        vmin, vmax = self.extrema.min, self.extrema.max
+        if vmin is None or n < 2:
+            self._line = None
+            return None
+        if abs(vmax - vmin) < 1e-6:
+            vmax = vmin + 1.0
+
+        pr = self._plot_rect()
+        m = self._MARGIN
+        dpr = self.devicePixelRatioF()
+        size = QSize(pr.width() + 2 * m, pr.height() + 2 * m)
+        dx = pr.width() / (n - 1)
+        right = float(m + pr.width())
+        k, self._new = self._new, 0
+        key = (size, dpr, self._kind, vmin, vmax, n)
+
+        if self._line is not None and key == self._drawn and n == self._data.maxlen and 0 < k < n - 1:
+            # same geometry and scale: scroll by whole device pixels, draw the new tail
+            shift = round((self._head_x + k * dx - right) * dpr) / dpr
+            pm = QPixmap(self._line.size())
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            p.drawPixmap(QPointF(-shift, 0.0), self._line)
+            p.end()
+            head = self._head_x + k * dx - shift
+            # walk back from the newest point: O(k), not a copy of the whole window
+            tail = list(itertools.islice(reversed(self._data), k + 1))[::-1]
+            self._draw_run(pm, [head - (k - j) * dx for j in range(k + 1)], tail, vmin, vmax)
+            self._line, self._head_x = pm, head
+        elif self._line is None or key != self._drawn or k:
+            pm = QPixmap(size * dpr)
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.transparent)
+            self._draw_run(pm, [m + i * dx for i in range(n)], self._data, vmin, vmax)
+            self._line, self._head_x, self._drawn = pm, right, key
+        return self._line
+
+    def resizeEvent(self, e) -> None:  # type: ignore[override]
+        self._frame = None
+        super().resizeEvent(e)
+
+    def paintEvent(self, e) -> None:  # type: ignore[override]
+        if self._frame is None:
+            self._frame = self._render_frame()
+        p = QPainter(self)
+        p.drawPixmap(0, 0, self._frame)
+        line = self._update_line()
+        if line is None:
+            return
+        pr = self._plot_rect()
+        m = self._MARGIN
+        # the scrolled tail of the oldest segment may stick out on the left
+        p.setClipRect(pr.adjusted(-1, -m, m, m))
+        p.drawPixmap(pr.left() - m, pr.top() - m, line)
 
 
 class KpiCard(HoverCard):
@@ -417,14 +510,17 @@ class ChartTile(HoverCard):
 
     def push(self, v: Optional[float], unit: str = "%") -> None:
         self.spark.push(v)
-        finite = [x for x in self.spark._data if math.isfinite(x)]
-        if not finite:
+        self.refresh(unit)
+
+    def refresh(self, unit: str = "%") -> None:
+        """Update the min/max line (O(1), from the sparkline's window) and repaint."""
+        self.spark.update()
+        ex = self.spark.extrema
+        last = ex.last
+        if last is None:
             self.stats.setText("—")
             return
-        last = finite[-1]
-        mn = min(finite)
-        mx = max(finite)
-        self.stats.setText(f"last {last:.1f}{unit}  •  min {mn:.1f}{unit}  •  max {mx:.1f}{unit}")
+        self.stats.setText(f"last {last:.1f}{unit}  •  min {ex.min:.1f}{unit}  •  max {ex.max:.1f}{unit}")
 
     def set_kind(self, kind: str) -> None:
         self.spark.set_kind(kind)
@@ -434,11 +530,14 @@ class ChartTile(HoverCard):
 #  Dashboard Page
 # ==========================================================
 class DashboardPage(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, activity: Optional[ActivityManager] = None) -> None:
         super().__init__()
         self.setObjectName("DashboardRoot")
 
         self._last_update_ts: Optional[float] = None
+        self._cfg: UiConfig = CFG  # warn/crit levels in effect (see set_thresholds)
+        self._view_paused = False  # off screen: record history only (see pause_view)
+        self._deferred: Optional[tuple] = None
 
         # keep history (if you want it later; sparklines already keep their own history)
         self._cpu_hist: Deque[float] = deque(maxlen=CFG.history_len)
@@ -603,6 +702,10 @@ class DashboardPage(QWidget):
         self._ticker.timeout.connect(self._refresh_last_update_label)
         self._ticker.start()
 
+        if activity is not None:
+            # off screen: no label ticks and no repaints (samples keep arriving)
+            activity.register(self, self._ticker, on_pause=self.pause_view, on_resume=self.resume_view)
+
     # --------------------------
     # Public API
     # --------------------------
@@ -616,6 +719,25 @@ class DashboardPage(QWidget):
         self.p_data.setText("Data: OK" if data_ok else "Data: —")
         self.p_data.set_kind("ok" if data_ok else "neutral")
 
+    def set_thresholds(self, warn: Sequence[float], crit: Sequence[float]) -> None:
+        """
+        Adaptive warn/crit levels per metric (cpu, ram, disk, net_kbps), e.g.
+        streaming percentiles. The static UiConfig levels act as a floor, so a
+        host that normally runs hot stops showing permanent warnings while a
+        quiet host keeps the absolute limits.
+        """
+        w = [max(float(a), b) if _is_finite(a) else b
+             for a, b in zip(warn, (CFG.warn_cpu, CFG.warn_ram, CFG.warn_disk, CFG.warn_net_kbps), strict=True)]
+        c = [max(float(a), b, lo) if _is_finite(a) else max(b, lo)
+             for a, b, lo in zip(crit, (CFG.crit_cpu, CFG.crit_ram, CFG.crit_disk, CFG.crit_net_kbps), w, strict=True)]
+        self._cfg = replace(
+            CFG,
+            warn_cpu=w[0], crit_cpu=c[0],
+            warn_ram=w[1], crit_ram=c[1],
+            warn_disk=w[2], crit_disk=c[2],
+            warn_net_kbps=w[3], crit_net_kbps=c[3],
+        )
+
     def set_window_label(self, text: str) -> None:
         self.p_window.setText(text)
 
@@ -633,8 +755,50 @@ class DashboardPage(QWidget):
         self._disk_hist.append(float(disk) if _is_finite(disk) else float("nan"))
         self._net_hist.append(float(net_kbps) if _is_finite(net_kbps) else float("nan"))
 
+        if self._view_paused:
+            for tile, v in zip(self._tiles(), (cpu, ram, disk, net_kbps), strict=True):
+                tile.spark.push_many((v,), repaint=False)
+            self._deferred = (cpu, ram, disk, net_kbps)
+            return
         self._update_all(cpu=cpu, ram=ram, disk=disk, net_kbps=net_kbps)
 
+    def push_samples(self, batch: Sequence) -> None:
+        """
+        Push a batch of samples (objects with cpu/ram/disk/net_kbps, oldest
+        first). Histories and sparklines get every point, KPIs/colors are
+        computed once from the newest sample.
+        """
+        if not batch:
+            return
+        *head, last = batch
+        if head:
+            self._cpu_hist.extend(float(s.cpu) if _is_finite(s.cpu) else float("nan") for s in head)
+            self._ram_hist.extend(float(s.ram) if _is_finite(s.ram) else float("nan") for s in head)
+            self._disk_hist.extend(float(s.disk) if _is_finite(s.disk) else float("nan") for s in head)
+            self._net_hist.extend(float(s.net_kbps) if _is_finite(s.net_kbps) else float("nan") for s in head)
+            repaint = not self._view_paused
+            self.tile_cpu.spark.push_many((s.cpu for s in head), repaint)
+            self.tile_ram.spark.push_many((s.ram for s in head), repaint)
+            self.tile_disk.spark.push_many((s.disk for s in head), repaint)
+            self.tile_net.spark.push_many((s.net_kbps for s in head), repaint)
+        self.push_sample(cpu=last.cpu, ram=last.ram, disk=last.disk, net_kbps=last.net_kbps)
+
+    def pause_view(self) -> None:
+        """Stop repainting KPIs / sparklines; samples keep accumulating."""
+        self._view_paused = True
+
+    def resume_view(self) -> None:
+        """Repaint everything once from the newest sample received while paused."""
+        self._view_paused = False
+        if self._deferred is not None:
+            cpu, ram, disk, net_kbps = self._deferred
+            self._deferred = None
+            self._update_all(cpu=cpu, ram=ram, disk=disk, net_kbps=net_kbps, push=False)
+        self._refresh_last_update_label()
+
+    def _tiles(self) -> Tuple[ChartTile, ChartTile, ChartTile, ChartTile]:
+        return self.tile_cpu, self.tile_ram, self.tile_disk, self.tile_net
+
     # --------------------------
     # Internals
     # --------------------------
@@ -657,10 +821,12 @@ class DashboardPage(QWidget):
         ram: Optional[float],
         disk: Optional[float],
         net_kbps: Optional[float],
+        push: bool = True,
     ) -> None:
-        cpu_kind = kind_for(cpu, CFG.warn_cpu, CFG.crit_cpu)
-        ram_kind = kind_for(ram, CFG.warn_ram, CFG.crit_ram)
-        disk_kind = kind_for(disk, CFG.warn_disk, CFG.crit_disk)
+        cfg = self._cfg
+        cpu_kind = kind_for(cpu, cfg.warn_cpu, cfg.crit_cpu)
+        ram_kind = kind_for(ram, cfg.warn_ram, cfg.crit_ram)
+        disk_kind = kind_for(disk, cfg.warn_disk, cfg.crit_disk)
 
         self.k_cpu.set_value(
             value_text=(f"{cpu:.1f}%" if _is_finite(cpu) else "—"),
@@ -686,7 +852,7 @@ class DashboardPage(QWidget):
             net_kind = "neutral"
         else:
             nk = float(net_kbps)
-            net_kind = "crit" if nk >= CFG.crit_net_kbps else ("warn" if nk >= CFG.warn_net_kbps else "ok")
+            net_kind = "crit" if nk >= cfg.crit_net_kbps else ("warn" if nk >= cfg.warn_net_kbps else "ok")
             net_pct = clamp(nk / 10.0, 0.0, 100.0)
             self.k_net.set_value(f"{nk:.0f} KB/s", net_kind, f"Current: {nk:.0f} KB/s", net_pct)
 
@@ -716,8 +882,14 @@ class DashboardPage(QWidget):
         self.tile_disk.set_kind(disk_kind)
         self.tile_net.set_kind(net_kind)
 
-        # push data points
-        self.tile_cpu.push(cpu, unit="%")
-        self.tile_ram.push(ram, unit="%")
-        self.tile_disk.push(disk, unit="%")
-        self.tile_net.push(net_kbps, unit=" KB/s")
+        # push data points (already in the history when catching up)
+        if push:
+            self.tile_cpu.push(cpu, unit="%")
+            self.tile_ram.push(ram, unit="%")
+            self.tile_disk.push(disk, unit="%")
+            self.tile_net.push(net_kbps, unit=" KB/s")
+        else:
+            self.tile_cpu.refresh(unit="%")
+            self.tile_ram.refresh(unit="%")
+            self.tile_disk.refresh(unit="%")
+            self.tile_net.refresh(unit=" KB/s")
@@ -1,21 +1,30 @@
 from __future__ import annotations
 
+import math
 import os
-import heapq
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
 
+import numpy as np
 import psutil
 from PySide6.QtCore import (
-    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel,
+    Qt, QAbstractItemModel, QAbstractTableModel, QModelIndex, QSortFilterProxyModel,
     QObject, QThread, QTimer, Signal, Slot
 )
-from PySide6.QtGui import QAction, QCursor
+from PySide6.QtGui import QAction, QColor, QCursor, QPainter, QPainterPath, QPen
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, QCheckBox,
-    QTableView, QAbstractItemView, QMenu, QMessageBox, QApplication
+    QTableView, QTreeView, QAbstractItemView, QMenu, QMessageBox, QApplication, QStyledItemDelegate
 )
 
+from sba.guardian_gui.activity import ActivityManager
+from sba.guardian_gui.core.procbaseline import CPU_FLAG, RAM_FLAG, ProcBaselines
+from sba.guardian_gui.core.prochistory import HistoryRows, ProcHistory
+from sba.guardian_gui.core.procscan import STATUSES, ProcFrame, StringPool
+from sba.guardian_gui.core.procsearch import SearchIndex
+from sba.guardian_gui.core.proctable import ProcTable, TablePlan, runs
+from sba.guardian_gui.core.proctree import ROOT, ProcTree, TreeListener
+from sba.guardian_gui.workers.hub import PROCESSES, SamplingHub
 
 @dataclass(frozen=True)
 class ProcRow:
@@ -30,143 +39,205 @@ class ProcRow:
 # -----------------------------
 # Worker (real thread, queued)
 # -----------------------------
-class ProcWorker(QObject):
-    result = Signal(list)  # List[ProcRow]
+# rank of each status code by its name (the view sorts status as text)
+_STATUS_RANK = np.argsort(np.argsort(np.array(STATUSES)))
+
+
+def _string_rank(pool: StringPool, ids: np.ndarray) -> np.ndarray:
+    """Rank of each id's lowercased string (sorted once per distinct id)."""
+    uniq, inv = np.unique(ids, return_inverse=True)
+    lower = pool.lower
+    order = sorted(range(len(uniq)), key=lambda k: lower[uniq[k]])
+    rank = np.empty(len(uniq), dtype=np.int64)
+    rank[order] = np.arange(len(uniq))
+    return rank[inv]
+
+
+def _sort_key(f: ProcFrame, column: int, history: Optional[ProcHistory] = None) -> np.ndarray:
+    """Numeric key per row ordering like ProcModel's UserRole for `column`."""
+    if column == 0:
+        return _string_rank(f.pool, f.name_id)
+    if column == 1:
+        return f.pid
+    if column == 3:
+        return f.rss
+    if column == 4:
+        return _STATUS_RANK[f.status]
+    if column == 5:
+        if history is None:
+            return f.cpu
+        return history.mean_cpu(f.hist_slot)
+    if column == 6:
+        return f.rss
+    if column == 7:
+        return np.nan_to_num(f.leak, nan=-np.inf)
+    if column == 8:
+        # the view shows the name when the path is unknown
+        strings = f.pool.strings
+        empty = [i for i in np.unique(f.path_id) if not strings[i]]
+        path_id = np.where(np.isin(f.path_id, empty), f.name_id, f.path_id)
+        return _string_rank(f.pool, path_id)
+    return f.cpu
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._cache: Dict[int, psutil.Process] = {}
-        self._primed_global = False
 
-    @Slot(str, int)
-    def scan(self, query: str, limit: int) -> None:
-        # interruption-friendly
-        try:
-            if QThread.currentThread().isInterruptionRequested():
-                return
-        except Exception:
-            pass
+class ProcWorker(QObject):
+    result = Signal(object, int, object)  # ProcFrame (top rows only), its limit, HistoryRows (None: tree)
+    anomalies = Signal(object)    # List[ProcAnomaly]: processes that just became unusual
 
+    def __init__(self, history: Optional[ProcHistory] = None) -> None:
+        super().__init__()
+        self._index: Optional[SearchIndex] = None
+        self._frame: Optional[ProcFrame] = None       # latest full frame (scored), for select()
+        self.history = history if history is not None else ProcHistory()   # only touched on this thread
+        self.baselines = ProcBaselines()
+
+    @Slot(object)
+    def ingest(self, f: ProcFrame) -> None:
+        """Score a hub frame and keep it for select(); `f` itself is not modified."""
+        hist_slot = self.history.update(f)
+        f = replace(f, hist_slot=hist_slot, leak=self.history.leak_slope(hist_slot))
+        # every process against its program's baseline, before any filtering
+        scores = self.baselines.update(f)
+        f = replace(f, score=scores.score, flags=scores.flags)
+        found = self.baselines.anomalies(f, scores)
+        if found:
+            self.anomalies.emit(found)
+        self._frame = f
+
+    @Slot(str, int, int, bool)
+    def select(self, query: str, limit: int, column: int = 2, descending: bool = True) -> None:
+        """Emit the first `limit` rows (0 = all) of the latest frame matching `query`, in (column, order) sort order."""
+        f = self._frame
+        if f is None:
+            return
         q = (query or "").strip().lower()
-        ncpu = psutil.cpu_count(logical=True) or 1
-
-        # prime global cpu_percent once
-        if not self._primed_global:
-            try:
-                psutil.cpu_percent(interval=None)
-            except Exception:
-                pass
-            self._primed_global = True
-
-        # We keep only the top (limit) by CPU, using a heap to avoid sorting everything.
-        top: List[ProcRow] = []
-        seen: set[int] = set()
-
-        # Iterate once, minimize syscalls. attrs gives cheap info; heavy calls inside oneshot.
-        for p in psutil.process_iter(attrs=["pid", "name", "status", "exe"]):
-            try:
-                info = p.info
-                pid = int(info.get("pid") or 0)
-                if pid <= 0:
-                    continue
-
-                name = str(info.get("name") or "")
-                if name.lower() == "system idle process":
-                    continue
-
-                status = str(info.get("status") or "")
-                exe = str(info.get("exe") or "")
-                path = exe or ""
-
-                seen.add(pid)
-
-                # FAST filter (before heavy calls)
-                if q:
-                    nl = name.lower()
-                    pl = path.lower()
-                    if q.isdigit():
-                        qpid = int(q)
-                        if qpid != pid and q not in nl and q not in pl:
-                            continue
-                    else:
-                        if q not in nl and q not in pl:
-                            continue
-
-                proc = self._cache.get(pid)
-                if proc is None:
-                    proc = psutil.Process(pid)
-                    self._cache[pid] = proc
-                    # per-proc cpu prime
-                    try:
-                        proc.cpu_percent(interval=None)
-                    except Exception:
-                        self._cache.pop(pid, None)
-                        continue
-
-                # heavy metrics in oneshot (reduces syscalls)
-                try:
-                    with proc.oneshot():
-                        cpu_raw = float(proc.cpu_percent(interval=None))
-                        cpu = round(cpu_raw / ncpu, 1)
-
-                        try:
-                            rss = proc.memory_info().rss
-                            ram_mb = round(float(rss) / (1024.0 * 1024.0), 1)
-                        except Exception:
-                            ram_mb = 0.0
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    self._cache.pop(pid, None)
-                    continue
-                except Exception:
-                    continue
-
-                ui_path = path or name
-                row = ProcRow(pid, name, cpu, ram_mb, status, ui_path)
-
-                # Maintain top-N by cpu without sorting whole list
-                # heapq.nlargest at end would need all rows; instead keep small buffer:
-                top.append(row)
-
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-            except Exception:
-                continue
-
-        # cleanup cache
-        if self._cache:
-            for pid in list(self._cache.keys()):
-                if pid not in seen:
-                    self._cache.pop(pid, None)
-
-        # pick top limit (fast)
-        if len(top) > limit:
-            top = heapq.nlargest(limit, top, key=lambda r: r.cpu)
-        else:
-            top.sort(key=lambda r: r.cpu, reverse=True)
-
-        self.result.emit(top)
+        if self._index is None or self._index.pool is not f.pool:
+            self._index = SearchIndex(f.pool)
+        lower = f.pool.lower
+        keep = f.pid > 0
+        # string tests once per distinct interned name, not per process
+        names = np.unique(f.name_id)
+        idle = [i for i in names if lower[i] == "system idle process"]
+        if idle:
+            keep &= ~np.isin(f.name_id, idle)
+        if q:
+            keep &= self._index.accept(q, f.pid, f.name_id, f.path_id)
+        idx = np.flatnonzero(keep)
+
+        # top `limit` by the view's sort column without sorting everything
+        key = _sort_key(f, column, self.history)[idx]
+        if descending:
+            key = -key
+        if 0 < limit < len(idx):
+            part = np.argpartition(key, limit - 1)[:limit]
+            idx, key = idx[part], key[part]
+        idx = idx[np.argsort(key, kind="stable")]
+
+        out = f.take(idx)
+        # the view paints history from this copy, never from the ring the next ingest() writes
+        hist = self.history.rows(out.hist_slot) if limit > 0 else None
+        self.result.emit(out, limit, hist)
+
+
+HISTORY_ROLE = Qt.UserRole + 1   # list of floats oldest -> newest, for the sparkline columns
+_FLAGGED_BG = QColor(255, 92, 92, 48)   # rows unusual for their program
+
+
+def _trend_text(bytes_per_s: float) -> str:
+    if not np.isfinite(bytes_per_s):
+        return ""
+    return f"{bytes_per_s * 60.0 / (1024.0 * 1024.0):+.1f}"
+
+
+class _HistoryDelegate(QStyledItemDelegate):
+    """Tiny sparkline of a process's CPU or RSS history (HISTORY_ROLE)."""
+
+    def __init__(self, color: QColor, floor_zero: bool, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._color = color
+        self._floor_zero = floor_zero   # CPU from 0; RSS scaled to its own range
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        super().paint(painter, option, index)
+        data = index.data(HISTORY_ROLE)
+        if not data:
+            return
+        data = np.asarray(data, dtype=np.float64)
+        ok = np.isfinite(data)
+        if ok.sum() < 2:
+            return
+        vals = data[ok]
+        vmin = 0.0 if self._floor_zero else float(vals.min())
+        vmax = float(vals.max())
+        if vmax - vmin < 1e-6:
+            vmax = vmin + 1.0
+        r = option.rect.adjusted(4, 4, -4, -4)
+        n = len(data)
+        xs = r.left() + r.width() * (np.flatnonzero(ok) / (n - 1))
+        ys = r.bottom() - r.height() * ((vals - vmin) / (vmax - vmin))
+        path = QPainterPath()
+        path.moveTo(float(xs[0]), float(ys[0]))
+        for x, y in zip(xs[1:].tolist(), ys[1:].tolist(), strict=True):
+            path.lineTo(x, y)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(QPen(self._color, 1.5))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(path)
+        painter.restore()
+
+
+def _tooltip(t, i: int) -> str:
+    """Tooltip for row / slot `i` of a ProcTable or ProcTree."""
+    lines = [f"{t.name(i)} (PID {int(t.pid[i])})", t.path(i)]
+    mb = 1024.0 * 1024.0
+    if np.isfinite(t.io_read[i]):
+        lines.append(f"Disk I/O: {t.io_read[i] / mb:.1f} MB read, {t.io_write[i] / mb:.1f} MB written")
+    extra = []
+    if np.isfinite(t.fds[i]):
+        extra.append(f"{int(t.fds[i])} open files")
+    if np.isfinite(t.sockets[i]):
+        extra.append(f"{int(t.sockets[i])} sockets")
+    if extra:
+        lines.append(", ".join(extra))
+    leak = getattr(t, "leak", None)
+    if leak is not None and np.isfinite(leak[i]):
+        lines.append(f"RAM trend: {_trend_text(leak[i])} MB/min")
+    if t.flags[i]:
+        unusual = " and ".join(m for m, bit in (("CPU", CPU_FLAG), ("RAM", RAM_FLAG)) if t.flags[i] & bit)
+        score = getattr(t, "score", None)
+        suffix = f" (score {score[i]:.1f})" if score is not None and np.isfinite(score[i]) else ""
+        lines.append(f"Unusual {unusual} for this program{suffix}")
+    return "\n".join(lines)
 
 
 # -----------------------------
-# Model (delta updates + stable)
+# Model (columnar, delta updates + lazy text)
 # -----------------------------
 class ProcModel(QAbstractTableModel):
-    HEADERS = ["Name", "PID", "CPU %", "RAM (MB)", "Status", "Path"]
+    HEADERS = ["Name", "PID", "CPU %", "RAM (MB)", "Status", "CPU history", "RAM history", "RAM trend (MB/min)", "Path"]
+    HISTORY_COLUMNS = {5: "cpu", 6: "rss"}   # painted by _HistoryDelegate
+    _MAX_REMOVE_RUNS = 64   # beyond this many separate gaps a reset is cheaper
 
     def __init__(self) -> None:
         super().__init__()
-        self._rows: List[ProcRow] = []
-        self._pid_to_row: Dict[int, int] = {}
-
-    @property
-    def rows(self) -> List[ProcRow]:
-        return self._rows
+        self.history: Optional[HistoryRows] = None   # of the rows in the current frame
+        self.table = ProcTable()
+        self._text = self._blank(0)  # formatted cells, None = not formatted yet
+        self._applying = False       # rows shift mid-update: format without caching
+
+    def row(self, i: int) -> ProcRow:
+        t = self.table
+        return ProcRow(
+            int(t.pid[i]), t.name(i), float(t.cpu[i]), round(float(t.rss[i]) / (1024.0 * 1024.0), 1),
+            STATUSES[t.status[i]], t.path(i),
+        )
 
-    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
-        return 0 if parent.isValid() else len(self._rows)
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        return 0 if parent is not None and parent.isValid() else len(self.table)
 
-    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802
-        return 0 if parent.isValid() else len(self.HEADERS)
+    def columnCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        return 0 if parent is not None and parent.isValid() else len(self.HEADERS)
 
     def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
         if role != Qt.DisplayRole:
@@ -175,123 +246,385 @@ class ProcModel(QAbstractTableModel):
             return self.HEADERS[section]
         return str(section + 1)
 
+    def _format(self, i: int, c: int) -> str:
+        t = self.table
+        if c == 0:
+            return t.name(i)
+        if c == 1:
+            return str(int(t.pid[i]))
+        if c == 2:
+            return f"{t.cpu[i]:.1f}"
+        if c == 3:
+            return f"{t.rss[i] / (1024.0 * 1024.0):.1f}"
+        if c == 4:
+            return STATUSES[t.status[i]]
+        if c in self.HISTORY_COLUMNS:
+            return ""
+        if c == 7:
+            return _trend_text(t.leak[i])
+        return t.path(i)
+
     def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
         if not index.isValid():
             return None
-        r = self._rows[index.row()]
+        i = index.row()
         c = index.column()
+        t = self.table
 
         # numeric + stable sorting role
         if role == Qt.UserRole:
-            if c == 0: return r.name.lower()
-            if c == 1: return r.pid
-            if c == 2: return r.cpu
-            if c == 3: return r.ram_mb
-            if c == 4: return r.status.lower()
-            if c == 5: return r.path.lower()
+            if c == 0:
+                return t.pool.lower[t.name_id[i]]
+            if c == 1:
+                return int(t.pid[i])
+            if c == 2:
+                return float(t.cpu[i])
+            if c == 3:
+                return int(t.rss[i])
+            if c == 4:
+                return STATUSES[t.status[i]]
+            if c == 5:
+                return self.history.mean(int(t.hist_slot[i])) if self.history is not None else 0.0
+            if c == 6:
+                return int(t.rss[i])
+            if c == 7:
+                return float(t.leak[i]) if np.isfinite(t.leak[i]) else -math.inf
+            return t.path(i).lower()
+
+        if role == HISTORY_ROLE:
+            if self.history is None or c not in self.HISTORY_COLUMNS:
+                return None
+            series = self.history.series(int(t.hist_slot[i]), self.HISTORY_COLUMNS[c])
+            # plain list: numpy arrays do not survive the QVariant round trip
+            return series.tolist() if series is not None else None
 
         if role == Qt.DisplayRole:
-            if c == 0: return r.name
-            if c == 1: return str(r.pid)
-            if c == 2: return f"{r.cpu:.1f}"
-            if c == 3: return f"{r.ram_mb:.1f}"
-            if c == 4: return r.status
-            if c == 5: return r.path
+            if self._applying:
+                return self._format(i, c)
+            text = self._text[i, c]
+            if text is None:
+                text = self._text[i, c] = self._format(i, c)
+            return text
 
         if role == Qt.TextAlignmentRole:
-            if c in (1, 2, 3):
+            if c in (1, 2, 3, 7):
                 return int(Qt.AlignRight | Qt.AlignVCenter)
             return int(Qt.AlignLeft | Qt.AlignVCenter)
 
         if role == Qt.ToolTipRole:
-            return f"{r.name} (PID {r.pid})\n{r.path}"
+            return _tooltip(t, i)
 
-        return None
+        if role == Qt.BackgroundRole:
+            return _FLAGGED_BG if t.flags[i] else None
 
-    def _rebuild_index(self) -> None:
-        self._pid_to_row = {r.pid: i for i, r in enumerate(self._rows)}
+        return None
 
-    def set_rows_delta(self, new_rows: List[ProcRow]) -> None:
+    def set_frame(self, frame: ProcFrame, history: Optional[HistoryRows] = None) -> None:
         """
-        Delta update strategy:
-        - remove vanished pids
-        - insert new pids
-        - update changed rows in place
-        This avoids beginResetModel() and makes UI feel instant.
+        Delta update from a scan (`history`: its rows' sparkline data), all
+        bookkeeping in array ops:
+        - remove vanished processes (contiguous runs, bottom up)
+        - update changed rows in place (one dataChanged per run)
+        - append new processes in one insert
+        This avoids beginResetModel() and keeps selection / scroll stable.
         """
-        old_pids = set(self._pid_to_row.keys())
-        new_pids = {r.pid for r in new_rows}
-
-        # 1) removals (from bottom to top to keep indices valid)
-        removed = sorted((self._pid_to_row[pid] for pid in old_pids - new_pids), reverse=True)
-        for row_idx in removed:
-            self.beginRemoveRows(QModelIndex(), row_idx, row_idx)
-            self._rows.pop(row_idx)
-            self.endRemoveRows()
-        if removed:
-            self._rebuild_index()
-
-        # 2) inserts (append; sorting handled by proxy)
-        inserts = [r for r in new_rows if r.pid not in self._pid_to_row]
-        if inserts:
-            start = len(self._rows)
-            end = start + len(inserts) - 1
-            self.beginInsertRows(QModelIndex(), start, end)
-            self._rows.extend(inserts)
+        t = self.table
+        plan = t.plan(frame)
+        self.history = history
+        self._applying = True
+        try:
+            self._apply(plan)
+        finally:
+            self._applying = False
+        if len(t) and self.history is not None:
+            # every row gained a sample; one signal for the sparkline columns
+            cols = sorted(self.HISTORY_COLUMNS)
+            self.dataChanged.emit(self.index(0, cols[0]), self.index(len(t) - 1, cols[-1]), [HISTORY_ROLE])
+
+    def _apply(self, plan: TablePlan) -> None:
+        t = self.table
+
+        # 1) removals (rows shift, so the text cache starts over)
+        gaps = runs(plan.removed)
+        if gaps:
+            self._text = self._blank(len(t))
+        if len(gaps) > self._MAX_REMOVE_RUNS:
+            self.beginResetModel()
+            t.drop(plan.removed)
+            self.endResetModel()
+        else:
+            for lo, hi in reversed(gaps):
+                self.beginRemoveRows(QModelIndex(), lo, hi)
+                t.remove(lo, hi)
+                self.endRemoveRows()
+
+        # 2) updates (dataChanged only for changed rows)
+        if len(plan.changed):
+            t.update(plan)
+            self._text[plan.changed] = None
+            last = self.columnCount() - 1
+            roles = [Qt.DisplayRole, Qt.UserRole, Qt.ToolTipRole, Qt.BackgroundRole]
+            for lo, hi in runs(plan.changed):
+                self.dataChanged.emit(self.index(lo, 0), self.index(hi, last), roles)
+
+        # 3) inserts (append; sorting handled by proxy)
+        k = len(plan.inserted)
+        if k:
+            start = len(t)
+            self.beginInsertRows(QModelIndex(), start, start + k - 1)
+            t.append(plan)
             self.endInsertRows()
-            self._rebuild_index()
-
-        # 3) updates (dataChanged only for changed rows)
-        # Build quick lookup for new rows
-        new_map = {r.pid: r for r in new_rows}
-        for pid, i in self._pid_to_row.items():
-            nr = new_map.get(pid)
-            if nr is None:
-                continue
-            if self._rows[i] != nr:
-                self._rows[i] = nr
-                top_left = self.index(i, 0)
-                bottom_right = self.index(i, self.columnCount() - 1)
-                self.dataChanged.emit(top_left, bottom_right, [Qt.DisplayRole, Qt.UserRole, Qt.ToolTipRole])
-
-    def row_at_proxy(self, proxy_row: int, proxy: QSortFilterProxyModel) -> Optional[ProcRow]:
-        src = proxy.mapToSource(proxy.index(proxy_row, 0))
-        if not src.isValid():
+        self._text = np.concatenate([self._text[:len(t) - k], self._blank(k)]) if k else self._text[:len(t)]
+
+    def _blank(self, n: int) -> np.ndarray:
+        return np.full((n, len(self.HEADERS)), None, dtype=object)
+
+    def slot(self, row: int, parent: QModelIndex) -> int:
+        return row
+
+    def row_at(self, index: QModelIndex) -> Optional[ProcRow]:
+        i = index.row()
+        if index.isValid() and 0 <= i < len(self.table):
+            return self.row(i)
+        return None
+
+
+class _TreeSignals(TreeListener):
+    """Forwards ProcTree structure changes to the model's row signals."""
+
+    def __init__(self, model: "ProcTreeModel") -> None:
+        self.m = model
+
+    def begin_insert(self, parent: int, first: int, last: int) -> None:
+        self.m.beginInsertRows(self.m.index_of(parent), first, last)
+
+    def end_insert(self) -> None:
+        self.m.endInsertRows()
+
+    def begin_move(self, src_parent: int, row: int, dst_parent: int, dst_row: int) -> None:
+        self.m.beginMoveRows(self.m.index_of(src_parent), row, row, self.m.index_of(dst_parent), dst_row)
+
+    def end_move(self) -> None:
+        self.m.endMoveRows()
+
+    def begin_remove(self, parent: int, first: int, last: int) -> None:
+        self.m.beginRemoveRows(self.m.index_of(parent), first, last)
+
+    def end_remove(self) -> None:
+        self.m.endRemoveRows()
+
+    def changed(self, slots: np.ndarray) -> None:
+        t = self.m.tree
+        last = self.m.columnCount() - 1
+        roles = [Qt.DisplayRole, Qt.UserRole, Qt.ToolTipRole, Qt.BackgroundRole]
+        # runs of consecutive rows under the same parent, one signal each
+        order = np.lexsort((t.pos[slots], t.parent[slots]))
+        slots = slots[order]
+        parent, pos = t.parent[slots], t.pos[slots]
+        starts = np.flatnonzero(np.r_[True, (np.diff(parent) != 0) | (np.diff(pos) != 1)])
+        ends = np.r_[starts[1:], len(slots)] - 1
+        for a, b in zip(starts.tolist(), ends.tolist(), strict=True):
+            self.m.dataChanged.emit(
+                self.m.createIndex(int(pos[a]), 0, int(slots[a])),
+                self.m.createIndex(int(pos[b]), last, int(slots[b])),
+                roles,
+            )
+
+
+class ProcTreeModel(QAbstractItemModel):
+    """
+    Processes nested under their parent (ppid), with subtree CPU / RAM
+    totals kept by ``ProcTree``. Index ids are tree slots; updates emit
+    exact insert / move / remove signals, so expansion and selection survive.
+    """
+    HEADERS = ["Name", "PID", "CPU %", "RAM (MB)", "Total CPU %", "Total RAM (MB)", "Status", "Path"]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tree = ProcTree()
+        self._signals = _TreeSignals(self)
+
+    @property
+    def table(self) -> ProcTree:
+        # what ProcProxy filters: pid / name_id / path_id per slot
+        return self.tree
+
+    def index_of(self, slot: int) -> QModelIndex:
+        if slot == ROOT:
+            return QModelIndex()
+        return self.createIndex(int(self.tree.pos[slot]), 0, slot)
+
+    def slot(self, row: int, parent: QModelIndex) -> int:
+        return self.tree.kids(parent.internalId() if parent.isValid() else ROOT)[row]
+
+    def index(self, row: int, column: int, parent: QModelIndex | None = None) -> QModelIndex:
+        if parent is None:
+            parent = QModelIndex()
+        if parent.isValid() and parent.column() != 0:
+            return QModelIndex()
+        kids = self.tree.kids(parent.internalId() if parent.isValid() else ROOT)
+        if 0 <= row < len(kids) and 0 <= column < len(self.HEADERS):
+            return self.createIndex(row, column, kids[row])
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex | None = None) -> QModelIndex:  # type: ignore[override]
+        if index is None or not index.isValid():
+            return QModelIndex()
+        return self.index_of(int(self.tree.parent[index.internalId()]))
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        if parent is None:
+            parent = QModelIndex()
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        return len(self.tree.kids(parent.internalId() if parent.isValid() else ROOT))
+
+    def columnCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        return len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
             return None
-        i = src.row()
-        if 0 <= i < len(self._rows):
-            return self._rows[i]
+        s = index.internalId()
+        c = index.column()
+        t = self.tree
+        mb = 1024.0 * 1024.0
+
+        if role == Qt.UserRole:
+            if c == 0:
+                return t.pool.lower[t.name_id[s]]
+            if c == 1:
+                return int(t.pid[s])
+            if c == 2:
+                return float(t.cpu[s])
+            if c == 3:
+                return int(t.rss[s])
+            if c == 4:
+                return float(t.sub_cpu[s])
+            if c == 5:
+                return int(t.sub_rss[s])
+            if c == 6:
+                return STATUSES[t.status[s]]
+            return t.path(s).lower()
+
+        if role == Qt.DisplayRole:
+            if c == 0:
+                return t.name(s)
+            if c == 1:
+                return str(int(t.pid[s]))
+            if c == 2:
+                return f"{t.cpu[s]:.1f}"
+            if c == 3:
+                return f"{t.rss[s] / mb:.1f}"
+            if c == 4:
+                return f"{max(0.0, t.sub_cpu[s]):.1f}"
+            if c == 5:
+                return f"{t.sub_rss[s] / mb:.1f}"
+            if c == 6:
+                return STATUSES[t.status[s]]
+            return t.path(s)
+
+        if role == Qt.TextAlignmentRole:
+            if 1 <= c <= 5:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+
+        if role == Qt.ToolTipRole:
+            return _tooltip(t, s)
+
+        if role == Qt.BackgroundRole:
+            return _FLAGGED_BG if t.flags[s] else None
+
         return None
 
+    def set_frame(self, frame: ProcFrame) -> None:
+        self.tree.update(frame, self._signals)
+
+    def row_at(self, index: QModelIndex) -> Optional[ProcRow]:
+        if not index.isValid():
+            return None
+        s = index.internalId()
+        t = self.tree
+        return ProcRow(
+            int(t.pid[s]), t.name(s), float(t.cpu[s]), round(float(t.rss[s]) / (1024.0 * 1024.0), 1),
+            STATUSES[t.status[s]], t.path(s),
+        )
+
 
 class ProcProxy(QSortFilterProxyModel):
+    """
+    Filter by name / path substring or exact pid. The accepted rows are one
+    boolean mask over the source table (ProcModel rows or ProcTreeModel slots), computed with ``SearchIndex`` and
+    rebuilt only when the query or the table changes, so ``filterAcceptsRow``
+    is an array lookup. A keystroke that leaves the mask unchanged does not
+    invalidate the proxy at all.
+    """
+
     def __init__(self) -> None:
         super().__init__()
         self.q = ""
+        self._table: Optional[ProcTable] = None
+        self._index: Optional[SearchIndex] = None
+        self._mask = np.ones(0, dtype=bool)
+        self._mask_version = -1
 
     def setQuery(self, q: str) -> None:
-        self.q = (q or "").strip().lower()
-        self.invalidateFilter()
+        q = (q or "").strip().lower()
+        if q == self.q:
+            return
+        current = self._table is not None and self._mask_version == self._table.version
+        old = self._mask if current else None   # what the proxy shows right now
+        self.q = q
+        self._update_mask()
+        if old is not None and np.array_equal(old, self._mask):
+            return
+        self.invalidateRowsFilter()
+
+    def setSourceModel(self, model) -> None:  # noqa: N802
+        self._table = model.table
+        self._mask_version = -1
+        super().setSourceModel(model)
+
+    def _update_mask(self) -> None:
+        t = self._table
+        if t is None:
+            return
+        if not self.q:
+            self._mask = np.ones(len(t.pid), dtype=bool)
+        else:
+            if self._index is None or self._index.pool is not t.pool:
+                self._index = SearchIndex(t.pool)
+            self._mask = self._index.accept(self.q, t.pid, t.name_id, t.path_id)
+        self._mask_version = t.version
 
     def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
         if not self.q:
             return True
-        m: ProcModel = self.sourceModel()  # type: ignore[assignment]
-        r = m.rows[source_row]
-        q = self.q
-        if q.isdigit() and int(q) == r.pid:
-            return True
-        return (q in r.name.lower()) or (q in r.path.lower())
+        if self._mask_version != self._table.version:
+            self._update_mask()
+        return bool(self._mask[self.sourceModel().slot(source_row, source_parent)])
 
 
 # -----------------------------
 # Page (coalesced apply + no scan on typing)
 # -----------------------------
 class ProcessesPage(QWidget):
-    scan_requested = Signal(str, int)
+    select_requested = Signal(str, int, int, bool)  # query, limit, sort column, descending
+    frame_received = Signal(object)                 # hub frame, scored whether shown or not
+    process_anomalies = Signal(object)             # List[ProcAnomaly], forwarded from the worker
+    BACKGROUND_PERIOD_S = 10.0   # process scans while the list is not shown, for the baselines
 
-    def __init__(self) -> None:
+    def __init__(self, activity: Optional[ActivityManager], hub: SamplingHub) -> None:
         super().__init__()
+        self._activity = activity
+        self._hub = hub   # every frame comes from the shared clock
+        self._live = False       # on screen with auto refresh on: every frame is shown
+        self._awaiting = False   # refresh clicked: show the next frame even when not live
 
         root = QVBoxLayout(self)
         root.setContentsMargins(0, 0, 0, 0)
@@ -301,7 +634,7 @@ class ProcessesPage(QWidget):
         title_box = QVBoxLayout()
         title = QLabel("Processes")
         title.setObjectName("TitleXL")
-        sub = QLabel("Smooth process manager (Task Manager style).")
+        sub = QLabel("Smooth process manager (Task Manager style). Highlighted rows are unusual for their program.")
         sub.setObjectName("Muted")
         title_box.addWidget(title)
         title_box.addWidget(sub)
@@ -312,6 +645,10 @@ class ProcessesPage(QWidget):
         self.search.setMaximumWidth(360)
         header.addWidget(self.search)
 
+        self.chk_tree = QCheckBox("Tree")
+        self.chk_tree.setToolTip("Group processes under their parent, with subtree totals")
+        header.addWidget(self.chk_tree)
+
         self.chk_auto = QCheckBox("Auto refresh")
         self.chk_auto.setChecked(True)
         header.addWidget(self.chk_auto)
@@ -336,39 +673,72 @@ class ProcessesPage(QWidget):
         self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.view.setAlternatingRowColors(True)
         self.view.setSortingEnabled(True)
+        self.view.sortByColumn(2, Qt.DescendingOrder)   # CPU, like the first scan
         self.view.horizontalHeader().setStretchLastSection(True)
         self.view.setContextMenuPolicy(Qt.CustomContextMenu)
         root.addWidget(self.view, 1)
 
         self.view.customContextMenuRequested.connect(self._ctx_menu)
+        self.view.setItemDelegateForColumn(5, _HistoryDelegate(QColor(78, 141, 255, 200), True, self.view))
+        self.view.setItemDelegateForColumn(6, _HistoryDelegate(QColor(70, 200, 140, 200), False, self.view))
+
+        # tree mode: every process (no top-N), nested by ppid
+        self.tree_model = ProcTreeModel()
+        self.tree_proxy = ProcProxy()
+        self.tree_proxy.setSourceModel(self.tree_model)
+        self.tree_proxy.setRecursiveFilteringEnabled(True)   # keep ancestors of matches
+        self.tree_proxy.setAutoAcceptChildRows(True)         # and the subtree of a matching parent
+        self.tree_proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.tree_proxy.setSortRole(Qt.UserRole)
+
+        self.tree_view = QTreeView()
+        self.tree_view.setModel(self.tree_proxy)
+        self.tree_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tree_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tree_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tree_view.setAlternatingRowColors(True)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setSortingEnabled(True)
+        self.tree_view.sortByColumn(4, Qt.DescendingOrder)   # busiest subtrees first
+        self.tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree_view.setColumnWidth(0, 280)
+        self.tree_view.hide()
+        root.addWidget(self.tree_view, 1)
+
+        self.tree_view.customContextMenuRequested.connect(self._ctx_menu)
 
         # Worker thread
         self._thread = QThread(self)
         self._worker = ProcWorker()
         self._worker.moveToThread(self._thread)
-        self.scan_requested.connect(self._worker.scan, Qt.QueuedConnection)
-        self._worker.result.connect(self._on_worker_rows, Qt.QueuedConnection)
+        self.select_requested.connect(self._worker.select, Qt.QueuedConnection)
+        self.frame_received.connect(self._worker.ingest, Qt.QueuedConnection)
+        self._worker.result.connect(self._on_worker_frame, Qt.QueuedConnection)
+        self._worker.anomalies.connect(self.process_anomalies, Qt.QueuedConnection)
         self._thread.start()
 
         # UI apply coalescing: worker may emit quickly, but we apply at most every ~80ms
-        self._pending_rows: Optional[List[ProcRow]] = None
+        self._pending: Optional[Tuple[ProcFrame, int, Optional[HistoryRows]]] = None
         self._apply_timer = QTimer(self)
         self._apply_timer.setSingleShot(True)
         self._apply_timer.setInterval(80)
         self._apply_timer.timeout.connect(self._apply_pending)
 
-        # Refresh timer
-        self._timer = QTimer(self)
-        self._timer.setInterval(1800)
-        self._timer.timeout.connect(self.refresh)
-
         # Wiring: search only filters locally -> zero lag while typing
         self.search.textChanged.connect(self.proxy.setQuery)
-        self.btn_refresh.clicked.connect(self.refresh)
+        self.search.textChanged.connect(self.tree_proxy.setQuery)
+        self.chk_tree.toggled.connect(self._on_tree)
+        self.btn_refresh.clicked.connect(self._on_refresh_clicked)
         self.chk_auto.toggled.connect(self._on_auto)
+        # the worker picks the top rows for the sort key, so a new key needs a new scan
+        self.view.horizontalHeader().sortIndicatorChanged.connect(lambda _c, _o: self.refresh())
 
-        self._timer.start()
-        self.refresh()
+        # baselines learn and flag from every frame; off screen (or with auto
+        # refresh off) frames only come every BACKGROUND_PERIOD_S and are not shown
+        hub.snapshots.connect(self._on_snapshots)
+        if activity is not None:
+            activity.register(self, on_pause=self._update_rate, on_resume=self._on_resume)
+        self._update_rate()
 
         # widths once
         self.view.setColumnWidth(0, 240)
@@ -376,35 +746,89 @@ class ProcessesPage(QWidget):
         self.view.setColumnWidth(2, 90)
         self.view.setColumnWidth(3, 110)
         self.view.setColumnWidth(4, 110)
+        self.view.setColumnWidth(5, 110)
+        self.view.setColumnWidth(6, 110)
+        self.view.setColumnWidth(7, 140)
 
     def _on_auto(self, on: bool) -> None:
+        self._update_rate()
         if on:
-            self._timer.start()
-        else:
-            self._timer.stop()
+            self.refresh()
 
-    def refresh(self) -> None:
+    def _on_resume(self) -> None:
+        self._update_rate()
+        self.refresh()   # the last scored frame now, a fresh one on the next tick
+
+    def _update_rate(self) -> None:
+        paused = self._activity is not None and self._activity.is_paused(self)
+        self._live = self.chk_auto.isChecked() and not paused
+        self._hub.subscribe(self, PROCESSES, proc_period_s=None if self._live else self.BACKGROUND_PERIOD_S)
+
+    def _on_snapshots(self, snaps) -> None:
+        frames = [s.procs for s in snaps if s.procs is not None]
+        if not frames:
+            return
+        self.frame_received.emit(frames[-1])
+        if self._live or self._awaiting:
+            self._awaiting = False
+            self.refresh()   # queued after the frame, so it selects from it
+
+    def _on_tree(self, on: bool) -> None:
+        self.view.setVisible(not on)
+        self.tree_view.setVisible(on)
+        self.refresh()
+
+    def _active(self) -> Tuple[QAbstractItemView, QSortFilterProxyModel]:
+        if self.chk_tree.isChecked():
+            return self.tree_view, self.tree_proxy
+        return self.view, self.proxy
+
+    def _request(self) -> Tuple[str, int, int, bool]:
+        """(query, limit, sort column, descending) for the worker."""
+        if self.chk_tree.isChecked():
+            # the tree needs every process; the query only filters locally
+            return "", 0, 2, True
         # Keep scanning using current query so results list stays small when filtered
-        q = self.search.text()
-        limit = 250
-        self.scan_requested.emit(q, limit)
+        header = self.view.horizontalHeader()
+        descending = header.sortIndicatorOrder() == Qt.DescendingOrder
+        return self.search.text(), 250, header.sortIndicatorSection(), descending
 
-    def _on_worker_rows(self, rows: list) -> None:
+    def refresh(self) -> None:
+        # new query / sort key / mode: re-select from the last frame, no extra scan
+        self.select_requested.emit(*self._request())
+
+    def _on_refresh_clicked(self) -> None:
+        self.refresh()
+        self._awaiting = True
+        self._hub.poke()
+
+    def _on_worker_frame(self, frame: ProcFrame, limit: int, history: Optional[HistoryRows]) -> None:
         # store latest, coalesce UI apply
-        self._pending_rows = list(rows)
+        self._pending = (frame, limit, history)
         if not self._apply_timer.isActive():
             self._apply_timer.start()
 
     def _apply_pending(self) -> None:
-        rows = self._pending_rows
-        self._pending_rows = None
-        if rows is None:
+        pending = self._pending
+        self._pending = None
+        if pending is None:
+            return
+        frame, limit, history = pending
+        if limit == 0:                                # full scan -> tree
+            first = len(self.tree_model.tree) == 0
+            self.tree_view.setUpdatesEnabled(False)
+            try:
+                self.tree_model.set_frame(frame)
+            finally:
+                self.tree_view.setUpdatesEnabled(True)
+            if first:
+                self.tree_view.expandToDepth(0)
             return
 
         # prevent micro-jitter repaints
         self.view.setUpdatesEnabled(False)
         try:
-            self.model.set_rows_delta(rows)
+            self.model.set_frame(frame, history)
         finally:
             self.view.setUpdatesEnabled(True)
 
@@ -415,10 +839,11 @@ class ProcessesPage(QWidget):
         )
 
     def _ctx_menu(self, pos) -> None:
-        idx = self.view.indexAt(pos)
+        view, proxy = self._active()
+        idx = view.indexAt(pos)
         if not idx.isValid():
             return
-        row = self.model.row_at_proxy(idx.row(), self.proxy)
+        row = proxy.sourceModel().row_at(proxy.mapToSource(idx))
         if row is None:
             return
 
@@ -473,6 +898,7 @@ class ProcessesPage(QWidget):
         menu.exec(QCursor.pos())
 
     def closeEvent(self, e) -> None:  # type: ignore[override]
+        self._hub.unsubscribe(self, PROCESSES)
         try:
             self._thread.requestInterruption()
             self._thread.quit()
@@ -0,0 +1,228 @@
+"""One sampling clock for every live view.
+
+``SamplingHub`` owns the collectors (system metrics and the process
+scanner) and a single clock thread. Each tick reads every stream that has
+at least one subscriber exactly once and publishes the result as an
+immutable ``Snapshot``; the dashboard, session, persistence and Processes
+page all consume the same snapshots instead of polling psutil / procfs on
+timers of their own. Streams nobody subscribes to are not read at all; processes are scanned at
+the fastest period any subscriber currently asks for.
+
+Snapshots are delivered in batches (at most ``max_rate_hz`` signals per
+second, like the old per-view workers); a tick that scanned processes is
+delivered at once. Process frames have read-only arrays, so subscribers
+derive new frames (``dataclasses.replace`` / ``take``) instead of writing
+into a shared one.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+from sba.collectors.adaptive import AdaptiveInterval
+from sba.guardian_gui.core.procscan import ProcFrame, ProcScanner
+from sba.guardian_gui.workers.system_worker import SystemCollector, SystemSample
+
+SYSTEM = "system"        # SystemSample every tick
+PROCESSES = "processes"  # ProcFrame every ``proc_period_s``
+STREAMS = (SYSTEM, PROCESSES)
+
+log = logging.getLogger("sba.hub")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    ts: float
+    tick: int
+    system: Optional[SystemSample] = None   # None: nobody subscribed this tick
+    procs: Optional[ProcFrame] = None       # None: not scanned this tick
+
+
+def _freeze(f: ProcFrame) -> ProcFrame:
+    for fld in fields(f):
+        v = getattr(f, fld.name)
+        if isinstance(v, np.ndarray):
+            v.setflags(write=False)
+    for v in f.read_ts.values():
+        v.setflags(write=False)
+    return f
+
+
+class FailureReporter:
+    """
+    Logs a repeating failure and passes it to `emit` at most once per
+    ``every_s``; the ones in between are only counted, so a scan that fails
+    every tick does not flood the log or the UI.
+    """
+
+    def __init__(self, logger: logging.Logger, emit: Callable[[str], None], every_s: float = 30.0) -> None:
+        self.logger = logger
+        self.emit = emit
+        self.every_s = float(every_s)
+        self._last = -float("inf")
+        self._count = 0
+
+    def __call__(self, what: str, e: Exception) -> None:
+        self._count += 1
+        now = time.monotonic()
+        if now - self._last < self.every_s:
+            return
+        n, self._count, self._last = self._count, 0, now
+        self.logger.warning("%s failed (%d time(s) since last report)", what, n, exc_info=e)
+        self.emit(f"{what} failed: {type(e).__name__}: {e}")
+
+
+class SamplingHub(QThread):
+    snapshots = Signal(object)  # List[Snapshot], oldest first
+    error = Signal(str)
+
+    def __init__(
+        self,
+        interval_s: float = 1.0,
+        disk_path: str = "C:\\",
+        max_rate_hz: float = 30.0,
+        adaptive: Optional[AdaptiveInterval] = None,
+        proc_period_s: float = 1.8,
+        proc_budget_s: float = 0.3,
+    ) -> None:
+        super().__init__()
+        self.adaptive = adaptive
+        self.interval_s = float(max(0.02, adaptive.interval if adaptive else interval_s))
+        self.min_emit_s = 1.0 / max(1.0, float(max_rate_hz))
+        self.proc_period_s = float(proc_period_s)
+        self.system = SystemCollector(disk_path)
+        # created on the hub thread (its pool is written there); budget keeps ticks short
+        self.scanner: Optional[ProcScanner] = None
+        self.proc_budget_s = proc_budget_s
+
+        self._lock = threading.Lock()
+        self._subs: Dict[str, Set[object]] = {s: set() for s in STREAMS}
+        self._proc_periods: Dict[object, float] = {}   # PROCESSES subscriber -> its period
+        self._wake = threading.Event()
+        self._force_procs = False
+        self._running = True
+        self._tick = 0
+        self._sys_on = False       # system counters primed and subscribed last tick
+        self._last_procs = -float("inf")
+
+        self._pending: List[Snapshot] = []
+        self._last_emit = 0.0
+        self._report = FailureReporter(log, self.error.emit)
+
+    # -------------------------
+    # Subscriptions (any thread)
+    # -------------------------
+    def subscribe(self, key: object, *streams: str, proc_period_s: Optional[float] = None) -> None:
+        """
+        `key` (usually the consumer widget) wants `streams` from the next tick,
+        process frames every `proc_period_s` (default ``self.proc_period_s``).
+        Subscribing again only changes the period.
+        """
+        with self._lock:
+            for s in streams:
+                first = not self._subs[s]
+                self._subs[s].add(key)
+                if s == PROCESSES:
+                    self._proc_periods[key] = self.proc_period_s if proc_period_s is None else float(proc_period_s)
+                    if first:
+                        self._force_procs = True
+        self._wake.set()
+
+    def unsubscribe(self, key: object, *streams: str) -> None:
+        with self._lock:
+            for s in streams or STREAMS:
+                self._subs[s].discard(key)
+                if s == PROCESSES:
+                    self._proc_periods.pop(key, None)
+
+    def wants(self, stream: str) -> bool:
+        with self._lock:
+            return bool(self._subs[stream])
+
+    def poke(self) -> None:
+        """Scan processes on the next tick (now), even without subscribers or before their period."""
+        with self._lock:
+            self._force_procs = True
+        self._wake.set()
+
+    def flag_hot(self) -> None:
+        """A detector fired: sample faster from the next tick (adaptive mode only)."""
+        if self.adaptive is not None:
+            self.adaptive.bump()
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake.set()
+
+    # -------------------------
+    # Clock (hub thread)
+    # -------------------------
+    def _flush(self) -> None:
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self.snapshots.emit(batch)
+        self._last_emit = time.monotonic()
+
+    def tick(self) -> Optional[Snapshot]:
+        """Read every subscribed stream once; None if nobody is subscribed."""
+        with self._lock:
+            want_sys = bool(self._subs[SYSTEM])
+            period = min(self._proc_periods.values(), default=None)
+            force, self._force_procs = self._force_procs, False
+        now = time.monotonic()
+        scan = force or (period is not None and now - self._last_procs >= period)
+        if not (want_sys or scan):
+            self._sys_on = False
+            return None
+
+        sample = None
+        if want_sys and self._sys_on:
+            sample = self.system.read()
+        elif want_sys:
+            self.system.prime()         # (re)subscribed: first sample one interval later
+        self._sys_on = want_sys
+        frame = None
+        if scan:
+            self._last_procs = now
+            if self.scanner is None:
+                self.scanner = ProcScanner(budget_s=self.proc_budget_s)
+            try:
+                frame = _freeze(self.scanner.scan())
+            except Exception as e:      # one failed scan must not stop system sampling
+                self._report("Process scan", e)
+        if sample is None and frame is None:
+            return None
+        self._tick += 1
+        ts = sample.ts if sample is not None else frame.ts
+        snap = Snapshot(ts=ts, tick=self._tick, system=sample, procs=frame)
+
+        if sample is not None and self.adaptive is not None:
+            x = np.array([sample.cpu, sample.ram, sample.disk, sample.net_kbps])
+            self.interval_s = max(0.02, self.adaptive.update(x, sample.ts))
+        return snap
+
+    def run(self) -> None:
+        try:
+            while self._running:
+                t0 = time.time()
+                self._wake.clear()
+                snap = self.tick()
+                if snap is not None:
+                    self._pending.append(snap)
+                    if snap.procs is not None or time.monotonic() - self._last_emit >= self.min_emit_s:
+                        self._flush()
+
+                # Keep interval stable; subscribe() / poke() / stop() wake early
+                elapsed = time.time() - t0
+                self._wake.wait(max(0.0, self.interval_s - elapsed))
+        except Exception as e:
+            self.error.emit(f"{type(e).__name__}: {e}")
+        finally:
+            self._flush()
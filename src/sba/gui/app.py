@@ -10,7 +10,7 @@ from pathlib import Path
 from typing import Optional
 
 import pandas as pd
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import QEvent, QObject, QTimer, Qt
 from PySide6.QtGui import QFont, QAction
 from PySide6.QtWidgets import (
     QApplication,
@@ -41,7 +41,7 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 from sba.config import config
-from sba.ml.detect import detect_anomalies
+from sba.ml.detect import detect_anomalies, with_collected_columns
 from sba.ml.train import train_isolation_forest
 
 
@@ -138,6 +138,15 @@ def project_root() -> Path:
         return Path(__file__).resolve().parents[3]
 
 
+def file_stamp(path: Path) -> tuple[int, int] | None:
+    """(mtime_ns, size) of `path`, None if missing; cheap change detection."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def safe_read_parquet(path: Path) -> pd.DataFrame:
     if not path.exists():
         return pd.DataFrame()
@@ -192,6 +201,46 @@ class MetricChart(QWidget):
         self.canvas.draw_idle()
 
 
+# ---------------------------
+# Live refresh throttle
+# ---------------------------
+class LiveRefreshThrottle(QObject):
+    """Stops the live timer while the window is minimized/hidden and slows it
+    down while another application has focus; refreshes once on return."""
+
+    def __init__(self, window: QWidget, timer: QTimer, on_resume, background_factor: float = 4.0) -> None:
+        super().__init__(window)
+        self.window = window
+        self.timer = timer
+        self.on_resume = on_resume
+        self.base_interval = timer.interval()
+        self.background_factor = background_factor
+        self._paused = False
+        window.installEventFilter(self)
+        app = QApplication.instance()
+        if app is not None:
+            app.applicationStateChanged.connect(lambda _state: self._apply())
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if obj is self.window and event.type() in (QEvent.Type.Show, QEvent.Type.Hide, QEvent.Type.WindowStateChange):
+            self._apply()
+        return False
+
+    def _apply(self) -> None:
+        hidden = not self.window.isVisible() or self.window.isMinimized()
+        if hidden:
+            self.timer.stop()
+            self._paused = True
+            return
+        active = QApplication.applicationState() == Qt.ApplicationState.ApplicationActive
+        factor = 1.0 if active else self.background_factor
+        self.timer.setInterval(int(self.base_interval * factor))
+        if self._paused:
+            self._paused = False
+            self.timer.start()
+            self.on_resume()
+
+
 # ---------------------------
 # AI Chat (local command brain)
 # ---------------------------
@@ -284,7 +333,7 @@ class LocalAssistant:
             try:
                 df = detect_anomalies(Path(config.parquet_file), Path(config.model_file))
                 anom = df[df.get("is_anomaly", False) == True] if "is_anomaly" in df.columns else pd.DataFrame()
-                show = anom.tail(limit) if not anom.empty else pd.DataFrame()
+                show = with_collected_columns(anom.tail(limit), Path(config.parquet_file)) if not anom.empty else pd.DataFrame()
                 return ChatReply(
                     "Detect",
                     f"Anomalies total: {int(df['is_anomaly'].sum()) if 'is_anomaly' in df.columns else 0}\n\n"
@@ -386,6 +435,7 @@ class MainWindow(QMainWindow):
 
         self.assistant = LocalAssistant()
         self.df_current = pd.DataFrame()
+        self._parquet_stamp: tuple[int, int] | None = None   # file version df_current was read from
 
         # Central layout
         root = QWidget()
@@ -500,6 +550,9 @@ class MainWindow(QMainWindow):
         self.timer.timeout.connect(self.refresh_live)
         self.timer.start()
 
+        # stop re-reading parquet while minimized, slow down in the background
+        self.throttle = LiveRefreshThrottle(self, self.timer, on_resume=self.refresh_live)
+
         # Menu
         self._build_menu()
 
@@ -680,11 +733,14 @@ class MainWindow(QMainWindow):
     # Actions
     # ---------------------------
     def refresh_live(self) -> None:
-        if self.live_check.isChecked():
+        # the collector writes the file from another process: re-read only when it changed
+        if self.live_check.isChecked() and file_stamp(Path(config.parquet_file)) != self._parquet_stamp:
             self.refresh_all()
 
     def refresh_all(self) -> None:
-        df = safe_read_parquet(Path(config.parquet_file))
+        path = Path(config.parquet_file)
+        self._parquet_stamp = file_stamp(path)
+        df = safe_read_parquet(path)
         if df.empty:
             self.status.setText("No parquet yet. Run Collect first.")
             self.df_current = pd.DataFrame()
@@ -0,0 +1,109 @@
+"""Benchmark harness: every detector on the same train/test split.
+
+Reports fit time, scoring throughput, peak traced memory and detection
+quality against labels (typically from :mod:`sba.ml.synthetic`).
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sba.ml.detectors import DETECTORS, BaseDetector
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    fit_s: float
+    rows_per_s: float
+    peak_mem_mb: float
+    precision: float
+    recall: float
+    f1: float
+    roc_auc: float
+
+
+def _quality(y: np.ndarray, pred: np.ndarray, scores: np.ndarray) -> tuple[float, float, float, float]:
+    from sklearn.metrics import roc_auc_score
+
+    tp = int(np.sum(pred & y))
+    fp = int(np.sum(pred & ~y))
+    fn = int(np.sum(~pred & y))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    finite = np.isfinite(scores)
+    auc = float("nan")
+    if y[finite].any() and (~y[finite]).any():
+        auc = float(roc_auc_score(y[finite], scores[finite]))
+    return precision, recall, f1, auc
+
+
+def benchmark_detector(
+    name: str,
+    make: Callable[[], BaseDetector],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+) -> BenchmarkResult:
+    y = np.asarray(y_test, dtype=bool)
+
+    # timed run (tracemalloc would inflate the timings)
+    det = make()
+    t0 = time.perf_counter()
+    det.fit(X_train)
+    fit_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scores = det.score_batch(X_test)
+    score_s = time.perf_counter() - t0
+
+    # separate traced run for peak memory
+    tracemalloc.start()
+    try:
+        make().fit(X_train).score_batch(X_test)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    pred = scores >= det.threshold_
+    precision, recall, f1, auc = _quality(y, pred, scores)
+
+    return BenchmarkResult(
+        name=name,
+        fit_s=fit_s,
+        rows_per_s=len(X_test) / max(score_s, 1e-9),
+        peak_mem_mb=peak / (1024.0 * 1024.0),
+        precision=precision,
+        recall=recall,
+        f1=f1,
+        roc_auc=auc,
+    )
+
+
+def run_benchmark(
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    detectors: Optional[Dict[str, Callable[[], BaseDetector]]] = None,
+) -> List[BenchmarkResult]:
+    """
+    Benchmark ``detectors`` (name -> factory); defaults to every registered detector
+    with its default parameters.
+    """
+    factories = detectors or {name: cls for name, cls in DETECTORS.items()}
+    return [
+        benchmark_detector(name, make, X_train, X_test, y_test)
+        for name, make in factories.items()
+    ]
+
+
+def results_frame(results: Iterable[BenchmarkResult]) -> pd.DataFrame:
+    return pd.DataFrame([r.__dict__ for r in results]).set_index("name")
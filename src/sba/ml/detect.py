@@ -3,23 +3,127 @@ from __future__ import annotations
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
-FEATURES = ["cpu_percent", "mem_percent", "disk_percent", "net_sent_kb_s", "net_recv_kb_s"]
+from sba.ml.incidents import incidents_frame
+from sba.ml.seasonal import SeasonalBaseline
+from sba.storage.feature_store import FEATURES, FeatureMatrix, open_features
 
 
-def detect_anomalies(parquet_path: Path, model_path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(parquet_path).dropna()
-    if df.empty:
+def detect_anomalies(
+    parquet_path: Path,
+    model_path: Path,
+    start: float | None = None,
+    end: float | None = None,
+) -> pd.DataFrame:
+    fm = open_features(parquet_path).slice(start, end)
+    if len(fm) == 0:
         raise ValueError("No data found in parquet. Run collect first.")
 
     model = joblib.load(model_path)
 
-    X = df[FEATURES]
+    X = fm.X
     pred = model.predict(X)          # -1 anomaly, 1 normal
     score = model.decision_function(X)
+    return _frame(fm, pred, score)
 
-    out = df.copy()
+
+def detect_seasonal(
+    parquet_path: Path,
+    baseline_path: Path,
+    start: float | None = None,
+    end: float | None = None,
+) -> pd.DataFrame:
+    """Like detect_anomalies, but against the time-of-week baseline (see `sba baseline`)."""
+    fm = open_features(parquet_path).slice(start, end)
+    if len(fm) == 0:
+        raise ValueError("No data found in parquet. Run collect first.")
+
+    baseline = SeasonalBaseline.load(baseline_path)
+    score = baseline.score_batch(fm.X, fm.ts)
+    pred = np.where(score >= baseline.z_thresh, -1, 1)
+    # same sign convention as decision_function: negative = anomaly
+    return _frame(fm, pred, baseline.z_thresh - score)
+
+
+def _iso_ms(epoch: np.ndarray) -> np.ndarray:
+    """UTC epoch seconds -> ISO strings with milliseconds, like ``collectors.system_metrics``."""
+    ms = np.round(np.asarray(epoch, dtype=float) * 1000.0).astype("datetime64[ms]")
+    return np.char.add(np.datetime_as_string(ms, unit="ms"), "+00:00")
+
+
+def _frame(fm: FeatureMatrix, pred: np.ndarray, score: np.ndarray) -> pd.DataFrame:
+    """
+    ``ts_utc``, ``FEATURES``, ``is_anomaly``, ``anomaly_score`` per scored row
+    (straight from the sidecar; see ``with_collected_columns`` for the rest).
+    """
+    out = pd.DataFrame(np.asarray(fm.X, dtype=float), columns=FEATURES)
+    out.insert(0, "ts_utc", _iso_ms(fm.ts))
     out["is_anomaly"] = (pred == -1)
     out["anomaly_score"] = score
     return out
+
+
+def with_collected_columns(df: pd.DataFrame, parquet_path: Path) -> pd.DataFrame:
+    """
+    Add the collected columns the sidecar does not hold (``mem_used_mb``, ...)
+    to rows of a detect_* frame, in Parquet column order, matched on time.
+
+    Meant for the rows about to be shown (``detect --raw``): only the
+    non-feature columns are read, timestamps are parsed by Arrow, and only
+    rows within ``df``'s time range reach pandas.
+    """
+    names = pq.read_schema(parquet_path).names
+    cols = [c for c in names if c not in FEATURES and c != "ts_utc" and c not in df.columns]
+    if not cols or df.empty:
+        return df
+
+    want = pd.to_datetime(df["ts_utc"], utc=True, format="ISO8601").astype("datetime64[ms, UTC]")
+    table = pq.read_table(parquet_path, columns=["ts_utc", *cols])
+    ts = pc.cast(table["ts_utc"], pa.timestamp("ms", tz="UTC"))
+    lo = pa.scalar(want.min(), type=pa.timestamp("ms", tz="UTC"))
+    hi = pa.scalar(want.max(), type=pa.timestamp("ms", tz="UTC"))
+    keep = pc.and_(pc.greater_equal(ts, lo), pc.less_equal(ts, hi))
+    other = table.drop_columns(["ts_utc"]).append_column("_ts", ts).filter(keep).to_pandas()
+    other = other.sort_values("_ts", kind="stable")
+
+    key = pd.DataFrame({"_ts": want.to_numpy(), "_row": np.arange(len(df))}).sort_values("_ts", kind="stable")
+    other["_ts"] = other["_ts"].astype(key["_ts"].dtype)
+    got = pd.merge_asof(key, other, on="_ts", direction="nearest").sort_values("_row")
+
+    out = df.copy()
+    for c in cols:
+        out[c] = got[c].to_numpy()
+    first = [c for c in names if c in out.columns]
+    return out[first + [c for c in out.columns if c not in first]]
+
+
+def summarize_incidents(df: pd.DataFrame, gap_s: float = 30.0) -> pd.DataFrame:
+    """
+    Merge the flagged rows of a detect_* frame into incidents (runs with gaps
+    <= ``gap_s``). Severity is ``-anomaly_score``; the dominant feature is the
+    one furthest from the frame's median in robust-z terms.
+    """
+    X = df[FEATURES].to_numpy(dtype=float)
+    med = np.median(X, axis=0)
+    mad = 1.4826 * np.median(np.abs(X - med), axis=0)
+    rz = np.abs(X - med) / np.where(mad < 1e-6, 1.0, mad)
+
+    flagged = df["is_anomaly"].to_numpy()
+    ts = pd.to_datetime(df.loc[flagged, "ts_utc"], utc=True, format="ISO8601")
+    epoch = (ts - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+
+    inc = incidents_frame(
+        epoch,
+        -df.loc[flagged, "anomaly_score"].to_numpy(dtype=float),
+        rz[flagged].argmax(axis=1),
+        FEATURES,
+        gap_s=gap_s,
+    )
+    for col in ("start", "end"):
+        inc[col] = _iso_ms(inc[col].to_numpy(dtype=float))
+    return inc.drop(columns="peak_ts")
@@ -0,0 +1,407 @@
+"""Pluggable anomaly detectors behind one small interface.
+
+Every detector implements the :class:`Detector` protocol:
+
+- ``fit(X)`` / ``partial_fit(X)`` learn from a float matrix (rows = samples)
+- ``score_batch(X)`` returns one anomaly score per row, the higher the more anomalous
+- ``threshold_``: rows with ``score >= threshold_`` are anomalies
+- ``save(path)`` / ``load(path)`` persist with joblib
+
+:class:`BaseDetector` also provides the sklearn-style ``predict`` /
+``decision_function`` pair, so any saved detector works with
+:func:`sba.ml.detect.detect_anomalies` just like the IsolationForest model.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Protocol, runtime_checkable
+
+import joblib
+import numpy as np
+
+from sba.ml.streaming import HalfSpaceTrees
+
+
+@runtime_checkable
+class Detector(Protocol):
+    name: str
+    threshold_: float
+
+    @property
+    def is_fitted(self) -> bool: ...
+
+    def fit(self, X: np.ndarray) -> Detector: ...
+
+    def partial_fit(self, X: np.ndarray) -> Detector: ...
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray: ...
+
+    def save(self, path: Path) -> None: ...
+
+
+class BaseDetector(ABC):
+    name = "base"
+
+    def __init__(self) -> None:
+        self.threshold_ = float("inf")
+        self._fitted = False
+
+    @property
+    def is_fitted(self) -> bool:
+        return self._fitted
+
+    @abstractmethod
+    def fit(self, X: np.ndarray) -> BaseDetector: ...
+
+    @abstractmethod
+    def partial_fit(self, X: np.ndarray) -> BaseDetector: ...
+
+    @abstractmethod
+    def score_batch(self, X: np.ndarray) -> np.ndarray: ...
+
+    # sklearn-style API (used by detect_anomalies)
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Negative for anomalies."""
+        return self.threshold_ - self.score_batch(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """-1 anomaly, 1 normal."""
+        return np.where(self.score_batch(X) >= self.threshold_, -1, 1)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: Path) -> BaseDetector:
+        obj = joblib.load(path)
+        if not isinstance(obj, cls):
+            raise TypeError(f"{path} holds {type(obj).__name__}, expected {cls.__name__}")
+        return obj
+
+
+def _as_matrix(X: np.ndarray) -> np.ndarray:
+    X = np.asarray(X, dtype=np.float64)
+    return X[None, :] if X.ndim == 1 else X
+
+
+class _History:
+    """Bounded FIFO of the most recent rows (for detectors without an exact update)."""
+
+    def __init__(self, max_rows: int) -> None:
+        self.max_rows = int(max_rows)
+        self.rows: Optional[np.ndarray] = None
+        self.since_fit = 0   # rows added since the owner last refit on them
+
+    def extend(self, X: np.ndarray) -> np.ndarray:
+        self.since_fit += X.shape[0]
+        X = X[-self.max_rows:]
+        if self.rows is None:
+            self.rows = X.copy()
+        else:
+            self.rows = np.concatenate([self.rows, X])[-self.max_rows:]
+        return self.rows
+
+
+# ==========================================================
+#  Implementations
+# ==========================================================
+class ZScoreDetector(BaseDetector):
+    """Mean/std baseline (what Guardian's Session uses). Exact incremental update."""
+
+    name = "zscore"
+
+    def __init__(self, z_thresh: float = 3.0) -> None:
+        super().__init__()
+        self.z_thresh = float(z_thresh)
+        self.threshold_ = self.z_thresh
+        self.n_ = 0
+        self.mean_: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+
+    def fit(self, X: np.ndarray) -> ZScoreDetector:
+        self.n_, self.mean_, self._m2 = 0, None, None
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: np.ndarray) -> ZScoreDetector:
+        X = _as_matrix(X)
+        n_b = X.shape[0]
+        if n_b == 0:
+            return self
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+        if self.mean_ is None:
+            self.n_, self.mean_, self._m2 = n_b, mean_b, m2_b
+        else:
+            # Chan et al. parallel merge of (count, mean, M2)
+            n = self.n_ + n_b
+            delta = mean_b - self.mean_
+            self.mean_ = self.mean_ + delta * (n_b / n)
+            self._m2 = self._m2 + m2_b + delta ** 2 * (self.n_ * n_b / n)
+            self.n_ = n
+        self._fitted = True
+        return self
+
+    @property
+    def std_(self) -> np.ndarray:
+        std = np.sqrt(self._m2 / max(self.n_, 1))
+        return np.where(std < 1e-6, 1.0, std)
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        X = _as_matrix(X)
+        return np.abs((X - self.mean_) / self.std_).max(axis=1)
+
+
+class MadDetector(BaseDetector):
+    """Robust z-score: median / MAD per feature, max over features."""
+
+    name = "mad"
+
+    def __init__(self, z_thresh: float = 3.5, max_history: int = 10_000) -> None:
+        super().__init__()
+        self.z_thresh = float(z_thresh)
+        self.threshold_ = self.z_thresh
+        self.center_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+        self._hist = _History(max_history)
+
+    def fit(self, X: np.ndarray) -> MadDetector:
+        self._hist = _History(self._hist.max_rows)
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: np.ndarray) -> MadDetector:
+        X = _as_matrix(X)
+        if X.shape[0] == 0:
+            return self
+        H = self._hist.extend(X)
+        self.center_ = np.median(H, axis=0)
+        mad = 1.4826 * np.median(np.abs(H - self.center_), axis=0)
+        self.scale_ = np.where(mad < 1e-6, 1.0, mad)
+        self._fitted = True
+        return self
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        X = _as_matrix(X)
+        return np.abs((X - self.center_) / self.scale_).max(axis=1)
+
+
+class EwmaDetector(BaseDetector):
+    """
+    EWMA control chart per feature. Each row is scored against the EWMA mean
+    and variance *before* it, then folded in. Batches are processed with a
+    linear filter instead of a Python loop.
+    """
+
+    name = "ewma"
+
+    def __init__(self, alpha: float = 0.05, z_thresh: float = 4.0) -> None:
+        super().__init__()
+        self.alpha = float(alpha)
+        self.z_thresh = float(z_thresh)
+        self.threshold_ = self.z_thresh
+        self.mean_: Optional[np.ndarray] = None
+        self.var_: Optional[np.ndarray] = None
+
+    def _run(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (scores, final mean, final var) for X starting from the current state."""
+        from scipy.signal import lfilter
+
+        a = self.alpha
+        b, den = [a], [1.0, -(1.0 - a)]
+
+        # m_t = (1-a) m_{t-1} + a x_t
+        m = lfilter(b, den, X, axis=0, zi=((1.0 - a) * self.mean_)[None, :])[0]
+        m_prev = np.vstack([self.mean_[None, :], m[:-1]])
+        d2 = (X - m_prev) ** 2
+
+        # v_t = (1-a) (v_{t-1} + a d_t^2)
+        v = lfilter([1.0 - a], den, a * d2, axis=0, zi=((1.0 - a) * self.var_)[None, :])[0]
+        v_prev = np.vstack([self.var_[None, :], v[:-1]])
+
+        sd = np.sqrt(np.maximum(v_prev, 1e-12))
+        scores = (np.sqrt(d2) / sd).max(axis=1)
+        return scores, m[-1], v[-1]
+
+    def fit(self, X: np.ndarray) -> EwmaDetector:
+        X = _as_matrix(X)
+        if X.shape[0] == 0:
+            raise ValueError("No data to fit on.")
+        self.mean_ = X.mean(axis=0)
+        self.var_ = np.maximum(X.var(axis=0), 1e-6)
+        self._fitted = True
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: np.ndarray) -> EwmaDetector:
+        X = _as_matrix(X)
+        if X.shape[0] == 0:
+            return self
+        if self.mean_ is None:
+            return self.fit(X)
+        _, self.mean_, self.var_ = self._run(X)
+        self.var_ = np.maximum(self.var_, 1e-6)
+        return self
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        X = _as_matrix(X)
+        if X.shape[0] == 0:
+            return np.empty(0)
+        return self._run(X)[0]
+
+
+class RobustCovarianceDetector(BaseDetector):
+    """
+    Mahalanobis distance under a Minimum Covariance Determinant fit, refit on
+    the bounded history once ``refit_every`` new rows have arrived.
+    """
+
+    name = "robust_cov"
+
+    def __init__(
+        self,
+        quantile: float = 0.999,
+        max_history: int = 5_000,
+        refit_every: int = 500,
+        random_state: int = 42,
+    ) -> None:
+        super().__init__()
+        self.quantile = float(quantile)
+        self.refit_every = int(refit_every)
+        self.random_state = random_state
+        self._hist = _History(max_history)
+        self._mcd = None
+
+    def fit(self, X: np.ndarray) -> RobustCovarianceDetector:
+        self._hist = _History(self._hist.max_rows)
+        self._fitted = False
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: np.ndarray) -> RobustCovarianceDetector:
+        from scipy.stats import chi2
+        from sklearn.covariance import MinCovDet
+
+        X = _as_matrix(X)
+        if X.shape[0] == 0:
+            return self
+        H = self._hist.extend(X)
+        if self._fitted and self._hist.since_fit < self.refit_every:
+            return self
+        self._hist.since_fit = 0
+        # constant columns (e.g. disk %) make the covariance singular; jitter them
+        H = H + np.random.default_rng(self.random_state).normal(0.0, 1e-6, size=H.shape)
+        self._mcd = MinCovDet(random_state=self.random_state).fit(H)
+        self.threshold_ = float(np.sqrt(chi2.ppf(self.quantile, df=H.shape[1])))
+        self._fitted = True
+        return self
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        return np.sqrt(self._mcd.mahalanobis(_as_matrix(X)))
+
+
+class IsolationForestDetector(BaseDetector):
+    """
+    sklearn IsolationForest. It has no incremental update: ``partial_fit``
+    keeps a bounded history and refits the forest on it once ``refit_every``
+    new rows have arrived (scores use the previous forest until then).
+    """
+
+    name = "iforest"
+
+    def __init__(
+        self,
+        n_estimators: int = 200,
+        contamination: float | str = "auto",
+        max_samples: int | str = "auto",
+        max_history: int = 20_000,
+        refit_every: int = 1_000,
+        random_state: int = 42,
+    ) -> None:
+        super().__init__()
+        self.n_estimators = int(n_estimators)
+        self.contamination = contamination
+        self.max_samples = max_samples
+        self.refit_every = int(refit_every)
+        self.random_state = random_state
+        self._hist = _History(max_history)
+        self.model_ = None
+
+    def fit(self, X: np.ndarray) -> IsolationForestDetector:
+        self._hist = _History(self._hist.max_rows)
+        self._fitted = False
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: np.ndarray) -> IsolationForestDetector:
+        from sklearn.ensemble import IsolationForest
+
+        X = np.asarray(X, dtype=np.float32)
+        X = X[None, :] if X.ndim == 1 else X
+        if X.shape[0] == 0:
+            return self
+        H = self._hist.extend(X)
+        if self._fitted and self._hist.since_fit < self.refit_every:
+            return self
+        self._hist.since_fit = 0
+        self.model_ = IsolationForest(
+            n_estimators=self.n_estimators,
+            contamination=self.contamination,
+            max_samples=self.max_samples,
+            random_state=self.random_state,
+        ).fit(H)
+        self.threshold_ = float(-self.model_.offset_)
+        self._fitted = True
+        return self
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        return -self.model_.score_samples(X[None, :] if X.ndim == 1 else X)
+
+
+class HalfSpaceTreesDetector(BaseDetector):
+    """Adapter for the streaming :class:`~sba.ml.streaming.HalfSpaceTrees`."""
+
+    name = "hst"
+
+    def __init__(self, **kwargs: object) -> None:
+        # no super().__init__(): threshold and fitted state live in the wrapped model
+        self.hst = HalfSpaceTrees(**kwargs)  # type: ignore[arg-type]
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.hst.is_ready
+
+    @property
+    def threshold_(self) -> float:  # type: ignore[override]
+        return 1.0 - self.hst.offset_
+
+    def fit(self, X: np.ndarray) -> HalfSpaceTreesDetector:
+        self.hst.fit(X)
+        return self
+
+    def partial_fit(self, X: np.ndarray) -> HalfSpaceTreesDetector:
+        self.hst.partial_fit(X)
+        return self
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        return 1.0 - self.hst.score_samples(X)
+
+
+DETECTORS: dict[str, type[BaseDetector]] = {
+    d.name: d
+    for d in (
+        IsolationForestDetector,
+        ZScoreDetector,
+        MadDetector,
+        EwmaDetector,
+        RobustCovarianceDetector,
+        HalfSpaceTreesDetector,
+    )
+}
+
+
+def make_detector(name: str, **kwargs: object) -> BaseDetector:
+    try:
+        cls = DETECTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown detector {name!r}. Choose from: {', '.join(DETECTORS)}") from None
+    return cls(**kwargs)  # type: ignore[arg-type]
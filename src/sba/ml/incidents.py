@@ -0,0 +1,129 @@
+"""Merge per-sample anomalies into incidents.
+
+An incident is a run of anomalies with no gap longer than ``gap_s`` between
+them. ``IncidentBuilder`` updates the open incident in O(1) per anomaly and
+keeps a bounded history; ``incidents_frame`` does the same grouping for a
+whole scored batch in one vectorized pass (CLI).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Deque, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Incident:
+    id: int
+    start: float
+    end: float
+    count: int
+    peak_score: float
+    peak_ts: float
+    dominant: str   # metric flagged most often
+    reason: str     # reason of the peak anomaly
+
+    @property
+    def duration_s(self) -> float:
+        return self.end - self.start
+
+
+class IncidentBuilder:
+    def __init__(self, labels: Sequence[str], gap_s: float = 30.0, max_incidents: int = 1000) -> None:
+        self.labels = tuple(labels)
+        self.gap_s = float(gap_s)
+        self._items: Deque[Incident] = deque(maxlen=max_incidents)
+        self._counts = np.zeros(len(self.labels), dtype=np.int64)  # per metric, open incident
+        self._next_id = 1
+
+    @property
+    def current(self) -> Optional[Incident]:
+        """The most recent incident (possibly still growing)."""
+        return self._items[-1] if self._items else None
+
+    def items(self) -> List[Incident]:
+        return list(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._counts[:] = 0
+
+    def add(self, ts: float, score: float, metric: int, reason: str) -> Incident:
+        """
+        Fold one anomaly in; returns the incident it belongs to. A result with
+        ``count == 1`` is a newly opened incident.
+        """
+        cur = self.current
+        if cur is None or ts - cur.end > self.gap_s or ts < cur.start:
+            self._counts[:] = 0
+            self._counts[metric] += 1
+            inc = Incident(
+                id=self._next_id, start=ts, end=ts, count=1, peak_score=score, peak_ts=ts,
+                dominant=self.labels[metric], reason=reason,
+            )
+            self._next_id += 1
+            self._items.append(inc)
+            return inc
+
+        self._counts[metric] += 1
+        peak = score > cur.peak_score
+        inc = replace(
+            cur,
+            end=max(cur.end, ts),
+            count=cur.count + 1,
+            peak_score=score if peak else cur.peak_score,
+            peak_ts=ts if peak else cur.peak_ts,
+            reason=reason if peak else cur.reason,
+            dominant=self.labels[int(self._counts.argmax())],
+        )
+        self._items[-1] = inc
+        return inc
+
+
+def incidents_frame(
+    ts: np.ndarray,
+    scores: np.ndarray,
+    metric: np.ndarray,
+    labels: Sequence[str],
+    gap_s: float = 30.0,
+) -> pd.DataFrame:
+    """
+    Group anomalies (sorted by ``ts``) into incidents in one pass.
+    Columns: start, end, count, peak_score, peak_ts, dominant.
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    cols = ["start", "end", "count", "peak_score", "peak_ts", "dominant"]
+    if ts.size == 0:
+        return pd.DataFrame(columns=cols)
+
+    scores = np.asarray(scores, dtype=np.float64)
+    metric = np.asarray(metric, dtype=np.intp)
+    gid = np.concatenate([[0], np.cumsum(np.diff(ts) > gap_s)])
+    n_groups = int(gid[-1]) + 1
+    starts = np.flatnonzero(np.r_[True, gid[1:] != gid[:-1]])
+
+    count = np.bincount(gid, minlength=n_groups)
+    peak_score = np.full(n_groups, -np.inf)
+    np.maximum.at(peak_score, gid, scores)
+    is_peak = scores == peak_score[gid]
+    peak_idx = np.full(n_groups, -1)
+    peak_idx[gid[is_peak][::-1]] = np.flatnonzero(is_peak)[::-1]   # first peak per group
+
+    per_metric = np.zeros((n_groups, len(labels)), dtype=np.int64)
+    np.add.at(per_metric, (gid, metric), 1)
+
+    return pd.DataFrame({
+        "start": ts[starts],
+        "end": ts[np.r_[starts[1:] - 1, ts.size - 1]],
+        "count": count,
+        "peak_score": peak_score,
+        "peak_ts": ts[peak_idx],
+        "dominant": np.asarray(labels, dtype=object)[per_metric.argmax(axis=1)],
+    })
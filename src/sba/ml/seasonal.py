@@ -0,0 +1,194 @@
+"""Seasonal (time-of-week) baseline tables.
+
+History is bucketed by local time (hour-of-week by default) and each bucket
+stores a robust center (median) and spread (1.4826 * MAD) per metric. The
+table is built with vectorised sort/group operations and then kept current
+with stochastic-median updates, one bucket per sample.
+
+Scoring is a table lookup plus arithmetic::
+
+    b = ((ts + utc_offset) % period) // bucket
+    z = (x - center[b]) / spread[b]
+
+so recurring load (nightly jobs, office hours) stops looking anomalous.
+Buckets with fewer than ``min_count`` samples fall back to the global row;
+while the global row itself is thinner than that, nothing is scored (NaN).
+A table learned from scratch with ``partial_fit`` buffers its first
+``min_count`` rows and builds itself from them with ``fit``.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+
+HOUR = 3600
+WEEK = 7 * 24 * HOUR
+
+
+def _grouped_median(values: np.ndarray, groups: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray]:
+    """Median of ``values`` (n, F) per group id; returns (medians (G, F), counts (G,))."""
+    n, F = values.shape
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    has = counts > 0
+    lo = starts + np.maximum(counts - 1, 0) // 2
+    hi = starts + counts // 2
+
+    out = np.full((n_groups, F), np.nan)
+    for f in range(F):
+        order = np.lexsort((values[:, f], groups))
+        v = values[order, f]
+        out[has, f] = 0.5 * (v[lo[has]] + v[hi[has]])
+    return out, counts
+
+
+class SeasonalBaseline:
+    def __init__(
+        self,
+        bucket_s: int = HOUR,
+        period_s: int = WEEK,
+        min_count: int = 30,
+        learning_rate: float = 0.02,
+        z_thresh: float = 4.0,
+        utc_offset_s: Optional[int] = None,
+    ) -> None:
+        if period_s % bucket_s:
+            raise ValueError("period_s must be a multiple of bucket_s")
+        self.bucket_s = int(bucket_s)
+        self.period_s = int(period_s)
+        self.n_buckets = self.period_s // self.bucket_s
+        self.min_count = int(min_count)
+        self.learning_rate = float(learning_rate)
+        self.z_thresh = float(z_thresh)
+        # local wall clock is what matters for "every night at 02:00"
+        self.utc_offset_s = int(time.localtime().tm_gmtoff if utc_offset_s is None else utc_offset_s)
+
+        # row n_buckets is the global (all-time) fallback
+        self.center_: Optional[np.ndarray] = None   # (B + 1, F)
+        self.mad_: Optional[np.ndarray] = None      # (B + 1, F) raw median |x - center|
+        self.count_: Optional[np.ndarray] = None    # (B + 1,)
+        self._warm: list[tuple[np.ndarray, np.ndarray]] = []   # rows before the first fit
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.center_ is not None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the global row has ``min_count`` samples (scores are not NaN)."""
+        return self.count_ is not None and bool(self.count_[self.n_buckets] >= self.min_count)
+
+    def bucket_of(self, ts: np.ndarray | float) -> np.ndarray:
+        t = np.asarray(ts, dtype=np.float64) + self.utc_offset_s
+        return (np.floor(t).astype(np.int64) % self.period_s) // self.bucket_s
+
+    # -------------------------
+    # Build / update
+    # -------------------------
+    def fit(self, X: np.ndarray, ts: np.ndarray) -> SeasonalBaseline:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[0] == 0 or X.shape[0] != len(ts):
+            raise ValueError("fit() needs a non-empty (n, F) matrix and one timestamp per row")
+
+        B = self.n_buckets
+        b = self.bucket_of(ts)
+        center, counts = _grouped_median(X, b, B)
+        g_center = np.median(X, axis=0)
+
+        # MAD uses each row's own bucket center
+        dev = np.abs(X - center[b])
+        mad, _ = _grouped_median(dev, b, B)
+        g_mad = np.median(np.abs(X - g_center), axis=0)
+
+        self.center_ = np.vstack([np.where(np.isnan(center), g_center, center), g_center])
+        self.mad_ = np.vstack([np.where(np.isnan(mad), g_mad, mad), g_mad])
+        self.count_ = np.concatenate([counts, [X.shape[0]]]).astype(np.int64)
+        return self
+
+    def partial_fit(self, X: np.ndarray, ts: np.ndarray | float) -> SeasonalBaseline:
+        """
+        Incremental update (stochastic median / MAD): each row nudges its bucket
+        and the global row by ``eta * spread * sign(error)``, with
+        ``eta = max(1 / count, learning_rate)``. A bucket's first sample sets
+        its center and takes the global MAD as its starting spread.
+
+        Before the table exists, rows are buffered and the table is built with
+        ``fit`` once ``min_count`` of them have arrived.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        ts = np.atleast_1d(np.asarray(ts, dtype=np.float64))
+        if self.center_ is None:
+            self._warm.append((X, ts))
+            if sum(len(t) for _, t in self._warm) >= self.min_count:
+                warm, self._warm = self._warm, []
+                self.fit(np.concatenate([x for x, _ in warm]), np.concatenate([t for _, t in warm]))
+            return self
+
+        glob = self.n_buckets
+        for x, b in zip(X, self.bucket_of(ts), strict=True):
+            for row in (int(b), glob):
+                self.count_[row] += 1
+                n = self.count_[row]
+                if n == 1:
+                    # a spread of 0 would shrink every later step to nothing
+                    self.center_[row] = x
+                    self.mad_[row] = self.mad_[glob]
+                    continue
+                eta = max(1.0 / n, self.learning_rate)
+                step = eta * np.maximum(1.4826 * self.mad_[row], 1e-3)
+                err = x - self.center_[row]
+                self.center_[row] += step * np.sign(err)
+                self.mad_[row] += step * np.sign(np.abs(err) - self.mad_[row])
+                np.maximum(self.mad_[row], 0.0, out=self.mad_[row])
+        return self
+
+    # -------------------------
+    # Lookup / scoring
+    # -------------------------
+    def is_ready_at(self, ts: float) -> bool:
+        """True if the bucket for ``ts`` has its own estimate (not the global fallback)."""
+        return self.center_ is not None and bool(self.count_[int(self.bucket_of(ts))] >= self.min_count)
+
+    def expected(self, ts: np.ndarray | float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (center, spread) rows for each timestamp; thin buckets use the global
+        row, and while that is thin too the center is NaN (not scored).
+        """
+        b = self.bucket_of(np.atleast_1d(ts))
+        b = np.where(self.count_[b] >= self.min_count, b, self.n_buckets)
+        spread = 1.4826 * self.mad_[b]
+        center = self.center_[b]
+        if not self.is_ready:
+            center = np.full_like(center, np.nan)
+        return center, np.where(spread < 1e-6, 1.0, spread)
+
+    def zscores(self, X: np.ndarray, ts: np.ndarray | float) -> np.ndarray:
+        center, spread = self.expected(ts)
+        return (np.atleast_2d(np.asarray(X, dtype=np.float64)) - center) / spread
+
+    def score_batch(self, X: np.ndarray, ts: np.ndarray | float) -> np.ndarray:
+        """Max |robust z| over metrics, against the sample's own time bucket."""
+        return np.abs(self.zscores(X, ts)).max(axis=1)
+
+    def predict(self, X: np.ndarray, ts: np.ndarray | float) -> np.ndarray:
+        """-1 anomaly, 1 normal."""
+        return np.where(self.score_batch(X, ts) >= self.z_thresh, -1, 1)
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: Path) -> SeasonalBaseline:
+        obj = joblib.load(path)
+        if not isinstance(obj, cls):
+            raise TypeError(f"{path} holds {type(obj).__name__}, expected {cls.__name__}")
+        return obj
@@ -0,0 +1,152 @@
+"""Streaming quantile sketches with bounded memory.
+
+``QuantileSketch`` is a DDSketch-style log-bucket histogram kept for several
+metrics at once: value ``x`` lands in bucket ``ceil(log_gamma(x))`` with
+``gamma = (1 + a) / (1 - a)``, so every quantile in
+``[min_value, min_value * gamma ** max_bins)`` is within relative error ``a``.
+Smaller values share bucket 0, larger ones the top bucket. Memory is a fixed
+``(F, max_bins + 1)`` array; an update is one ``log`` per metric and a
+quantile query is a cumulative sum over the row.
+
+With ``half_life`` set, counts decay geometrically (applied in small batches)
+so quantiles follow the recent history instead of everything ever seen.
+
+``RobustStats`` pairs two sketches into a streaming median / MAD estimate.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+
+class QuantileSketch:
+    def __init__(
+        self,
+        n_features: int = 1,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-3,
+        max_bins: int = 2048,
+        half_life: Optional[float] = None,
+    ) -> None:
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if min_value <= 0 or max_bins < 2:
+            raise ValueError("min_value must be > 0 and max_bins >= 2")
+        self.n_features = int(n_features)
+        self.relative_accuracy = float(relative_accuracy)
+        self.gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = float(np.log(self.gamma))
+        self.min_value = float(min_value)
+        self.max_bins = int(max_bins)
+        self._offset = int(np.ceil(np.log(self.min_value) / self._log_gamma)) - 1
+
+        self.half_life = half_life
+        self._decay_every = max(1, int(half_life // 8)) if half_life else 0
+        self._decay = 0.5 ** (self._decay_every / half_life) if half_life else 1.0
+        self._pending = 0
+
+        self.counts = np.zeros((self.n_features, self.max_bins + 1))
+        self._rows = np.arange(self.n_features)
+        self.n = 0
+
+    @property
+    def weight(self) -> np.ndarray:
+        """Effective number of samples per metric (decayed if ``half_life`` is set)."""
+        return self.counts.sum(axis=1)
+
+    def _index(self, x: np.ndarray) -> np.ndarray:
+        a = np.abs(x)
+        k = np.ceil(np.log(np.maximum(a, self.min_value)) / self._log_gamma).astype(np.int64) - self._offset
+        k[a < self.min_value] = 0
+        return np.clip(k, 0, self.max_bins)
+
+    def _value(self, k: np.ndarray) -> np.ndarray:
+        v = 2.0 * self.gamma ** (k + self._offset) / (self.gamma + 1.0)
+        return np.where(k == 0, 0.0, v)
+
+    def update(self, x: np.ndarray) -> None:
+        """Add one value per metric (negative values are folded to their magnitude)."""
+        x = np.asarray(x, dtype=np.float64).reshape(self.n_features)
+        self.counts[self._rows, self._index(x)] += 1.0
+        self.n += 1
+        if self._decay_every:
+            self._pending += 1
+            if self._pending >= self._decay_every:
+                self.counts *= self._decay
+                self._pending = 0
+
+    def update_batch(self, X: np.ndarray) -> None:
+        """Add a (k, F) batch in one scatter-add; decay is applied per whole step."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        k = X.shape[0]
+        if k == 0:
+            return
+        np.add.at(self.counts, (np.broadcast_to(self._rows, X.shape), self._index(X)), 1.0)
+        self.n += k
+        if self._decay_every:
+            self._pending += k
+            steps, self._pending = divmod(self._pending, self._decay_every)
+            if steps:
+                self.counts *= self._decay ** steps
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Approximate ``q``-quantile per metric (NaN before any data)."""
+        if self.n == 0:
+            return np.full(self.n_features, np.nan)
+        cum = np.cumsum(self.counts, axis=1)
+        rank = q * cum[:, -1:]
+        k = (cum < rank).sum(axis=1)
+        return self._value(np.minimum(k, self.max_bins))
+
+
+class RobustStats:
+    """
+    Streaming median and MAD per metric: one sketch over values, one over
+    absolute deviations from the current median estimate.
+    """
+
+    def __init__(self, n_features: int = 4, half_life: Optional[float] = None, **sketch_kw) -> None:
+        self.values = QuantileSketch(n_features, half_life=half_life, **sketch_kw)
+        self.deviations = QuantileSketch(n_features, half_life=half_life, **sketch_kw)
+        self._median = np.zeros(n_features)
+
+    @property
+    def n(self) -> int:
+        return self.values.n
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=np.float64)
+        self.values.update(x)
+        # refresh the median every few samples; each refresh is O(bins)
+        if self.values.n <= 32 or self.values.n % 8 == 0:
+            self._median = self.values.quantile(0.5)
+        self.deviations.update(np.abs(x - self._median))
+
+    def update_batch(self, X: np.ndarray) -> None:
+        if len(X) == 1:
+            self.update(X[0])
+            return
+        X = np.asarray(X, dtype=np.float64)
+        self.values.update_batch(X)
+        self._median = self.values.quantile(0.5)
+        self.deviations.update_batch(np.abs(X - self._median))
+
+    @property
+    def median(self) -> np.ndarray:
+        return self.values.quantile(0.5)
+
+    @property
+    def mad(self) -> np.ndarray:
+        return self.deviations.quantile(0.5)
+
+    @property
+    def spread(self) -> np.ndarray:
+        """1.4826 * MAD, floored at the sketch resolution (2 * accuracy * |median|)."""
+        median = self.median
+        floor = 2.0 * self.values.relative_accuracy * np.abs(median)
+        return np.maximum(1.4826 * self.mad, floor)
+
+    def quantile(self, q: float) -> np.ndarray:
+        return self.values.quantile(q)
@@ -0,0 +1,246 @@
+"""Online anomaly detection with Half-Space Trees (Tan, Ting & Liu, 2011).
+
+Each tree is a complete binary tree over a randomly perturbed workspace of the
+(min/max-normalised) feature space, stored as flat heap-ordered arrays. Every
+sample walks ``depth`` nodes per tree, so both scoring and learning cost
+O(n_trees * depth) per sample, and memory is fixed by ``n_trees``, ``depth``
+and ``window_size`` no matter how long the stream runs.
+
+Mass is counted in two alternating windows: ``l`` (the window being filled)
+and ``r`` (the last completed window, used for scoring). Sparse regions of the
+reference window get low mass, i.e. a low score.
+
+The public API follows the sklearn outlier detectors (``fit``, ``partial_fit``,
+``score_samples``, ``decision_function``, ``predict``), so a pickled instance
+can be used anywhere an IsolationForest model is loaded.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+
+class HalfSpaceTrees:
+    # rows scored per pass: _paths / _mass temporaries take ~3 KB per row at the defaults
+    SCORE_CHUNK = 16_384
+
+    def __init__(
+        self,
+        n_trees: int = 25,
+        depth: int = 8,
+        window_size: int = 250,
+        size_limit: Optional[float] = None,
+        contamination: float = 0.01,
+        random_state: Optional[int] = 42,
+    ) -> None:
+        if n_trees < 1 or depth < 1 or window_size < 2:
+            raise ValueError("n_trees, depth must be >= 1 and window_size >= 2")
+        self.n_trees = int(n_trees)
+        self.depth = int(depth)
+        self.window_size = int(window_size)
+        self.size_limit = float(0.1 * window_size if size_limit is None else size_limit)
+        self.contamination = float(contamination)
+        self.random_state = random_state
+        self._reset()
+
+    def _reset(self) -> None:
+        self.n_features_in_: Optional[int] = None
+        self.n_seen_ = 0
+        self.offset_ = 0.0
+
+        # Set once the first window has been seen (or on fit()).
+        self._lo: Optional[np.ndarray] = None
+        self._span: Optional[np.ndarray] = None
+        self._feat: Optional[np.ndarray] = None   # (T, internal) split feature
+        self._thr: Optional[np.ndarray] = None    # (T, internal) split value
+        self._r: Optional[np.ndarray] = None      # (T, nodes) reference mass
+        self._l: Optional[np.ndarray] = None      # (T, nodes) latest mass
+        self._ref_n = 0
+
+        # Current window, normalised (warm-up buffer before the trees exist).
+        self._win: Optional[np.ndarray] = None
+        self._win_n = 0
+
+    # -------------------------
+    # State
+    # -------------------------
+    @property
+    def is_ready(self) -> bool:
+        """True once a reference window exists, i.e. scores are meaningful."""
+        return self._ref_n > 0
+
+    @property
+    def n_nodes(self) -> int:
+        return 2 ** (self.depth + 1) - 1
+
+    def _check(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.n_features_in_ is None:
+            self.n_features_in_ = int(X.shape[1])
+            self._win = np.empty((self.window_size, self.n_features_in_), dtype=np.float32)
+        elif X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+        return X
+
+    def _normalise(self, X: np.ndarray) -> np.ndarray:
+        return (X - self._lo) / self._span
+
+    def _set_limits(self, X: np.ndarray) -> None:
+        lo = np.nanmin(X, axis=0).astype(np.float32)
+        hi = np.nanmax(X, axis=0).astype(np.float32)
+        span = np.where(hi - lo > 1e-6, hi - lo, 1.0)
+        # map the observed range to the middle third of [0, 1]: the workspace
+        # then has empty cells on both sides for values outside the range
+        self._lo = (lo - span).astype(np.float32)
+        self._span = (3.0 * span).astype(np.float32)
+
+    def _build_trees(self) -> None:
+        rng = np.random.default_rng(self.random_state)
+        T, F = self.n_trees, int(self.n_features_in_ or 0)
+        internal = 2 ** self.depth - 1
+
+        # Random workspace per tree (Tan et al.): s in [0,1], range 2*max(s, 1-s) each side.
+        s = rng.random((T, F))
+        half = 2.0 * np.maximum(s, 1.0 - s)
+        mins = np.empty((T, self.n_nodes, F))
+        maxs = np.empty((T, self.n_nodes, F))
+        mins[:, 0] = s - half
+        maxs[:, 0] = s + half
+
+        feat = rng.integers(0, F, size=(T, internal))
+        thr = np.empty((T, internal))
+        t_idx = np.arange(T)
+        for node in range(internal):
+            q = feat[:, node]
+            lo = mins[t_idx, node, q]
+            hi = maxs[t_idx, node, q]
+            p = 0.5 * (lo + hi)
+            thr[:, node] = p
+
+            left, right = 2 * node + 1, 2 * node + 2
+            mins[:, left] = mins[:, node]
+            maxs[:, left] = maxs[:, node]
+            maxs[t_idx, left, q] = p
+            mins[:, right] = mins[:, node]
+            maxs[:, right] = maxs[:, node]
+            mins[t_idx, right, q] = p
+
+        self._feat = feat.astype(np.intp)
+        self._thr = thr.astype(np.float32)
+        self._r = np.zeros((T, self.n_nodes), dtype=np.float32)
+        self._l = np.zeros((T, self.n_nodes), dtype=np.float32)
+
+    def _paths(self, Xn: np.ndarray) -> np.ndarray:
+        """Node index visited at every level: shape (depth + 1, T, n)."""
+        n = Xn.shape[0]
+        rows = np.arange(n)[None, :]
+        t_idx = np.arange(self.n_trees)[:, None]
+        node = np.zeros((self.n_trees, n), dtype=np.intp)
+        out = np.empty((self.depth + 1, self.n_trees, n), dtype=np.intp)
+        out[0] = node
+        for d in range(self.depth):
+            f = self._feat[t_idx, node]
+            go_right = Xn[rows, f] >= self._thr[t_idx, node]
+            node = 2 * node + 1 + go_right
+            out[d + 1] = node
+        return out
+
+    # -------------------------
+    # Learning
+    # -------------------------
+    def fit(self, X: np.ndarray) -> HalfSpaceTrees:
+        """Reset, take feature limits from ``X`` and stream it through the trees."""
+        self._reset()
+        X = self._check(X)
+        if X.shape[0] == 0:
+            raise ValueError("No data to fit on.")
+        self._set_limits(X)
+        self._build_trees()
+        self.partial_fit(X)
+        if not self.is_ready:
+            # shorter than one window: use what we have as the reference
+            self._roll_window()
+        return self
+
+    def partial_fit(self, X: np.ndarray) -> HalfSpaceTrees:
+        """Learn from a batch of new samples, in order."""
+        X = self._check(X)
+        i = 0
+        while i < X.shape[0]:
+            take = min(self.window_size - self._win_n, X.shape[0] - i)
+            chunk = X[i:i + take]
+            i += take
+
+            if self._feat is None:
+                # warm-up: collect the first window raw, then derive limits from it
+                self._win[self._win_n:self._win_n + take] = chunk
+                self._win_n += take
+                if self._win_n == self.window_size:
+                    raw = self._win.copy()
+                    self._set_limits(raw)
+                    self._build_trees()
+                    self._win_n = 0
+                    self._learn(self._normalise(raw))
+                continue
+
+            self._learn(self._normalise(chunk))
+        return self
+
+    def _learn(self, Xn: np.ndarray) -> None:
+        # caller guarantees Xn never crosses a window boundary
+        n = Xn.shape[0]
+        paths = self._paths(Xn)
+        flat = (np.arange(self.n_trees)[None, :, None] * self.n_nodes + paths).ravel()
+        if flat.size < self._l.size:
+            # per-sample path: touch only the visited nodes
+            np.add.at(self._l.reshape(-1), flat, 1.0)
+        else:
+            self._l += np.bincount(flat, minlength=self._l.size).reshape(self._l.shape)
+
+        self._win[self._win_n:self._win_n + n] = Xn
+        self._win_n += n
+        self.n_seen_ += n
+        if self._win_n == self.window_size:
+            self._roll_window()
+
+    def _roll_window(self) -> None:
+        self._r, self._l = self._l, np.zeros_like(self._l)
+        self._ref_n = self._win_n
+        win = self._win[:self._win_n]
+        self._win_n = 0
+        if self._ref_n > 0:
+            self.offset_ = float(np.quantile(self._mass(win), self.contamination))
+
+    # -------------------------
+    # Scoring
+    # -------------------------
+    def _mass(self, Xn: np.ndarray) -> np.ndarray:
+        paths = self._paths(Xn)
+        t_idx = np.arange(self.n_trees)[None, :, None]
+        m = self._r[t_idx, paths]                             # (depth+1, T, n)
+        below = m < self.size_limit
+        k = np.where(below.any(axis=0), below.argmax(axis=0), self.depth)
+        per_tree = np.take_along_axis(m, k[None], axis=0)[0] * np.exp2(k)
+        return per_tree.sum(axis=0) / (self.n_trees * self._ref_n * 2.0 ** self.depth)
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """Normalised mass in [0, 1]; the lower, the more abnormal."""
+        X = self._check(X)
+        if not self.is_ready:
+            return np.ones(X.shape[0])
+        out = np.empty(X.shape[0])
+        for i in range(0, X.shape[0], self.SCORE_CHUNK):
+            out[i:i + self.SCORE_CHUNK] = self._mass(self._normalise(X[i:i + self.SCORE_CHUNK]))
+        return out
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Negative for outliers, like sklearn's IsolationForest."""
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """-1 anomaly, 1 normal."""
+        return np.where(self.decision_function(X) < 0, -1, 1)
@@ -0,0 +1,132 @@
+"""Labelled synthetic anomalies injected into a copy of real history.
+
+Used to measure detectors on our own data: real rows are the (unlabelled)
+normal class, injected rows are the positives.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+
+def robust_scale(X: np.ndarray) -> np.ndarray:
+    """Per-feature 1.4826 * MAD, falling back to std (and 1.0) for flat features."""
+    X = np.asarray(X, dtype=np.float64)
+    med = np.median(X, axis=0)
+    scale = 1.4826 * np.median(np.abs(X - med), axis=0)
+    std = X.std(axis=0)
+    scale = np.where(scale > 1e-6, scale, std)
+    return np.where(scale > 1e-6, scale, 1.0)
+
+
+def inject_spikes(
+    X: np.ndarray,
+    rate: float = 0.01,
+    magnitude: float = 8.0,
+    random_state: Optional[int] = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Add single-sample spikes of ``magnitude`` robust standard deviations to one
+    random feature of ``rate * len(X)`` random rows.
+
+    Returns ``(X_injected, labels)`` where ``labels`` is a bool array.
+    """
+    rng = np.random.default_rng(random_state)
+    out = np.array(X, dtype=np.float64, copy=True)
+    n, f = out.shape
+    labels = np.zeros(n, dtype=bool)
+
+    k = int(round(rate * n))
+    if k == 0 or f == 0:
+        return out, labels
+
+    rows = rng.choice(n, size=k, replace=False)
+    cols = rng.integers(0, f, size=k)
+    sign = rng.choice([-1.0, 1.0], size=k)
+    out[rows, cols] += sign * magnitude * robust_scale(X)[cols]
+    labels[rows] = True
+    return out, labels
+
+
+def _segments(rng: np.random.Generator, n: int, count: int, length: int) -> list[tuple[int, int]]:
+    """Up to ``count`` non-overlapping [start, end) windows of ``length`` rows."""
+    length = max(1, min(length, n))
+    slots = n // length
+    if slots == 0 or count == 0:
+        return []
+    picked = rng.choice(slots, size=min(count, slots), replace=False)
+    return [(int(s) * length, int(s) * length + length) for s in np.sort(picked)]
+
+
+def inject_level_shifts(
+    X: np.ndarray,
+    n_events: int = 3,
+    length: int = 30,
+    magnitude: float = 6.0,
+    random_state: Optional[int] = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Shift one random feature by ``magnitude`` robust sd for ``length`` consecutive rows."""
+    rng = np.random.default_rng(random_state)
+    out = np.array(X, dtype=np.float64, copy=True)
+    labels = np.zeros(out.shape[0], dtype=bool)
+    scale = robust_scale(X)
+
+    for lo, hi in _segments(rng, out.shape[0], n_events, length):
+        col = int(rng.integers(0, out.shape[1]))
+        out[lo:hi, col] += rng.choice([-1.0, 1.0]) * magnitude * scale[col]
+        labels[lo:hi] = True
+    return out, labels
+
+
+def inject_drifts(
+    X: np.ndarray,
+    n_events: int = 3,
+    length: int = 60,
+    magnitude: float = 8.0,
+    label_from: float = 3.0,
+    random_state: Optional[int] = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ramp one random feature linearly up to ``magnitude`` robust sd over ``length``
+    rows. Only rows whose offset already exceeds ``label_from`` sd are labelled;
+    the start of a slow drift is indistinguishable from noise.
+    """
+    rng = np.random.default_rng(random_state)
+    out = np.array(X, dtype=np.float64, copy=True)
+    labels = np.zeros(out.shape[0], dtype=bool)
+    scale = robust_scale(X)
+
+    for lo, hi in _segments(rng, out.shape[0], n_events, length):
+        col = int(rng.integers(0, out.shape[1]))
+        ramp = np.linspace(0.0, magnitude, hi - lo)
+        out[lo:hi, col] += rng.choice([-1.0, 1.0]) * ramp * scale[col]
+        labels[lo:hi] |= ramp >= label_from
+    return out, labels
+
+
+def inject_anomalies(
+    X: np.ndarray,
+    spike_rate: float = 0.005,
+    n_shifts: int = 2,
+    n_drifts: int = 2,
+    random_state: Optional[int] = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Spikes, level shifts and drifts on the same copy; labels are OR-ed."""
+    rng = np.random.default_rng(random_state)
+    seeds = rng.integers(0, 2**31 - 1, size=3)
+    n = len(X)
+
+    # split the series so shifts and drifts never stack on each other
+    half = n // 2
+    out, labels = inject_spikes(X, rate=spike_rate, random_state=int(seeds[0]))
+    shifted, l_shift = inject_level_shifts(
+        out[:half], n_events=n_shifts, length=max(1, min(30, half // 10)), random_state=int(seeds[1])
+    )
+    drifted, l_drift = inject_drifts(
+        out[half:], n_events=n_drifts, length=max(1, min(60, (n - half) // 10)), random_state=int(seeds[2])
+    )
+    out = np.vstack([shifted, drifted])
+    labels = labels | np.concatenate([l_shift, l_drift])
+    return out, labels
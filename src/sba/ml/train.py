@@ -3,25 +3,76 @@ from __future__ import annotations
 from pathlib import Path
 
 import joblib
-import pandas as pd
 from sklearn.ensemble import IsolationForest
 
-FEATURES = ["cpu_percent", "mem_percent", "disk_percent", "net_sent_kb_s", "net_recv_kb_s"]
+from sba.ml.detectors import BaseDetector, make_detector
+from sba.ml.seasonal import SeasonalBaseline
+from sba.storage.feature_store import (
+    FEATURES,  # noqa: F401  (re-export)
+    open_features,
+)
 
 
-def train_isolation_forest(parquet_path: Path, model_path: Path, random_state: int = 42) -> None:
-    df = pd.read_parquet(parquet_path).dropna()
-    if df.empty:
+def train_isolation_forest(
+    parquet_path: Path,
+    model_path: Path,
+    random_state: int = 42,
+    start: float | None = None,
+    end: float | None = None,
+    n_estimators: int = 200,
+    contamination: float | str = "auto",
+    max_samples: int | str = "auto",
+) -> None:
+    # see `sba tune` for picking n_estimators/max_samples/contamination from data
+    # float32 memmap straight from the sidecar; the trees work in float32 anyway
+    fm = open_features(parquet_path).slice(start, end)
+    if len(fm) == 0:
         raise ValueError("No data found in parquet. Run collect first.")
 
-    X = df[FEATURES]
+    if isinstance(max_samples, int):
+        max_samples = min(max_samples, len(fm))
 
     model = IsolationForest(
-        n_estimators=200,
-        contamination="auto",
+        n_estimators=n_estimators,
+        contamination=contamination,
+        max_samples=max_samples,
         random_state=random_state,
     )
-    model.fit(X)
+    model.fit(fm.X)
 
     model_path.parent.mkdir(parents=True, exist_ok=True)
     joblib.dump(model, model_path)
+
+
+def train_detector(
+    parquet_path: Path,
+    model_path: Path,
+    algo: str = "iforest",
+    start: float | None = None,
+    end: float | None = None,
+) -> BaseDetector:
+    """Fit any registered detector (see ``sba.ml.detectors.DETECTORS``) and save it."""
+    fm = open_features(parquet_path).slice(start, end)
+    if len(fm) == 0:
+        raise ValueError("No data found in parquet. Run collect first.")
+
+    det = make_detector(algo).fit(fm.X)
+    det.save(model_path)
+    return det
+
+
+def build_seasonal_baseline(
+    parquet_path: Path,
+    baseline_path: Path,
+    bucket_s: int = 3600,
+    start: float | None = None,
+    end: float | None = None,
+) -> SeasonalBaseline:
+    """Build the time-of-week baseline table from history and save it."""
+    fm = open_features(parquet_path).slice(start, end)
+    if len(fm) == 0:
+        raise ValueError("No data found in parquet. Run collect first.")
+
+    baseline = SeasonalBaseline(bucket_s=bucket_s).fit(fm.X, fm.ts)
+    baseline.save(baseline_path)
+    return baseline
@@ -0,0 +1,151 @@
+"""Hyperparameter search for the IsolationForest model.
+
+Real history is split in time: the older part trains each candidate, the newer
+part gets labelled synthetic anomalies (spikes, level shifts, drifts) injected
+and is used to measure precision/recall. Candidates run in a process pool; the
+winner is the smallest, then fastest, model that reaches the target recall.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from sba.ml.synthetic import inject_anomalies
+
+DEFAULT_GRID: Dict[str, Sequence[object]] = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_samples": [64, 128, 256],
+    "contamination": ["auto", 0.005, 0.01, 0.02],
+}
+
+
+@dataclass(frozen=True)
+class TuneResult:
+    n_estimators: int
+    max_samples: int
+    contamination: float | str
+    precision: float
+    recall: float
+    fit_s: float
+    us_per_row: float
+
+    @property
+    def size(self) -> int:
+        """Rough model size: total number of tree samples."""
+        return self.n_estimators * self.max_samples
+
+    @property
+    def params(self) -> dict:
+        return {
+            "n_estimators": self.n_estimators,
+            "max_samples": self.max_samples,
+            "contamination": self.contamination,
+        }
+
+
+# Worker globals, set once per process by the pool initializer (avoids
+# pickling the data for every candidate).
+_X_TRAIN: Optional[np.ndarray] = None
+_X_TEST: Optional[np.ndarray] = None
+_Y_TEST: Optional[np.ndarray] = None
+
+
+def _init_worker(X_train: np.ndarray, X_test: np.ndarray, y_test: np.ndarray) -> None:
+    global _X_TRAIN, _X_TEST, _Y_TEST
+    _X_TRAIN, _X_TEST, _Y_TEST = X_train, X_test, y_test
+
+
+def evaluate_candidate(params: dict, random_state: int = 42) -> TuneResult:
+    """Fit one parameter set on the worker's data and score the injected test set."""
+    from sklearn.ensemble import IsolationForest
+
+    assert _X_TRAIN is not None and _X_TEST is not None and _Y_TEST is not None
+    max_samples = int(min(int(params["max_samples"]), len(_X_TRAIN)))
+
+    t0 = time.perf_counter()
+    model = IsolationForest(
+        n_estimators=int(params["n_estimators"]),
+        max_samples=max_samples,
+        contamination=params["contamination"],
+        random_state=random_state,
+    ).fit(_X_TRAIN)
+    fit_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pred = model.predict(_X_TEST) == -1
+    score_s = time.perf_counter() - t0
+
+    y = _Y_TEST
+    tp = int(np.sum(pred & y))
+    precision = tp / max(int(pred.sum()), 1)
+    recall = tp / max(int(y.sum()), 1)
+
+    return TuneResult(
+        n_estimators=int(params["n_estimators"]),
+        max_samples=max_samples,
+        contamination=params["contamination"],
+        precision=precision,
+        recall=recall,
+        fit_s=fit_s,
+        us_per_row=score_s / max(len(_X_TEST), 1) * 1e6,
+    )
+
+
+def expand_grid(grid: Dict[str, Sequence[object]]) -> List[dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values, strict=True)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def pick_best(results: Iterable[TuneResult], target_recall: float) -> Optional[TuneResult]:
+    """Smallest model meeting the target recall; ties go to faster scoring, then precision."""
+    ok = [r for r in results if r.recall >= target_recall]
+    if not ok:
+        return None
+    return min(ok, key=lambda r: (r.size, r.us_per_row, -r.precision))
+
+
+def tune_isolation_forest(
+    X: np.ndarray,
+    grid: Optional[Dict[str, Sequence[object]]] = None,
+    target_recall: float = 0.8,
+    train_frac: float = 0.7,
+    workers: Optional[int] = None,
+    random_state: int = 42,
+) -> tuple[List[TuneResult], Optional[TuneResult]]:
+    """
+    Evaluate the parameter grid in a process pool.
+    Returns ``(all results, chosen result or None)``.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    split = int(len(X) * train_frac)
+    if split < 10 or len(X) - split < 10:
+        raise ValueError(f"Not enough history to tune (have {len(X)} rows).")
+
+    X_train = X[:split]
+    X_test, y_test = inject_anomalies(X[split:], random_state=random_state)
+    X_test = X_test.astype(np.float32)
+
+    candidates = expand_grid(grid or DEFAULT_GRID)
+    n_workers = max(1, min(workers or os.cpu_count() or 1, len(candidates)))
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(X_train, X_test, y_test),
+    ) as pool:
+        results = list(pool.map(evaluate_candidate, candidates, itertools.repeat(random_state)))
+
+    return results, pick_best(results, target_recall)
+
+
+def results_frame(results: Iterable[TuneResult]) -> pd.DataFrame:
+    df = pd.DataFrame([asdict(r) for r in results])
+    return df.sort_values(["recall", "precision"], ascending=False, ignore_index=True)
@@ -0,0 +1,193 @@
+"""Append-only float32 feature matrix kept next to the Parquet store.
+
+Two headerless little-endian files live beside ``metrics.parquet``:
+
+- ``metrics.features.f32``: row-major float32, one row of ``FEATURES`` per sample
+- ``metrics.ts.f64``: float64 UTC epoch seconds, one per row, non-decreasing
+
+Both are memory-mapped read-only, so train/detect see the data without a
+pandas round-trip, and time ranges are cut with a binary search on ``ts``.
+
+``metrics.features.json`` records how many rows the pair holds and which
+Parquet file (row count, mtime, size) it was derived from. Appends cut both files
+back to that count first, so a torn write cannot shift X against ts, and a
+sidecar that no longer matches its Parquet file is rebuilt.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+FEATURES = ["cpu_percent", "mem_percent", "disk_percent", "net_sent_kb_s", "net_recv_kb_s"]
+
+ROW_DTYPE = np.dtype("<f4")
+TS_DTYPE = np.dtype("<f8")
+ROW_BYTES = ROW_DTYPE.itemsize * len(FEATURES)
+
+
+def sidecar_paths(parquet_path: Path) -> tuple[Path, Path]:
+    """Return ``(matrix_path, ts_path)`` for a Parquet metrics file."""
+    return parquet_path.with_suffix(".features.f32"), parquet_path.with_suffix(".ts.f64")
+
+
+def _meta_path(parquet_path: Path) -> Path:
+    return parquet_path.with_suffix(".features.json")
+
+
+def _parquet_state(parquet_path: Path) -> tuple[int, list[int]]:
+    """Row count (from the footer) and ``[mtime_ns, size]`` of the Parquet file."""
+    st = parquet_path.stat()
+    return pq.read_metadata(parquet_path).num_rows, [st.st_mtime_ns, st.st_size]
+
+
+def _read_meta(parquet_path: Path) -> dict | None:
+    try:
+        return json.loads(_meta_path(parquet_path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(parquet_path: Path, rows: int) -> None:
+    parquet_rows, stamp = _parquet_state(parquet_path)
+    path = _meta_path(parquet_path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"rows": rows, "parquet_rows": parquet_rows, "parquet_stamp": stamp}))
+    os.replace(tmp, path)
+
+
+def _to_epoch(ts_utc: str) -> float:
+    return datetime.fromisoformat(ts_utc).timestamp()
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    X: np.ndarray   # shape (n, len(FEATURES)), float32
+    ts: np.ndarray  # shape (n,), float64 epoch seconds
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    def slice(self, start: float | None = None, end: float | None = None) -> FeatureMatrix:
+        """
+        Rows with ``start <= ts < end`` (either bound optional).
+        Returns views into the same mapping, nothing is copied.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.ts, start, side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.ts, end, side="left"))
+        hi = max(lo, hi)
+        return FeatureMatrix(X=self.X[lo:hi], ts=self.ts[lo:hi])
+
+
+def _empty() -> FeatureMatrix:
+    return FeatureMatrix(
+        X=np.empty((0, len(FEATURES)), dtype=ROW_DTYPE),
+        ts=np.empty((0,), dtype=TS_DTYPE),
+    )
+
+
+def rebuild_features(parquet_path: Path) -> int:
+    """
+    (Re)build the sidecar from the Parquet file. Used to backfill history
+    collected before the sidecar existed. Returns the number of rows written.
+    """
+    matrix_path, ts_path = sidecar_paths(parquet_path)
+
+    df = pd.read_parquet(parquet_path, columns=["ts_utc", *FEATURES]).dropna()
+    ts = pd.to_datetime(df["ts_utc"], utc=True, format="ISO8601")
+    order = np.argsort(ts.to_numpy(), kind="stable")
+
+    X = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=ROW_DTYPE)[order])
+    t = (ts - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy(dtype=TS_DTYPE)[order]
+
+    # write to temp files and swap in, so readers never see half a rebuild
+    for path, arr in ((matrix_path, X), (ts_path, t)):
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        arr.tofile(tmp)
+        os.replace(tmp, path)
+
+    n = int(t.shape[0])
+    _write_meta(parquet_path, n)
+    return n
+
+
+def append_features(parquet_path: Path, row: dict) -> bool:
+    """
+    Append one collected row. Rows with missing/non-finite features are skipped
+    (same effect as the ``dropna`` the ML code used to do). Returns True if written.
+
+    Call after the row was appended to Parquet: if the sidecar does not exist
+    yet, or was not derived from the Parquet file minus ``row``, it is rebuilt
+    from the Parquet file, which already contains ``row``.
+    """
+    matrix_path, ts_path = sidecar_paths(parquet_path)
+    meta = _read_meta(parquet_path)
+    if (
+        meta is None
+        or not matrix_path.exists()
+        or not ts_path.exists()
+        or _parquet_state(parquet_path)[0] != meta["parquet_rows"] + 1
+    ):
+        rebuild_features(parquet_path)
+        return True
+
+    # drop whatever a crashed append left past the committed row count
+    n = int(meta["rows"])
+    for path, size in ((matrix_path, n * ROW_BYTES), (ts_path, n * TS_DTYPE.itemsize)):
+        if path.stat().st_size != size:
+            os.truncate(path, size)
+
+    try:
+        vec = np.array([row[f] for f in FEATURES], dtype=ROW_DTYPE)
+        ok = bool(np.all(np.isfinite(vec)))
+    except (KeyError, TypeError, ValueError):
+        ok = False
+    if ok:
+        # features first: the row count is min(len(X), len(ts)), so a reader
+        # never sees a timestamp without its row
+        with matrix_path.open("ab") as f:
+            f.write(vec.tobytes())
+        with ts_path.open("ab") as f:
+            f.write(np.array([_to_epoch(row["ts_utc"])], dtype=TS_DTYPE).tobytes())
+        n += 1
+    _write_meta(parquet_path, n)
+    return ok
+
+
+def open_features(parquet_path: Path) -> FeatureMatrix:
+    """
+    Map the sidecar read-only, (re)building it from Parquet if it is missing
+    or was derived from a different Parquet file. A Parquet file exactly one
+    row ahead is a collector between its Parquet and sidecar appends: the
+    sidecar is used as is.
+    """
+    matrix_path, ts_path = sidecar_paths(parquet_path)
+    meta = _read_meta(parquet_path)
+    fresh = meta is not None and matrix_path.exists() and ts_path.exists()
+    if fresh:
+        parquet_rows, stamp = _parquet_state(parquet_path)
+        fresh = parquet_rows == meta["parquet_rows"] + 1 or (
+            parquet_rows == meta["parquet_rows"] and stamp == meta["parquet_stamp"]
+        )
+    if not fresh:
+        rebuild_features(parquet_path)
+        meta = _read_meta(parquet_path)
+
+    n = min(
+        int(meta["rows"]),
+        matrix_path.stat().st_size // ROW_BYTES,
+        ts_path.stat().st_size // TS_DTYPE.itemsize,
+    )
+    if n == 0:
+        return _empty()
+
+    X = np.memmap(matrix_path, dtype=ROW_DTYPE, mode="r", shape=(n, len(FEATURES)))
+    ts = np.memmap(ts_path, dtype=TS_DTYPE, mode="r", shape=(n,))
+    return FeatureMatrix(X=X, ts=ts)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sba.collectors.adaptive import AdaptiveInterval
+
+
+def test_interval_relaxes_when_flat_and_tightens_on_spikes() -> None:
+    rng = np.random.default_rng(0)
+    p = AdaptiveInterval(min_s=1.0, max_s=30.0, start_s=5.0)
+    t = 0.0
+    for _ in range(200):
+        x = rng.normal([20, 50, 60, 10], [0.2, 0.2, 0.01, 0.1])
+        t += p.interval
+        p.update(x, t)
+    assert p.interval == 30.0
+
+    t += p.interval
+    assert p.update([95.0, 50, 60, 10], t) == 15.0
+
+    p.bump()                          # e.g. a detector fired
+    t += p.interval
+    assert p.update([20.0, 50, 60, 10], t) == 7.5
+
+
+def test_non_finite_metrics_are_ignored() -> None:
+    p = AdaptiveInterval(min_s=0.5, max_s=4.0, start_s=2.0)
+    for i in range(20):
+        p.update([10.0, np.nan, 30.0, 1.0], float(i))
+    assert p.interval == 4.0
+    assert p.update([np.nan] * 4, 21.0) == 4.0
+    assert p.zscore(np.array([10.0, 99.0, 30.0, 1.0])) == 0.0
+
+
+def test_bounds_are_validated() -> None:
+    with pytest.raises(ValueError):
+        AdaptiveInterval(min_s=5.0, max_s=1.0)
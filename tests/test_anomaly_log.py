@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.guardian_gui.core.anomaly_log import AnomalyLog
+from sba.guardian_gui.core.records import Anomaly
+
+
+def _a(t: float) -> Anomaly:
+    return Anomaly(ts=t, cpu=t, ram=1.0, disk=2.0, net_kbps=3.0, z=(4.0, 0.0, 0.0, 0.0), score=4.0, reason=f"r{t:g}")
+
+
+def test_append_grows_then_evicts_oldest_chunk() -> None:
+    log = AnomalyLog(max_rows=100, drop_frac=0.1, initial=8)
+    for i in range(100):
+        log.append(_a(float(i)), metric=0)
+    assert len(log) == 100 and log.dropped == 0
+
+    log.append(_a(100.0), metric=0)
+    assert len(log) == 91 and log.dropped == 10 and log.total == 101
+    assert log[0] == _a(10.0) and log[-1] == _a(100.0)
+
+
+def test_extend_keeps_newest_rows() -> None:
+    log = AnomalyLog(max_rows=50)
+    n = 120
+    log.extend(
+        np.arange(n, dtype=float), np.zeros((n, 4)), np.zeros((n, 4)), np.ones(n),
+        np.zeros(n, dtype=int), np.array([f"r{i}" for i in range(n)], dtype=object),
+    )
+    assert len(log) == 50 and log.total == 120
+    np.testing.assert_array_equal(log.ts[:len(log)], np.arange(70, 120))
+    assert log[0].reason == "r70"
+
+    log.clear()
+    assert len(log) == 0 and log.total == 120
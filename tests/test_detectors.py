@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sba.ml.benchmark import run_benchmark
+from sba.ml.detectors import (
+    DETECTORS,
+    BaseDetector,
+    Detector,
+    IsolationForestDetector,
+    ZScoreDetector,
+    make_detector,
+)
+from sba.ml.synthetic import inject_spikes
+
+
+def _normal(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal([20, 50, 40, 5, 10], [3, 2, 0.5, 1, 2], size=(n, 5))
+
+
+@pytest.mark.parametrize("name", sorted(DETECTORS))
+def test_detector_contract(name: str, tmp_path: Path) -> None:
+    det = make_detector(name)
+    assert isinstance(det, Detector)
+
+    det.fit(_normal(600))
+    assert det.is_fitted
+    det.partial_fit(_normal(50, seed=1))
+
+    spikes = np.array([[99, 50, 40, 5, 10], [20, 50, 40, 5, 400]], dtype=float)
+    scores = det.score_batch(spikes)
+    assert scores.shape == (2,)
+    assert np.all(scores > np.median(det.score_batch(_normal(200, seed=3))))
+    np.testing.assert_array_equal(det.predict(spikes), np.where(scores >= det.threshold_, -1, 1))
+
+    det.save(tmp_path / "m.joblib")
+    clone = BaseDetector.load(tmp_path / "m.joblib")
+    X = _normal(20, seed=2)
+    np.testing.assert_allclose(clone.score_batch(X), det.score_batch(X))
+
+
+def test_zscore_partial_fit_matches_batch() -> None:
+    X = _normal(300)
+    inc = ZScoreDetector()
+    for chunk in np.array_split(X, 7):
+        inc.partial_fit(chunk)
+    full = ZScoreDetector().fit(X)
+    np.testing.assert_allclose(inc.mean_, full.mean_)
+    np.testing.assert_allclose(inc.std_, full.std_)
+
+
+def test_benchmark_reports_every_detector() -> None:
+    X_test, y = inject_spikes(_normal(400, seed=3), rate=0.05, random_state=0)
+    results = run_benchmark(_normal(400), X_test, y, {"zscore": ZScoreDetector})
+    (r,) = results
+    assert r.name == "zscore" and r.fit_s >= 0 and r.rows_per_s > 0
+    assert r.recall > 0.8 and r.roc_auc > 0.9
+
+
+def test_batch_detectors_refit_only_every_refit_every_rows() -> None:
+    with pytest.raises(TypeError):
+        BaseDetector()                                      # abstract
+
+    det = IsolationForestDetector(n_estimators=10, refit_every=100).fit(_normal(200))
+    forest = det.model_
+    for seed in range(9):                                   # 90 rows: keeps the forest
+        det.partial_fit(_normal(10, seed=seed))
+    assert det.model_ is forest
+    det.partial_fit(_normal(10, seed=9))                    # 100th row: one refit
+    assert det.model_ is not forest and det._hist.rows.shape[0] == 300
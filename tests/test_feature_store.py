@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sba.storage.feature_store import FEATURES, append_features, open_features, sidecar_paths
+from sba.storage.parquet_store import append_metrics_parquet
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(i: int) -> dict:
+    return {
+        "ts_utc": (T0 + timedelta(seconds=5 * i)).isoformat(timespec="seconds"),
+        "cpu_percent": float(i),
+        "mem_percent": 50.0,
+        "mem_used_mb": 1000.0 + i,
+        "disk_percent": 40.0,
+        "net_sent_kb_s": 1.0,
+        "net_recv_kb_s": 2.0,
+    }
+
+
+def _collect(pq: Path, n: int) -> None:
+    for i in range(n):
+        row = _row(i)
+        append_metrics_parquet(pq, row)
+        append_features(pq, row)
+
+
+def test_append_and_slice(tmp_path: Path) -> None:
+    pq = tmp_path / "metrics.parquet"
+    _collect(pq, 10)
+
+    fm = open_features(pq)
+    assert fm.X.shape == (10, len(FEATURES))
+    assert fm.X.dtype == np.float32
+    np.testing.assert_array_equal(fm.X[:, 0], np.arange(10, dtype=np.float32))
+
+    start = (T0 + timedelta(seconds=10)).timestamp()
+    end = (T0 + timedelta(seconds=25)).timestamp()
+    part = fm.slice(start, end)
+    np.testing.assert_array_equal(part.X[:, 0], [2.0, 3.0, 4.0])
+    assert np.shares_memory(part.X, fm.X)
+
+
+def test_backfill_from_existing_parquet(tmp_path: Path) -> None:
+    pq = tmp_path / "metrics.parquet"
+    for i in range(5):
+        append_metrics_parquet(pq, _row(i))
+
+    # first append after an upgrade rebuilds the whole history
+    row = _row(5)
+    append_metrics_parquet(pq, row)
+    append_features(pq, row)
+    assert len(open_features(pq)) == 6
+
+    for p in sidecar_paths(pq):
+        p.unlink()
+    assert len(open_features(pq)) == 6
+
+
+def test_non_finite_rows_are_skipped(tmp_path: Path) -> None:
+    pq = tmp_path / "metrics.parquet"
+    _collect(pq, 3)
+    bad = _row(3) | {"cpu_percent": float("nan")}
+    append_metrics_parquet(pq, bad)
+    assert append_features(pq, bad) is False
+    assert len(open_features(pq)) == 3
+
+
+def test_torn_append_does_not_shift_rows(tmp_path: Path) -> None:
+    pq = tmp_path / "metrics.parquet"
+    _collect(pq, 4)
+    matrix_path, _ = sidecar_paths(pq)
+    # crash after the feature row was written but before its timestamp
+    with matrix_path.open("ab") as f:
+        f.write(np.full(len(FEATURES), 99.0, dtype=np.float32).tobytes())
+
+    for i in range(4, 7):
+        row = _row(i)
+        append_metrics_parquet(pq, row)
+        append_features(pq, row)
+    fm = open_features(pq)
+    np.testing.assert_array_equal(fm.X[:, 0], np.arange(7, dtype=np.float32))
+    np.testing.assert_array_equal(np.diff(fm.ts), 5.0)
+
+
+def test_sidecar_of_a_replaced_parquet_is_rebuilt(tmp_path: Path) -> None:
+    pq = tmp_path / "metrics.parquet"
+    _collect(pq, 5)
+    assert len(open_features(pq)) == 5
+
+    # history replaced behind the sidecar's back (same row count, other data)
+    pd.DataFrame([_row(i) | {"cpu_percent": 50.0 + i} for i in range(5)]).to_parquet(pq, index=False)
+    np.testing.assert_array_equal(open_features(pq).X[:, 0], 50.0 + np.arange(5, dtype=np.float32))
+
+    pq.unlink()
+    _collect(pq, 2)                           # a fresh store must not extend the old matrix
+    assert len(open_features(pq)) == 2
+
+
+def test_collected_columns_are_attached_to_shown_rows(tmp_path: Path) -> None:
+    import joblib
+    from sklearn.ensemble import IsolationForest
+
+    from sba.ml.detect import detect_anomalies, with_collected_columns
+
+    pq = tmp_path / "metrics.parquet"
+    _collect(pq, 20)
+    model = IsolationForest(n_estimators=10, random_state=0).fit(open_features(pq).X)
+    joblib.dump(model, tmp_path / "model.joblib")
+
+    start = (T0 + timedelta(seconds=50)).timestamp()
+    df = detect_anomalies(pq, tmp_path / "model.joblib", start=start)
+    assert list(df.columns) == ["ts_utc", *FEATURES, "is_anomaly", "anomaly_score"]
+    np.testing.assert_array_equal(df["cpu_percent"], np.arange(10, 20))
+
+    shown = with_collected_columns(df.iloc[[7, 2, 5]], pq)
+    assert list(shown.columns) == [*_row(0), "is_anomaly", "anomaly_score"]
+    np.testing.assert_array_equal(shown["mem_used_mb"], [1017.0, 1012.0, 1015.0])
+
+
+def test_detect_keeps_sub_second_timestamps(tmp_path: Path) -> None:
+    import joblib
+    from sklearn.ensemble import IsolationForest
+
+    from sba.ml.detect import detect_anomalies
+
+    pq = tmp_path / "metrics.parquet"
+    rows = [_row(i) | {"ts_utc": (T0 + timedelta(milliseconds=250 * i)).isoformat(timespec="milliseconds")}
+            for i in range(8)]
+    for row in rows:
+        append_metrics_parquet(pq, row)
+        append_features(pq, row)
+    joblib.dump(IsolationForest(n_estimators=5, random_state=0).fit(open_features(pq).X),
+                tmp_path / "model.joblib")
+
+    df = detect_anomalies(pq, tmp_path / "model.joblib")
+    assert list(df["ts_utc"]) == [r["ts_utc"] for r in rows]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sba.guardian_gui.core.procscan import ProcFrame, StringPool
+from sba.guardian_gui.workers.hub import PROCESSES, SYSTEM, SamplingHub
+
+
+def _frame(pool: StringPool, n: int = 3) -> ProcFrame:
+    return ProcFrame(
+        1.0, np.arange(1, n + 1, dtype=np.int64), np.zeros(n, dtype=np.int64), np.ones(n),
+        np.linspace(1, 9, n), np.full(n, 1 << 20, dtype=np.int64), np.zeros(n, dtype=np.int8),
+        pool.intern_many(f"p{i}" for i in range(n)), np.full(n, pool.intern(""), dtype=np.int32), pool,
+    )
+
+
+def test_each_stream_is_read_once_per_tick_and_only_when_subscribed(monkeypatch) -> None:
+    calls = {"cpu": 0}
+
+    def cpu_percent(interval=None):
+        calls["cpu"] += 1
+        return 12.0
+
+    monkeypatch.setattr("sba.guardian_gui.workers.system_worker.psutil.cpu_percent", cpu_percent)
+    pool = StringPool()
+    scans = []
+
+    class _Scanner:
+        def scan(self):
+            scans.append(1)
+            return _frame(pool)
+
+    hub = SamplingHub(proc_period_s=3600.0)
+    hub.scanner = _Scanner()
+    assert hub.tick() is None and calls["cpu"] == 0 and not scans     # nobody subscribed
+
+    hub.subscribe("dashboard", SYSTEM)
+    hub.subscribe("session", SYSTEM)
+    assert hub.tick() is None and calls["cpu"] == 1                   # primed, no sample yet
+    snap = hub.tick()
+    assert calls["cpu"] == 2 and snap.system.cpu == 12.0 and snap.procs is None
+
+    hub.subscribe("processes", PROCESSES)                              # first subscriber: scan now
+    snap = hub.tick()
+    assert len(scans) == 1 and calls["cpu"] == 3 and len(snap.procs) == 3
+    with pytest.raises(ValueError):
+        snap.procs.cpu[0] = 0.0                                        # shared by every subscriber
+    assert hub.tick().procs is None and len(scans) == 1                # within the period
+    hub.poke()
+    assert hub.tick().procs is not None and len(scans) == 2
+
+    hub.unsubscribe("dashboard")
+    hub.unsubscribe("session")
+    hub.unsubscribe("processes")
+    assert hub.tick() is None and calls["cpu"] == 5 and len(scans) == 2
+
+
+def test_processes_are_scanned_at_the_fastest_subscribed_period(monkeypatch) -> None:
+    clock = {"now": 100.0}
+    monkeypatch.setattr("sba.guardian_gui.workers.hub.time.monotonic", lambda: clock["now"])
+    pool = StringPool()
+    scans = []
+
+    class _Scanner:
+        def scan(self):
+            scans.append(clock["now"])
+            return _frame(pool)
+
+    hub = SamplingHub(proc_period_s=2.0)
+    hub.scanner = _Scanner()
+    hub.subscribe("processes", PROCESSES, proc_period_s=10.0)         # page off screen
+    for _ in range(12):
+        hub.tick()
+        clock["now"] += 1.0
+    assert scans == [100.0, 110.0]
+
+    hub.subscribe("processes", PROCESSES)                              # back on screen: default period
+    for _ in range(4):
+        hub.tick()
+        clock["now"] += 1.0
+    assert scans == [100.0, 110.0, 112.0, 114.0]
+
+    hub.subscribe("other", PROCESSES, proc_period_s=30.0)
+    hub.unsubscribe("processes", PROCESSES)
+    for _ in range(30):
+        hub.tick()
+        clock["now"] += 1.0
+    assert scans[4:] == [144.0]
+
+
+def test_worker_scores_a_shared_frame_without_writing_to_it() -> None:
+    from sba.guardian_gui.pages.processes import ProcWorker
+    from sba.guardian_gui.workers.hub import _freeze
+
+    pool = StringPool()
+    f = _freeze(_frame(pool, 5))
+    w = ProcWorker()
+    out = []
+    w.result.connect(lambda frame, _limit, _hist: out.append(frame))
+    w.ingest(f)
+    assert not out                                                     # scored, nothing shown yet
+    w.select("", 2, 2, True)
+    assert list(out[-1].pid) == [5, 4] and (out[-1].hist_slot >= 0).all()
+    assert (f.hist_slot == -1).all()
+    w.select("", 0, 1, False)                                          # new sort key, same frame
+    assert list(out[-1].pid) == [1, 2, 3, 4, 5]
+
+
+def test_scan_failures_are_reported_rate_limited() -> None:
+    class _Broken:
+        def scan(self):
+            raise OSError("procfs gone")
+
+    hub = SamplingHub(proc_period_s=0.0)
+    hub.scanner = _Broken()
+    errors = []
+    hub.error.connect(errors.append)
+    hub.subscribe("processes", PROCESSES)
+    for _ in range(5):
+        assert hub.tick() is None
+    assert errors == ["Process scan failed: OSError: procfs gone"]
+
+    hub._report.every_s = 0.0                      # next report carries the count of skipped ones
+    hub.tick()
+    assert len(errors) == 2
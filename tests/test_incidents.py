@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.guardian_gui.core.session import Sample, Session
+from sba.ml.incidents import IncidentBuilder, incidents_frame
+
+LABELS = ("cpu", "ram")
+
+
+def test_builder_merges_runs() -> None:
+    b = IncidentBuilder(LABELS, gap_s=5.0, max_incidents=2)
+    for t in range(10):
+        inc = b.add(float(t), score=float(t % 4), metric=t % 3 == 0, reason=f"r{t}")
+    assert len(b) == 1 and inc.count == 10
+    assert (inc.start, inc.end, inc.peak_score, inc.peak_ts) == (0.0, 9.0, 3.0, 3.0)
+    assert inc.dominant == "cpu" and inc.reason == "r3"
+
+    assert b.add(30.0, 1.0, 1, "x").count == 1          # gap > 5 s: new incident
+    b.add(100.0, 1.0, 1, "y")
+    assert len(b) == 2 and b.items()[0].start == 30.0   # capped
+
+
+def test_frame_matches_builder() -> None:
+    rng = np.random.default_rng(0)
+    ts = np.sort(rng.choice(2000, 300, replace=False)).astype(float)
+    scores = rng.random(300)
+    metric = rng.integers(0, 2, 300)
+
+    b = IncidentBuilder(LABELS, gap_s=10.0)
+    for t, s, m in zip(ts, scores, metric, strict=True):
+        b.add(t, s, int(m), "")
+    df = incidents_frame(ts, scores, metric, LABELS, gap_s=10.0)
+
+    items = b.items()
+    assert len(df) == len(items)
+    np.testing.assert_array_equal(df["count"], [i.count for i in items])
+    np.testing.assert_array_equal(df["peak_ts"], [i.peak_ts for i in items])
+    np.testing.assert_array_equal(df["end"], [i.end for i in items])
+
+
+def test_session_sustained_spike_is_one_incident() -> None:
+    s = Session(window=50, max_anomalies=100)
+    for i in range(100):
+        s.add(Sample(ts=float(i), cpu=20.0 + i % 3, ram=40.0, disk=60.0, net_kbps=5.0))
+    s.train(window=50)
+    for i in range(100, 400):
+        s.add(Sample(ts=float(i), cpu=95.0, ram=40.0, disk=60.0, net_kbps=5.0))
+        s.detect_last()
+
+    assert len(s.anomalies) == 100                       # raw anomalies capped
+    assert len(s.incidents) == 1
+    inc = s.incidents.current
+    assert inc.count == 300 and inc.dominant == "CPU" and inc.duration_s == 299.0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.guardian_gui.core.procbaseline import CPU_FLAG, RAM_FLAG, ProcBaselines, identity
+from sba.guardian_gui.core.procscan import ProcFrame, StringPool
+
+MB = 1024 * 1024
+
+
+def _frame(pool: StringPool, ts, pid, names, paths, cpu, rss) -> ProcFrame:
+    n = len(pid)
+    return ProcFrame(
+        float(ts), np.array(pid, dtype=np.int64), np.zeros(n, dtype=np.int64), np.ones(n),
+        np.array(cpu, dtype=float), np.array(rss, dtype=np.int64), np.zeros(n, dtype=np.int8),
+        pool.intern_many(names), pool.intern_many(paths), pool,
+    )
+
+
+def test_baselines_follow_the_program_not_the_pid() -> None:
+    pool = StringPool()
+    b = ProcBaselines(warmup=5)
+    rng = np.random.default_rng(0)
+    # three workers of one program (pids change every scan) and one lone daemon without exe
+    for ts in range(30):
+        f = _frame(pool, ts, [100 + 3 * ts, 101 + 3 * ts, 102 + 3 * ts, 7], ["w", "w", "w", "d"],
+                   ["/bin/w", "/bin/w", "/bin/w", ""], 10 + rng.normal(0, 1, 4), [200 * MB] * 4)
+        s = b.update(f)
+        assert not s.flags.any()
+    assert len(b) == 2 and list(identity(f)) == [pool.intern("/bin/w")] * 3 + [pool.intern("d")]
+    np.testing.assert_allclose(b.mean[b.rows(identity(f))][:, 0], 10, atol=1.5)
+
+    # a fresh pid of the same program spikes CPU, the daemon balloons in RAM
+    f = _frame(pool, 30, [500, 501, 502, 7], ["w", "w", "w", "d"], ["/bin/w"] * 3 + [""],
+               [10, 95, 10, 10], [200 * MB, 200 * MB, 200 * MB, 900 * MB])
+    s = b.update(f)
+    assert list(s.flags) == [0, CPU_FLAG, 0, RAM_FLAG] and list(s.onset) == [False, True, False, True]
+    found = b.anomalies(f, s)
+    assert [(a.pid, a.metric, a.path) for a in found] == [(501, "CPU", "/bin/w"), (7, "RAM", "d")]
+    assert found[0].usual < 12 and found[0].z > b.z_thresh
+
+    # still unusual next scan: flagged again but not a new onset
+    f = _frame(pool, 31, [501, 7], ["w", "d"], ["/bin/w", ""], [95, 10], [200 * MB, 900 * MB])
+    s = b.update(f)
+    assert s.flags.all() and not s.onset.any() and b.anomalies(f, s) == []
+
+
+def test_new_programs_warm_up_before_scoring() -> None:
+    pool = StringPool()
+    b = ProcBaselines(warmup=3)
+    for ts in range(3):
+        s = b.update(_frame(pool, ts, [1], ["a"], ["/a"], [90.0 * (ts == 2)], [MB]))
+        assert np.isnan(s.score).all() and not s.flags.any()
+    s = b.update(_frame(pool, 3, [1, 2], ["a", "b"], ["/a", "/b"], [1.0, 1.0], [MB, MB]))
+    assert np.isfinite(s.score[0]) and np.isnan(s.score[1])
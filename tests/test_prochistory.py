@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.guardian_gui.core.prochistory import ProcHistory
+from sba.guardian_gui.core.procscan import ProcFrame, StringPool
+
+
+def _frame(pool: StringPool, ts: float, procs: dict) -> ProcFrame:
+    """procs: pid -> (start, cpu, rss)"""
+    pids = sorted(procs)
+    n = len(pids)
+    return ProcFrame(
+        ts, np.array(pids, dtype=np.int64), np.zeros(n, dtype=np.int64),
+        np.array([procs[p][0] for p in pids], dtype=float), np.array([procs[p][1] for p in pids], dtype=float),
+        np.array([procs[p][2] for p in pids], dtype=np.int64), np.zeros(n, dtype=np.int8),
+        np.zeros(n, dtype=np.int32), np.zeros(n, dtype=np.int32), pool,
+    )
+
+
+def test_ring_rows_follow_processes_and_estimate_leak_slope() -> None:
+    pool = StringPool()
+    h = ProcHistory(depth=8, min_samples=4)
+    mb = 1 << 20
+
+    slots = [h.update(_frame(pool, 100.0 + 2 * k, {1: (1, 5.0, 100 * mb + k * mb), 2: (1, k, 50 * mb)}))
+             for k in range(6)]
+    assert all((s == slots[0]).all() for s in slots)
+    a, b = slots[0].tolist()
+    np.testing.assert_allclose(h.series(b)[-6:], [0, 1, 2, 3, 4, 5])
+    assert np.isnan(h.series(b)[:2]).all()                 # not seen yet
+    leak = h.leak_slope(slots[0])
+    np.testing.assert_allclose(leak, [mb / 2.0, 0.0])     # 1 MB per 2 s, flat
+    np.testing.assert_allclose(h.mean_cpu(slots[0]), [5.0, 2.5])
+
+    # pid 2 exits; its row is not reused by the same scan, only by the next one
+    s = h.update(_frame(pool, 112.0, {1: (1, 5.0, 0), 3: (7, 1.0, 0)}))
+    assert s[1] != b and len(h) == 2
+    s = h.update(_frame(pool, 114.0, {1: (1, 5.0, 0), 3: (7, 1.0, 0), 4: (7, 1.0, 0)}))
+    assert s[2] == b and np.isnan(h.series(b)[:-1]).all()  # recycled row starts empty
+    assert np.isnan(h.leak_slope(s[2:]))[0]                 # too few samples
+
+
+def test_rows_are_a_read_only_copy_for_the_view() -> None:
+    pool = StringPool()
+    h = ProcHistory(depth=4, min_samples=2)
+    s = h.update(_frame(pool, 1.0, {1: (1, 10.0, 0), 2: (1, 20.0, 0)}))
+    rows = h.rows(s[::-1])
+    np.testing.assert_allclose(rows.series(int(s[1]))[-1:], [20.0])
+    assert rows.mean(int(s[0])) == 10.0 and rows.series(99) is None
+
+    # pid 2 exits and a new process takes its row: the copy keeps what was shown
+    h.update(_frame(pool, 2.0, {1: (1, 11.0, 0)}))
+    h.update(_frame(pool, 3.0, {1: (1, 12.0, 0), 3: (5, 99.0, 0)}))
+    assert list(rows.series(int(s[1]))[-1:]) == [20.0] and rows.mean(int(s[1])) == 20.0
+    assert not rows.cpu.flags.writeable
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sba.guardian_gui.core.procscan import STATUSES, ProcFrame, ProcScanner, StringPool
+from sba.guardian_gui.core.proctable import ProcTable, runs
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "sysconf"), reason="procfs layout is POSIX-only")
+
+
+def _write(root: Path, pid: int, comm: str, state: str, ppid: int, ticks: int, start: int, pages: int,
+           argv: str = "") -> None:
+    d = root / str(pid)
+    d.mkdir(exist_ok=True)
+    # fields after "(comm) ": state ppid pgrp session tty tpgid flags minflt cminflt majflt
+    # cmajflt utime stime cutime cstime priority nice threads itreal starttime vsize rss
+    rest = [state, ppid, 1, 1, 0, -1, 0, 0, 0, 0, 0, ticks, 0, 0, 0, 20, 0, 1, 0, start, 0, pages]
+    (d / "stat").write_text(f"{pid} ({comm}) " + " ".join(map(str, rest)) + "\n")
+    (d / "cmdline").write_bytes(argv.replace(" ", "\0").encode())
+
+
+def test_procfs_scan_columns_and_cpu_deltas(tmp_path: Path, monkeypatch) -> None:
+    _write(tmp_path, 1, "init", "S", 0, 10, 1, 100)
+    _write(tmp_path, 42, "a-very-long-nam", "R", 1, 0, 500, 256, "/usr/bin/a-very-long-name --x")
+    (tmp_path / "self").mkdir()
+
+    clock = iter([1000.0, 1002.0, 1004.0])
+    monkeypatch.setattr("sba.guardian_gui.core.procscan.time.time", lambda: next(clock))
+    s = ProcScanner(proc_root=str(tmp_path), use_procfs=True)
+    s.ncpu = 2
+    tck = s._clk_tck
+
+    f = s.scan()
+    assert list(f.pid) == [1, 42] and list(f.ppid) == [0, 1]
+    assert f.name == ["init", "a-very-long-name"]      # argv[0] recovers truncated comm
+    assert STATUSES[f.status[1]] == "running"
+    assert f.rss[1] == 256 * s._page
+    assert np.all(f.cpu == 0) and s.cmdline(42, 500) == "/usr/bin/a-very-long-name --x"
+
+    # pid 42 used 2 s of CPU in 2 s on 2 cores; pid 1 was recycled (new start time)
+    _write(tmp_path, 42, "a-very-long-nam", "R", 1, int(2 * tck), 500, 256)
+    _write(tmp_path, 1, "init", "S", 0, int(1000 * tck), 9, 100)
+    f = s.scan()
+    np.testing.assert_allclose(f.cpu, [0.0, 50.0])
+
+    # exited processes disappear, with their cached static attributes
+    for p in (tmp_path / "42").iterdir():
+        p.unlink()
+    (tmp_path / "42").rmdir()
+    f = s.scan()
+    assert list(f.pid) == [1] and s.cmdline(42, 500) == ""
+
+
+def test_expensive_attributes_refresh_within_budget_and_period(tmp_path: Path, monkeypatch) -> None:
+    for pid in (1, 2, 3):
+        _write(tmp_path, pid, f"p{pid}", "S", 0, 0, pid, 1, f"/bin/p{pid}")
+        (tmp_path / str(pid) / "io").write_text("rchar: 9\nread_bytes: 100\nwrite_bytes: 7\n")
+        (tmp_path / str(pid) / "fd").mkdir()
+    (tmp_path / "2" / "fd" / "0").symlink_to("socket:[123]")
+    (tmp_path / "2" / "fd" / "1").symlink_to(tmp_path / "2" / "io")
+
+    now = [1000.0]
+    monkeypatch.setattr("sba.guardian_gui.core.procscan.time.time", lambda: now[0])
+    s = ProcScanner(proc_root=str(tmp_path), use_procfs=True, budget_s=0.0)
+
+    f = s.scan()                                       # cheap pass only
+    assert list(f.pid) == [1, 2, 3] and f.name == ["p1", "p2", "p3"]
+    assert all(np.isnan(v).all() for v in f.read_ts.values()) and np.isnan(f.fds).all()
+
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr("sba.guardian_gui.core.procscan.os.listdir", lambda p: listed.append(p) or listdir(p))
+    s.budget_s = None
+    f = s.scan()
+    assert s.cmdline(1, 1) == "/bin/p1"
+    assert list(f.io_read) == [100, 100, 100] and list(f.fds) == [0, 2, 0] and list(f.sockets) == [0, 1, 0]
+    assert sum(p.endswith("/fd") for p in listed) == 3      # fds and sockets share one listing
+    assert np.all(f.age("io") == 0)
+
+    # within the period the cached value is kept (and its age grows); after it, re-read
+    (tmp_path / "1" / "io").write_text("read_bytes: 500\nwrite_bytes: 7\n")
+    now[0] += 2.0
+    f = s.scan()
+    assert f.io_read[0] == 100 and f.age("io")[0] == 2.0
+    now[0] += 4.0
+    f = s.scan()
+    assert f.io_read[0] == 500 and f.age("io")[0] == 0.0 and f.age("sockets")[0] == 6.0
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc")
+def test_procfs_and_psutil_backends_agree_on_this_process() -> None:
+    me = os.getpid()
+    a = ProcScanner().scan()
+    b = ProcScanner(use_procfs=False).scan()
+    ia, ib = list(a.pid).index(me), list(b.pid).index(me)
+    assert a.ppid[ia] == b.ppid[ib] and a.path[ia] == b.path[ib]
+    assert abs(int(a.rss[ia]) - int(b.rss[ib])) < 8 << 20
+
+
+def _frame(pool: StringPool, pid, start, cpu) -> ProcFrame:
+    n = len(pid)
+    names = pool.intern_many(f"p{p}" for p in pid)
+    return ProcFrame(
+        0.0, np.array(pid, dtype=np.int64), np.zeros(n, dtype=np.int64), np.array(start, dtype=float),
+        np.array(cpu, dtype=float), np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int8),
+        names, np.full(n, pool.intern(""), dtype=np.int32), pool,
+    )
+
+
+def test_table_plan_matches_rows_by_pid_and_start() -> None:
+    pool = StringPool()
+    t = ProcTable()
+    t.append(t.plan(_frame(pool, [5, 3, 9, 7], [1, 1, 1, 1], [0, 1, 2, 3])))
+    assert list(t.pid) == [5, 3, 9, 7] and t.path(0) == "p5"   # unknown exe -> name
+
+    # 3 exits, 9 is a recycled pid (new start), 7 changes, 11 is new
+    plan = t.plan(_frame(pool, [11, 7, 9, 5], [1, 1, 2, 1], [0, 9, 2, 0]))
+    assert list(plan.removed) == [1, 2]
+    for lo, hi in reversed(runs(plan.removed)):
+        t.remove(lo, hi)
+    t.update(plan)
+    t.append(plan)
+    assert list(t.pid) == [5, 7, 11, 9] and list(t.start) == [1, 1, 1, 2]
+    assert list(plan.changed) == [1] and list(t.cpu) == [0, 9, 0, 2]
+    assert runs(np.array([1, 2, 3, 7, 9, 10])) == [(1, 3), (7, 7), (9, 10)]
+
+
+def test_worker_selects_top_rows_for_the_view_sort_column() -> None:
+    from sba.guardian_gui.pages.processes import ProcWorker
+
+    pool = StringPool()
+    f = _frame(pool, [10, 20, 30, 40, 50], [1] * 5, [9, 1, 5, 3, 7])
+    f.rss[:] = [1, 50, 20, 40, 30]
+    f.path_id[:] = pool.intern_many(["/b", "", "/a", "", "/c"])   # 20, 40 fall back to the name
+
+    w = ProcWorker()
+    out = []
+    w.result.connect(lambda frame, _limit, _hist: out.append(frame))
+    w.ingest(f)
+    for column, descending in [(2, True), (3, True), (3, False), (1, True), (0, False), (8, False)]:
+        w.select("", 3, column, descending)
+    assert [list(fr.pid) for fr in out] == [
+        [10, 50, 30],        # cpu
+        [20, 40, 50],        # rss: the biggest consumers, not the cpu top 3
+        [10, 30, 50],
+        [50, 40, 30],
+        [10, 20, 30],        # name p10 < p20 < ...
+        [30, 10, 50],        # path /a /b /c before p20 / p40
+    ]
+    w.select("p", 2, 3, True)        # filter first, then select
+    assert list(out[-1].pid) == [20, 40]
+    w.select("", 0, 2, True)         # limit 0: every process (tree mode)
+    assert len(out[-1]) == 5
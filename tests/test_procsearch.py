@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import random
+import string
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import StringPool
+from sba.guardian_gui.core.procsearch import SearchIndex
+
+
+def _brute(pool: StringPool, q: str) -> set:
+    return {i for i, s in enumerate(pool.lower) if q in s}
+
+
+def test_matches_agree_with_brute_force_while_typing_and_growing() -> None:
+    rng = random.Random(3)
+    pool = StringPool()
+    for _ in range(300):
+        pool.intern("".join(rng.choice("abcXYZ/.") for _ in range(rng.randint(0, 12))))
+
+    for trigram_min in (0, 10_000):         # with and without the trigram index
+        idx = SearchIndex(pool, trigram_min=trigram_min)
+        for q in ("a", "ab", "abc", "xabc", "c", "/x", "z.y", "zzzzz"):
+            assert idx.matches(q) == _brute(pool, q), q
+            # strings interned between keystrokes are still searched
+            pool.intern("".join(rng.choice(string.ascii_letters) for _ in range(8)) + "ABC")
+
+    idx = SearchIndex(pool, trigram_min=0)
+    pid = np.array([1, 2, 3], dtype=np.int64)
+    name_id = np.array([pool.intern("bash"), pool.intern("sshd"), pool.intern("init")], dtype=np.int32)
+    path_id = np.array([pool.intern("/bin/bash"), pool.intern(""), pool.intern("/sbin/init")], dtype=np.int32)
+    assert idx.accept("sh", pid, name_id, path_id).tolist() == [True, True, False]
+    assert idx.accept("sbin", pid, name_id, path_id).tolist() == [False, False, True]
+    assert idx.accept("2", pid, name_id, path_id).tolist() == [False, True, False]
+    assert idx.accept("", pid, name_id, path_id).all()
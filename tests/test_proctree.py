@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from sba.guardian_gui.core.procscan import ProcFrame, StringPool
+from sba.guardian_gui.core.proctree import ROOT, ProcTree, TreeListener
+
+
+def _frame(pool: StringPool, procs: dict) -> ProcFrame:
+    """procs: pid -> (ppid, start, cpu, rss)"""
+    pids = sorted(procs)
+    n = len(pids)
+    col = lambda k, dt: np.array([procs[p][k] for p in pids], dtype=dt)  # noqa: E731
+    return ProcFrame(
+        0.0, np.array(pids, dtype=np.int64), col(0, np.int64), col(1, float), col(2, float), col(3, np.int64),
+        np.zeros(n, dtype=np.int8), pool.intern_many(f"p{p}" for p in pids), np.zeros(n, dtype=np.int32), pool,
+    )
+
+
+class _Shadow(TreeListener):
+    """Replays the row signals on plain lists, the way a view would see them."""
+
+    def __init__(self, tree: ProcTree) -> None:
+        self.t = tree
+        self.rows = {ROOT: []}
+
+    def _kids(self, p):
+        return self.rows.setdefault(p, [])
+
+    def begin_insert(self, parent, first, last):
+        self._ins = (parent, first, last)
+
+    def end_insert(self):
+        parent, first, last = self._ins
+        assert len(self._kids(parent)) == first
+        self._kids(parent).extend(self.t.kids(parent)[first:last + 1])
+
+    def begin_move(self, src_parent, row, dst_parent, dst_row):
+        assert len(self._kids(dst_parent)) == dst_row
+        self._kids(dst_parent).append(self._kids(src_parent).pop(row))
+
+    def begin_remove(self, parent, first, last):
+        kids = self._kids(parent)
+        for s in kids[first:last + 1]:
+            assert not self.rows.pop(s, None)      # children moved or removed first
+        del kids[first:last + 1]
+
+
+def _check(tree: ProcTree, procs: dict, shadow: _Shadow) -> None:
+    slot = {int(tree.pid[s]): s for s in np.flatnonzero(tree.pid >= 0)}
+    assert set(slot) == set(procs)
+    for pid, s in slot.items():
+        ppid = procs[pid][0]
+        assert tree.parent[s] == (slot[ppid] if ppid in slot and ppid != pid else ROOT)
+        kids = tree.kids(int(tree.parent[s]))
+        assert kids[tree.pos[s]] == s
+        assert tree.children[s] == shadow.rows.get(s, [])
+
+    def total(pid):
+        c, r = procs[pid][2], procs[pid][3]
+        for k in tree.children[slot[pid]]:
+            kc, kr = total(int(tree.pid[k]))
+            c, r = c + kc, r + kr
+        return c, r
+
+    for pid, s in slot.items():
+        c, r = total(pid)
+        assert abs(tree.sub_cpu[s] - c) < 1e-6 and tree.sub_rss[s] == r
+    assert tree.roots == shadow.rows[ROOT]
+
+
+def test_subtree_totals_and_signals_follow_random_process_churn() -> None:
+    rng = random.Random(7)
+    pool = StringPool()
+    procs = {1: (0, 1.0, 0.5, 100)}
+    tree = ProcTree()
+    shadow = _Shadow(tree)
+    next_pid, tick = 2, 1.0
+
+    for _ in range(60):
+        tick += 1
+        for _ in range(rng.randint(0, 12)):       # fork (sometimes under a process forked this tick)
+            procs[next_pid] = (rng.choice(list(procs)), tick, rng.randint(0, 50) / 10, rng.randint(1, 999))
+            next_pid += 1
+        for pid in rng.sample(sorted(procs), k=min(len(procs) - 1, rng.randint(0, 6))):
+            if pid != 1:
+                del procs[pid]                       # exit; children keep a dangling ppid or go to 1
+        for pid, (ppid, start, cpu, rss) in list(procs.items()):
+            if ppid not in procs and rng.random() < 0.5:
+                ppid = 1
+            if rng.random() < 0.3:
+                cpu, rss = rng.randint(0, 50) / 10, rng.randint(1, 999)
+            procs[pid] = (ppid, start, cpu, rss)
+        if rng.random() < 0.1:                       # pid reuse: same pid, new process
+            victim = rng.choice(sorted(procs))
+            procs[victim] = (1, tick + 0.5, 1.0, 7)
+
+        tree.update(_frame(pool, procs), shadow)
+        _check(tree, procs, shadow)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.ml.seasonal import HOUR, WEEK, SeasonalBaseline
+
+
+def _history(weeks: int = 2, step: int = 120) -> tuple[np.ndarray, np.ndarray]:
+    ts = np.arange(0, weeks * WEEK, step, dtype=float)
+    rng = np.random.default_rng(0)
+    cpu = 10 + rng.normal(0, 1, ts.size)
+    nightly = ((ts % (24 * HOUR)) // HOUR) == 2   # batch job every day 02:00-03:00
+    cpu[nightly] += 70
+    ram = 40 + rng.normal(0, 1, ts.size)
+    return np.column_stack([cpu, ram]), ts
+
+
+def test_recurring_load_is_expected() -> None:
+    X, ts = _history()
+    b = SeasonalBaseline(utc_offset_s=0).fit(X, ts)
+
+    at_2am = 3 * WEEK + 2 * HOUR + 600
+    at_noon = 3 * WEEK + 12 * HOUR
+    busy = np.array([[80.0, 40.0]])
+
+    assert b.is_ready_at(at_2am)
+    assert b.score_batch(busy, at_2am)[0] < 4.0
+    assert b.score_batch(busy, at_noon)[0] > 20.0
+    np.testing.assert_array_equal(b.predict(busy, [at_2am]), [1])
+
+
+def test_partial_fit_tracks_a_new_level() -> None:
+    X, ts = _history(weeks=1)
+    b = SeasonalBaseline(utc_offset_s=0, learning_rate=0.05).fit(X, ts)
+    t = WEEK + 12 * HOUR
+    before = b.expected(t)[0][0, 0]
+    for i in range(300):
+        b.partial_fit(np.array([30.0, 40.0]), t + i)
+    after = b.expected(t)[0][0, 0]
+    assert before < 12 and 25 < after <= 30.5
+
+
+def test_thin_buckets_fall_back_to_global() -> None:
+    X, ts = _history(weeks=1, step=3000)   # ~1 sample per hour bucket
+    b = SeasonalBaseline(utc_offset_s=0, min_count=5).fit(X, ts)
+    center, _ = b.expected(2 * HOUR)
+    np.testing.assert_allclose(center[0], b.center_[-1])
+
+
+def test_learning_from_scratch_does_not_flag_ordinary_samples() -> None:
+    b = SeasonalBaseline(utc_offset_s=0, min_count=30)
+    rng = np.random.default_rng(1)
+    flagged = 0
+    for i in range(1000):
+        x = np.array([20.0, 50.0]) + rng.normal(0, [3.0, 2.0])
+        if b.is_ready:
+            flagged += int(b.score_batch(x[None], i * 60.0)[0] >= b.z_thresh)
+        else:
+            assert not b.is_fitted                          # buffering the first min_count rows
+        b.partial_fit(x, i * 60.0)
+    assert b.count_[-1] == 1000 and flagged <= 5
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sba.guardian_gui.core.ring import SampleRing
+from sba.guardian_gui.core.session import Sample, Session
+from sba.guardian_gui.core.stats import EwmaStats, RunningStats, SlidingExtrema, WindowStats
+
+
+def test_ring_wraps_and_windows_are_views() -> None:
+    r = SampleRing(capacity=5, n_features=2)
+    for i in range(12):
+        r.append(float(i), (i, -i))
+
+    assert len(r) == 5 and r.total == 12
+    ts, X = r.window()
+    np.testing.assert_array_equal(ts, [7, 8, 9, 10, 11])
+    np.testing.assert_array_equal(X[:, 1], [-7, -8, -9, -10, -11])
+    assert np.shares_memory(X, r._X)
+    with pytest.raises(ValueError):
+        X[0, 0] = 1.0
+
+    ts, _ = r.window(2)
+    np.testing.assert_array_equal(ts, [10, 11])
+    assert r.last()[0] == 11.0
+
+
+def test_session_memory_is_bounded() -> None:
+    s = Session(capacity=100)
+    before = s.buffer.nbytes
+    for i in range(1000):
+        s.add(Sample(ts=float(i), cpu=10.0 + i % 3, ram=50.0, disk=60.0, net_kbps=5.0))
+    assert s.count() == 100
+    assert s.buffer.nbytes == before
+    assert s.last().ts == 999.0
+
+    m = s.train(window=30)
+    assert m.trained_on == 30
+    np.testing.assert_allclose(m.mean[1:], [50.0, 60.0, 5.0])
+
+    s.add(Sample(ts=1000.0, cpu=99.0, ram=50.0, disk=60.0, net_kbps=5.0))
+    a = s.detect_last()
+    assert a is not None and a.reason.startswith("CPU")
+
+
+def test_stats_match_batch_computation() -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(50, 5, size=(1000, 4))
+    w, r, e = WindowStats(300), RunningStats(), EwmaStats(alpha=1.0)
+    for x in X:
+        w.update(x)
+        r.update(x)
+        e.update(x)
+
+    np.testing.assert_allclose(w.mean, X[-300:].mean(axis=0))
+    np.testing.assert_allclose(w.std, X[-300:].std(axis=0))
+    np.testing.assert_allclose(r.std, X.std(axis=0))
+    np.testing.assert_allclose(e.mean, X[-1])     # alpha=1 tracks the last sample
+
+
+def test_train_is_a_snapshot_of_running_stats() -> None:
+    s = Session(capacity=200, window=50)
+    rng = np.random.default_rng(1)
+    X = rng.normal(20, 2, size=(500, 4))
+    for i, x in enumerate(X):
+        s.add(Sample(ts=float(i), cpu=x[0], ram=x[1], disk=x[2], net_kbps=x[3]))
+
+    m = s.train(window=50)
+    np.testing.assert_allclose(m.mean, X[-50:].mean(axis=0))
+    m = s.train()                                  # everything seen, beyond capacity
+    assert m.trained_on == 500
+    np.testing.assert_allclose(m.std, X.std(axis=0))
+    assert s.train(ewma=True).trained_on == 500
+
+
+def test_detect_range_matches_detect_last() -> None:
+    s = Session(window=100)
+    for i in range(200):
+        cpu = 95.0 if i in (150, 199) else 20.0 + i % 4
+        s.add(Sample(ts=float(i), cpu=cpu, ram=50.0, disk=60.0, net_kbps=10.0))
+    s.train(window=100)
+
+    det = s.detect_range(start=100.0)
+    assert len(det) == 100 and det.z.shape == (100, 4)
+    np.testing.assert_array_equal(det.ts[det.is_anomaly], [150.0, 199.0])
+    assert det.reasons[50].startswith("CPU z=")
+
+    last = s.detect_last()
+    assert last is not None
+    assert last.score == det.scores[-1] and last.reason == det.reasons[-1]
+
+    assert len(s.detect_range(start=10.0, end=20.0)) == 10
+    assert len(s.redetect()) == 200 and len(s.anomalies) == 2
+
+
+def test_add_batch_matches_sequential_add() -> None:
+    rng = np.random.default_rng(2)
+    X = rng.normal(40, 4, size=(700, 4))
+    X[123, 2] = np.nan
+    ts = np.arange(700, dtype=float)
+
+    one, bulk = Session(capacity=256, window=100), Session(capacity=256, window=100)
+    for t, x in zip(ts, X, strict=True):
+        one.add(Sample(ts=t, cpu=x[0], ram=x[1], disk=x[2], net_kbps=x[3]))
+    for i in range(0, 700, 37):
+        bulk.add_batch(ts[i:i + 37], X[i:i + 37])
+
+    for a, b in zip(one.buffer.window(), bulk.buffer.window(), strict=True):
+        np.testing.assert_array_equal(a, b)
+    assert bulk.buffer.total == 700
+    for name in ("cumulative", "rolling", "ewma"):
+        np.testing.assert_allclose(getattr(bulk, name).mean, getattr(one, name).mean)
+        np.testing.assert_allclose(getattr(bulk, name).std, getattr(one, name).std)
+
+    bulk.train(window=100)
+    bulk.add_batch(np.array([700.0, 701.0, 702.0]), np.array([[40.0] * 4, [99.0, 40, 40, 40], [40.0] * 4]))
+    found = bulk.detect_batch(3)
+    assert [a.ts for a in found] == [701.0] and len(bulk.anomalies) == 1
+
+
+def test_sliding_extrema_match_the_window() -> None:
+    rng = np.random.default_rng(3)
+    xs = rng.integers(0, 20, size=400).astype(float)
+    xs[rng.random(400) < 0.1] = np.nan
+    xs[200:215] = np.nan                                     # a gap longer than the window
+    ex = SlidingExtrema(window=12)
+    for i, x in enumerate(xs):
+        ex.push(x)
+        w = xs[max(0, i - 11):i + 1]
+        w = w[np.isfinite(w)]
+        if len(w):
+            assert (ex.min, ex.max, ex.last) == (w.min(), w.max(), w[-1])
+        else:
+            assert ex.min is None and ex.max is None and ex.last is None
+
+
+def test_detect_last_online_leaves_the_batch_scores() -> None:
+    s = Session(capacity=1000, window=100)
+    s.enable_online()
+    rng = np.random.default_rng(4)
+    X = rng.normal([20, 50, 40, 5], [2, 1, 0.5, 1], size=(400, 4))
+    s.add_batch(np.arange(400, dtype=float), X)
+
+    spike = np.vstack([[99.0, 99.0, 99.0, 500.0], X[:3]])
+    s.add_batch(np.arange(400, 404, dtype=float), spike)
+    assert s.detect_last_online() is None
+    assert [a.ts for a in s.detect_online_batch(record=False)] == [400.0]
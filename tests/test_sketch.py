@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.guardian_gui.core.session import Sample, Session
+from sba.ml.sketch import QuantileSketch, RobustStats
+
+
+def test_quantiles_within_relative_accuracy() -> None:
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.gamma(2.0, 10.0, 20000), rng.lognormal(3.0, 1.0, 20000)])
+    s = QuantileSketch(n_features=2, relative_accuracy=0.01)
+    for x in X:
+        s.update(x)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(X, q, axis=0)
+        np.testing.assert_allclose(s.quantile(q), exact, rtol=0.05)
+    assert s.counts.shape == (2, s.max_bins + 1)   # memory fixed by construction
+
+
+def test_robust_stats_ignore_a_spike() -> None:
+    r = RobustStats(n_features=1)
+    rng = np.random.default_rng(1)
+    for v in rng.normal(20.0, 1.0, 500):
+        r.update([v])
+    before = r.median.copy(), r.mad.copy()
+    r.update([1000.0])
+    np.testing.assert_allclose(r.median, before[0], rtol=0.02)
+    np.testing.assert_allclose(r.mad, before[1], rtol=0.1)
+
+
+def test_half_life_follows_a_level_change() -> None:
+    r = RobustStats(n_features=1, half_life=100)
+    for v in np.r_[np.full(1000, 10.0), np.full(500, 50.0)]:
+        r.update([v])
+    np.testing.assert_allclose(r.median, [50.0], rtol=0.02)
+
+
+def test_session_robust_baseline_and_thresholds() -> None:
+    s = Session(window=200)
+    rng = np.random.default_rng(2)
+    for i, v in enumerate(rng.normal(30.0, 2.0, 400)):
+        s.add(Sample(ts=float(i), cpu=v, ram=50.0, disk=60.0, net_kbps=100.0 + v))
+    for i in range(3):                                # a burst of spikes
+        s.add(Sample(ts=400.0 + i, cpu=99.0, ram=50.0, disk=60.0, net_kbps=100.0))
+
+    m = s.train(robust=True)
+    assert abs(m.mean[0] - 30.0) < 1.0 and m.std[0] < 4.0
+    warn, crit = s.thresholds()
+    assert warn[0] < crit[0] and 30.0 < warn[0] < 40.0
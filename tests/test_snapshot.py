@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sba.guardian_gui.core.session import Sample, Session
+from sba.guardian_gui.core.snapshot import load_session, save_session
+
+
+def _session(n: int, capacity: int = 500) -> Session:
+    s = Session(capacity=capacity, window=50)
+    s.enable_online()
+    rng = np.random.default_rng(0)
+    for i, v in enumerate(rng.normal(20.0, 1.0, n)):
+        s.add(Sample(ts=float(i), cpu=v, ram=40.0, disk=60.0, net_kbps=5.0))
+    s.train(window=50)
+    s.add(Sample(ts=float(n), cpu=90.0, ram=40.0, disk=60.0, net_kbps=5.0))
+    s.detect_last()
+    return s
+
+
+def test_roundtrip(tmp_path: Path) -> None:
+    s = _session(800)
+    save_session(s, tmp_path / "session")
+    r = load_session(tmp_path / "session")
+
+    assert r.count() == s.count() == 500 and r.buffer.total == 801
+    for a, b in zip(r.window(), s.window(), strict=True):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(r.model.mean, s.model.mean)
+    assert r.anomalies == s.anomalies
+    np.testing.assert_allclose(r.train(window=50).std, s.train(window=50).std)
+
+    # keeps streaming where it left off
+    r.add(Sample(ts=801.0, cpu=20.0, ram=40.0, disk=60.0, net_kbps=5.0))
+    assert r.count() == 500 and r.last().ts == 801.0
+
+    smaller = load_session(tmp_path / "session", capacity=100)
+    assert smaller.count() == 100 and smaller.last().ts == 800.0
+
+
+def test_missing_snapshot(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        load_session(tmp_path / "nope")
+
+
+def test_restore_large_session_is_fast(tmp_path: Path) -> None:
+    s = Session(capacity=1_000_000)
+    ts = np.arange(1_000_000, dtype=float)
+    s.buffer.load(ts, np.zeros((len(ts), 4)))
+    save_session(s, tmp_path / "big")
+
+    t0 = time.perf_counter()
+    r = load_session(tmp_path / "big")
+    assert r.count() == 1_000_000
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_crashed_save_keeps_the_previous_pair(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "session"
+    s = _session(800)
+    save_session(s, path)
+    assert len(list(path.glob("samples.*.npy"))) == 2
+    before = load_session(path).window()
+
+    # the ring shifts, then the process dies after the sample files but before the state swap
+    s.add(Sample(ts=801.0, cpu=20.0, ram=40.0, disk=60.0, net_kbps=5.0))
+    monkeypatch.setattr("sba.guardian_gui.core.snapshot.joblib.dump", lambda *a, **k: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        save_session(s, path)
+    monkeypatch.undo()
+
+    for a, b in zip(load_session(path).window(), before, strict=True):
+        np.testing.assert_array_equal(a, b)
+    save_session(s, path)                     # next save cleans up the orphaned pair
+    assert len(list(path.glob("samples.*.npy"))) == 2
+    assert load_session(path).last().ts == 801.0
+
+
+def test_current_limits_are_applied_on_restore(tmp_path: Path) -> None:
+    s = _session(200)
+    for i in range(5):
+        s.add(Sample(ts=300.0 + i, cpu=95.0, ram=40.0, disk=60.0, net_kbps=5.0))
+        s.detect_last()
+    assert len(s.anomalies) >= 4
+    save_session(s, tmp_path / "session")
+
+    r = load_session(tmp_path / "session", max_anomalies=2, incident_gap_s=5.0)
+    assert r.anomalies.max_rows == 2 and [a.ts for a in r.anomalies] == [a.ts for a in s.anomalies][-2:]
+    assert r.incidents.gap_s == 5.0
+    assert load_session(tmp_path / "session").incidents.gap_s == s.incidents.gap_s
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pickle
+
+import numpy as np
+
+from sba.ml.streaming import HalfSpaceTrees
+
+
+def _normal(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal([20, 50, 40, 5, 10], [3, 2, 0.1, 1, 2], size=(n, 5))
+
+
+def test_warm_up_then_flags_outliers() -> None:
+    hst = HalfSpaceTrees(window_size=200)
+    X = _normal(1000)
+
+    hst.partial_fit(X[:100])
+    assert not hst.is_ready
+    np.testing.assert_array_equal(hst.predict(X[:5]), 1)
+
+    hst.partial_fit(X[100:])
+    assert hst.is_ready and hst.n_seen_ == 1000
+
+    outliers = np.array([[95, 50, 40, 5, 10], [20, 90, 40, 5, 10], [20, 50, 40, 500, 10]])
+    np.testing.assert_array_equal(hst.predict(outliers), -1)
+    assert (hst.predict(_normal(500, seed=1)) == -1).mean() < 0.05
+
+
+def test_memory_is_bounded_and_pickles() -> None:
+    hst = HalfSpaceTrees(window_size=50).fit(_normal(120))
+    sizes = (hst._r.nbytes, hst._l.nbytes, hst._win.nbytes)
+    for row in _normal(300, seed=2):
+        hst.partial_fit(row)
+    assert (hst._r.nbytes, hst._l.nbytes, hst._win.nbytes) == sizes
+
+    clone = pickle.loads(pickle.dumps(hst))
+    X = _normal(10, seed=3)
+    np.testing.assert_allclose(clone.decision_function(X), hst.decision_function(X))
+
+
+def test_scoring_in_chunks_matches_one_pass() -> None:
+    hst = HalfSpaceTrees(window_size=100).fit(_normal(300))
+    X = _normal(250, seed=1)
+    whole = hst.score_samples(X)
+    hst.SCORE_CHUNK = 64
+    np.testing.assert_array_equal(hst.score_samples(X), whole)
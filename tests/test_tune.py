@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+
+from sba.ml.synthetic import inject_anomalies, inject_drifts, inject_level_shifts
+from sba.ml.tune import TuneResult, pick_best, tune_isolation_forest
+
+
+def _normal(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal([20, 50, 40, 5, 10], [3, 2, 0.5, 1, 2], size=(n, 5))
+
+
+def test_injection_labels_and_leaves_input_untouched() -> None:
+    X = _normal(600)
+    before = X.copy()
+
+    shifted, l_shift = inject_level_shifts(X, n_events=2, length=20)
+    assert l_shift.sum() == 40
+    assert np.all(shifted[~l_shift] == X[~l_shift])
+
+    drifted, l_drift = inject_drifts(X, n_events=1, length=60, magnitude=8.0, label_from=4.0)
+    assert 0 < l_drift.sum() < 60
+
+    mixed, labels = inject_anomalies(X)
+    assert mixed.shape == X.shape and labels.any()
+    np.testing.assert_array_equal(X, before)
+
+
+def test_pick_best_prefers_smallest_then_fastest() -> None:
+    def r(n: int, m: int, recall: float, us: float) -> TuneResult:
+        return TuneResult(n, m, "auto", precision=0.5, recall=recall, fit_s=0.1, us_per_row=us)
+
+    results = [r(200, 256, 0.95, 10), r(25, 64, 0.5, 1), r(50, 64, 0.9, 3), r(25, 128, 0.9, 2)]
+    assert pick_best(results, target_recall=0.8) == results[3]
+    assert pick_best(results, target_recall=0.99) is None
+
+
+def test_tune_runs_grid_in_pool() -> None:
+    grid = {"n_estimators": [10, 20], "max_samples": [32], "contamination": ["auto"]}
+    results, _ = tune_isolation_forest(_normal(800), grid=grid, workers=2)
+    assert sorted(r.n_estimators for r in results) == [10, 20]
+    assert all(0.0 <= r.recall <= 1.0 and r.us_per_row > 0 for r in results)